@@ -1,12 +1,16 @@
 #!/usr/bin/env python3
-import sys, json, urllib.request, time
+import sys, json, time
+from libs.trance_common.http import json_post
 URL="http://127.0.0.1:8094/rank"
 LIB="copy_library.json"
 
 def rank(task, brief, variants, top_k=3, div=0.75):
     payload={"task":task,"brief":brief,"variants":variants,"top_k":top_k,"diversity_threshold":div}
-    req=urllib.request.Request(URL, data=json.dumps(payload).encode(), headers={"Content-Type":"application/json"})
-    with urllib.request.urlopen(req) as r: return json.load(r)
+    # json_post nutzt den Keep-Alive-Pool: eine Verbindung für den ganzen Batch
+    status, res = json_post(URL, payload)
+    if status != 200:
+        raise SystemExit(f"rank failed ({status}): {res.get('error', res)}")
+    return res
 
 def main(path):
     batch=json.load(open(path,"r",encoding="utf-8"))
@@ -1,46 +1,244 @@
 """
-Shared HTTP client functionality using urllib.
+Shared HTTP client functionality (stdlib only).
+Keep-alive connection pool per backend (scheme, host, port) on top of http.client.
 """
 
-import urllib.request
-import urllib.parse
+import http.client
 import json
-from typing import Tuple, Dict, Any
+import os
+import threading
+import urllib.parse
+from collections import deque
+from typing import Tuple, Dict, Any, Optional
+
+# Idle-Connections pro Backend; Override pro Backend via HTTP_POOL_SIZES="127.0.0.1:8093=16,127.0.0.1:8091=4"
+DEFAULT_POOL_SIZE = int(os.environ.get("HTTP_POOL_MAXSIZE", "10") or "10")
+
+# Fehler auf wiederverwendeter Connection → Server hat Keep-Alive geschlossen, einmal frisch versuchen
+_STALE_ERRORS = (http.client.RemoteDisconnected, http.client.BadStatusLine, ConnectionResetError, BrokenPipeError)
+
+
+def _parse_pool_sizes(raw: str) -> Dict[str, int]:
+    sizes: Dict[str, int] = {}
+    for part in (raw or "").split(","):
+        if "=" not in part:
+            continue
+        k, v = part.rsplit("=", 1)
+        try:
+            sizes[k.strip()] = max(1, int(v.strip()))
+        except ValueError:
+            continue
+    return sizes
+
+
+_POOL_SIZES = _parse_pool_sizes(os.environ.get("HTTP_POOL_SIZES", ""))
+
+
+def _netloc(url: str) -> Tuple[str, str, int]:
+    u = urllib.parse.urlsplit(url)
+    scheme = (u.scheme or "http").lower()
+    port = u.port or (443 if scheme == "https" else 80)
+    return scheme, (u.hostname or "127.0.0.1"), port
+
+
+def pool_size_for(url: str) -> int:
+    """Configured pool size for the backend of `url` (HTTP_POOL_SIZES, else HTTP_POOL_MAXSIZE)."""
+    _, host, port = _netloc(url)
+    return _POOL_SIZES.get(f"{host}:{port}", _POOL_SIZES.get(host, DEFAULT_POOL_SIZE))
+
+
+class RequestError(Exception):
+    """Transport error or HTTP status >= 400 (raise_for_status)."""
+
+
+class Response:
+    def __init__(self, status_code: int, headers: Dict[str, str], content: bytes):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.content.decode("utf-8"))
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise RequestError(f"HTTP {self.status_code}")
+
+
+class HostPool:
+    """Keep-alive connections to one (scheme, host, port)."""
+
+    def __init__(self, scheme: str, host: str, port: int, maxsize: int):
+        self.scheme, self.host, self.port = scheme, host, port
+        self.maxsize = maxsize
+        self._idle: "deque[http.client.HTTPConnection]" = deque()
+        self._lock = threading.Lock()
+        self.open = 0
+        self.requests = 0
+        self.reused = 0
+
+    def _new(self, timeout: float) -> http.client.HTTPConnection:
+        cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        with self._lock:
+            self.open += 1
+        return cls(self.host, self.port, timeout=timeout)
+
+    def acquire(self, timeout: float) -> Tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            self.requests += 1
+            if self._idle:
+                self.reused += 1
+                return self._idle.pop(), True
+        return self._new(timeout), False
+
+    def release(self, conn: http.client.HTTPConnection, reusable: bool) -> None:
+        with self._lock:
+            if reusable and len(self._idle) < self.maxsize:
+                self._idle.append(conn)
+                return
+            self.open -= 1
+        conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "maxsize": self.maxsize,
+                "open": self.open,
+                "idle": len(self._idle),
+                "requests": self.requests,
+                "reused": self.reused,
+                "reuse_ratio": round(self.reused / self.requests, 3) if self.requests else 0.0,
+            }
+
+
+class ConnectionPool:
+    def __init__(self):
+        self._pools: Dict[Tuple[str, str, int], HostPool] = {}
+        self._lock = threading.Lock()
+
+    def _pool_for(self, url: str) -> HostPool:
+        key = _netloc(url)
+        with self._lock:
+            p = self._pools.get(key)
+            if p is None:
+                p = self._pools[key] = HostPool(*key, maxsize=pool_size_for(url))
+            return p
+
+    def request(self, method: str, url: str, body: Optional[bytes] = None,
+                headers: Optional[Dict[str, str]] = None, timeout: float = 60.0) -> Response:
+        pool = self._pool_for(url)
+        u = urllib.parse.urlsplit(url)
+        path = (u.path or "/") + (f"?{u.query}" if u.query else "")
+        conn, reused = pool.acquire(timeout)
+        while True:
+            try:
+                conn.timeout = timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                conn.request(method, path, body=body, headers=headers or {})
+                resp = conn.getresponse()
+                content = resp.read()
+            except _STALE_ERRORS as e:
+                pool.release(conn, False)
+                if not reused:
+                    raise RequestError(str(e)) from e
+                conn, reused = pool._new(timeout), False
+                continue
+            except Exception as e:
+                pool.release(conn, False)
+                raise RequestError(str(e)) from e
+            pool.release(conn, not resp.will_close)
+            return Response(resp.status, dict(resp.getheaders()), content)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pools = dict(self._pools)
+        backends = {f"{s}://{h}:{p}": hp.stats() for (s, h, p), hp in pools.items()}
+        req = sum(b["requests"] for b in backends.values())
+        reused = sum(b["reused"] for b in backends.values())
+        return {
+            "open": sum(b["open"] for b in backends.values()),
+            "idle": sum(b["idle"] for b in backends.values()),
+            "requests": req,
+            "reused": reused,
+            "reuse_ratio": round(reused / req, 3) if req else 0.0,
+            "backends": backends,
+        }
+
+
+class Session:
+    """Minimal requests-like facade over the shared keep-alive pool."""
+
+    def __init__(self, pool: ConnectionPool):
+        self.pool = pool
+
+    def request(self, method: str, url: str, json: Any = None,
+                headers: Optional[Dict[str, str]] = None, timeout: float = 60.0) -> Response:
+        hdrs = dict(headers or {})
+        body = None
+        if json is not None:
+            body = _json_dumps(json)
+            hdrs.setdefault("Content-Type", "application/json")
+        return self.pool.request(method, url, body=body, headers=hdrs, timeout=timeout)
+
+    def get(self, url: str, **kw) -> Response:
+        return self.request("GET", url, **kw)
+
+    def post(self, url: str, **kw) -> Response:
+        return self.request("POST", url, **kw)
+
+
+def _json_dumps(obj: Any) -> bytes:
+    return json.dumps(obj).encode('utf-8')
+
+
+_POOL = ConnectionPool()
+_SESSION = Session(_POOL)
+
+
+def session() -> Session:
+    """Process-wide keep-alive session (shared by Guard helpers, TranceCreate and CLI clients)."""
+    return _SESSION
+
+
+def pool_stats() -> Dict[str, Any]:
+    """Open/idle connections and reuse ratio, overall and per backend."""
+    return _POOL.stats()
+
+
+def _decode(r: Response) -> Dict[str, Any]:
+    try:
+        return r.json()
+    except ValueError:
+        return {"error": r.text}
+
 
 def json_get(url: str, timeout: float = 5.0) -> Tuple[int, Dict[str, Any]]:
     """
     Perform GET request and return JSON response.
-    
+
     Returns:
         (status_code, response_dict)
     """
     try:
-        req = urllib.request.Request(url)
-        req.add_header('Connection', 'close')
-        
-        with urllib.request.urlopen(req, timeout=timeout) as response:
-            status_code = response.getcode()
-            response_data = json.loads(response.read().decode('utf-8'))
-            return status_code, response_data
+        r = session().get(url, timeout=timeout)
+        return r.status_code, _decode(r)
     except Exception as e:
         return 500, {"error": str(e)}
 
 def json_post(url: str, obj: Dict[str, Any], timeout: float = 60.0) -> Tuple[int, Dict[str, Any]]:
     """
     Perform POST request with JSON data.
-    
+
     Returns:
         (status_code, response_dict)
     """
     try:
-        data = json.dumps(obj).encode('utf-8')
-        req = urllib.request.Request(url, data=data)
-        req.add_header('Content-Type', 'application/json')
-        req.add_header('Connection', 'close')
-        
-        with urllib.request.urlopen(req, timeout=timeout) as response:
-            status_code = response.getcode()
-            response_data = json.loads(response.read().decode('utf-8'))
-            return status_code, response_data
+        r = session().post(url, json=obj, timeout=timeout)
+        return r.status_code, _decode(r)
     except Exception as e:
         return 500, {"error": str(e)}
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Concurrency benchmark for the Guard translation cache:
+single-lock LRUCache vs. ShardedLRUCache, throughput per thread count.
+
+Usage: python scripts/bench_guard_cache.py [--ops 200000] [--threads 1,2,4,8,16] [--shards 16]
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "services", "guard"))
+from guard.cache import LRUCache, ShardedLRUCache  # noqa: E402
+
+
+def run(cache, threads: int, ops: int, keyspace: int, write_ratio: float) -> float:
+    per_thread = ops // threads
+    value = {"translated_text": "x" * 64, "checks": {"ok": True}}
+    start = threading.Barrier(threads + 1)
+    errors = []
+
+    def worker(seed: int):
+        rnd = random.Random(seed)
+        keys = [f"de->en|a=auto;g=none;gl=none|{rnd.randrange(keyspace):016x}" for _ in range(1024)]
+        start.wait()
+        try:
+            for i in range(per_thread):
+                k = keys[i & 1023]
+                if rnd.random() < write_ratio or cache.get(k) is None:
+                    cache.set(k, value)
+        except Exception as e:
+            errors.append(e)
+
+    ts = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in ts:
+        t.start()
+    start.wait()
+    t0 = time.perf_counter()
+    for t in ts:
+        t.join()
+    dt = time.perf_counter() - t0
+    if errors:
+        raise errors[0]
+    st = cache.stats()
+    assert st["size"] <= cache.maxsize, st
+    return (per_thread * threads) / dt
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--ops", type=int, default=200000)
+    ap.add_argument("--threads", default="1,2,4,8,16")
+    ap.add_argument("--shards", type=int, default=16)
+    ap.add_argument("--max", type=int, default=5000)
+    ap.add_argument("--keyspace", type=int, default=20000)
+    ap.add_argument("--write-ratio", type=float, default=0.1)
+    args = ap.parse_args()
+
+    print(f"ops={args.ops} max={args.max} keyspace={args.keyspace} write_ratio={args.write_ratio}")
+    print(f"{'threads':>7}  {'LRUCache ops/s':>15}  {'Sharded(' + str(args.shards) + ') ops/s':>19}  {'ratio':>6}")
+    for n in [int(x) for x in args.threads.split(",") if x.strip()]:
+        single = run(LRUCache(maxsize=args.max), n, args.ops, args.keyspace, args.write_ratio)
+        sharded = run(ShardedLRUCache(maxsize=args.max, shards=args.shards), n, args.ops, args.keyspace, args.write_ratio)
+        print(f"{n:>7}  {single:>15,.0f}  {sharded:>19,.0f}  {sharded / single:>6.2f}")
+
+
+if __name__ == "__main__":
+    main()
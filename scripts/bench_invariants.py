@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark + equivalence check for the Guard invariant scanner
+(invariants.find_non_overlapping_matches) against the previous O(matches²) version.
+
+Usage: python scripts/bench_invariants.py [--sizes 2000,20000,100000] [--rounds 5]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "services", "guard"))
+import invariants  # noqa: E402
+
+
+def legacy_find_non_overlapping_matches(text):
+    """Previous implementation (reference for identical output)."""
+    matches = []
+    occupied_ranges = set()
+    for pattern, inv_type in invariants.PATTERNS:
+        for match in pattern.finditer(text):
+            start, end = match.span()
+            if any(start < e_end and end > e_start for e_start, e_end in occupied_ranges):
+                continue
+            matches.append((start, end, match.group(0), inv_type))
+            occupied_ranges.add((start, end))
+    matches.sort(key=lambda x: x[0])
+    return matches
+
+
+FRAGMENTS = [
+    '<p class="lead">', "</p>", "<b>", "</b>", '<a href="https://trancelate.it/x?a=1">', "</a>", "<br/>",
+    "Preis 1.234,56 €", "$1,234.56", "um 10:30", "am 01.09.2025", "{name}", "{{user.name}}",
+    "info@trancelate.it", "https://example.com/path", "Version 3", "1990–2014", "1 234,56 €",
+    "Hallo Welt", "Jetzt testen", "中文字", " ", ", ", ". ",
+]
+
+
+def make_text(size, seed=0):
+    rnd = random.Random(seed)
+    parts, n = [], 0
+    while n < size:
+        f = rnd.choice(FRAGMENTS)
+        parts.append(f)
+        n += len(f)
+    return "".join(parts)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="2000,20000,100000")
+    ap.add_argument("--rounds", type=int, default=5)
+    ap.add_argument("--check", type=int, default=2000, help="random texts for the equivalence check")
+    args = ap.parse_args()
+
+    for i in range(args.check):
+        t = make_text(random.Random(i).randint(1, 400), seed=i)
+        assert invariants.find_non_overlapping_matches(t) == legacy_find_non_overlapping_matches(t), repr(t)
+    print(f"equivalence: {args.check} random texts OK")
+
+    print(f"{'chars':>8}  {'matches':>8}  {'legacy ms':>10}  {'scanner ms':>10}  {'speedup':>8}")
+    for size in [int(x) for x in args.sizes.split(",") if x.strip()]:
+        text = make_text(size, seed=size)
+        ref = legacy_find_non_overlapping_matches(text)
+        t0 = time.perf_counter()
+        for _ in range(args.rounds):
+            legacy_find_non_overlapping_matches(text)
+        legacy = (time.perf_counter() - t0) / args.rounds
+        t0 = time.perf_counter()
+        for _ in range(args.rounds):
+            invariants._scan.cache_clear()  # kalter Scan, ohne Memo-Treffer
+            out = invariants.find_non_overlapping_matches(text)
+        new = (time.perf_counter() - t0) / args.rounds
+        assert out == ref
+        print(f"{len(text):>8}  {len(ref):>8}  {legacy * 1000:>10.2f}  {new * 1000:>10.2f}  {legacy / new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Tests for Guard's worker batching (services/guard/guard/batcher.py): MicroBatcher (coalescing per
+language pair, max_batch flush, 404/405 → batching off, per-text fallback, timeout passthrough) and
+BatchRound (one round for all items, BATCH_ROUND_MAX splits, leave(), shared batch_supported flag).
+
+Runs offline (no services needed, needs httpx from requirements.txt): python scripts/test_batcher.py
+"""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "services", "guard"))
+from guard.batcher import BatchRound, MicroBatcher  # noqa: E402
+from guard.worker import WorkerError  # noqa: E402
+
+
+class _FakeClient:
+    """Worker-Attrappe: protokolliert Calls, /translate_batch kann mit `batch_status` scheitern."""
+
+    def __init__(self, batch_status=200):
+        self.batch_status = batch_status
+        self.log = []
+
+    async def translate(self, payload, timeout=None):
+        self.log.append(("one", payload["text"], timeout))
+        return {"translated_text": payload["text"].upper()}
+
+    async def translate_text(self, text, src, tgt, max_new_tokens=None, timeout=None):
+        self.log.append(("one", text, timeout))
+        return text.upper()
+
+    async def translate_batch(self, texts, src, tgt, max_new_tokens=None, timeout=None):
+        self.log.append(("batch", len(texts), timeout))
+        if self.batch_status != 200:
+            raise WorkerError(self.batch_status)
+        return [t.upper() for t in texts]
+
+    def kinds(self):
+        return [e[0] for e in self.log]
+
+
+def _payload(text, tgt="de"):
+    return {"source": "en", "target": tgt, "text": text}
+
+
+# ---------- MicroBatcher
+
+async def _microbatch_coalesces_per_pair():
+    client = _FakeClient()
+    mb = MicroBatcher(client, max_wait_ms=5, max_batch=16)
+    res = await asyncio.gather(*[mb.translate(_payload(f"t{i}", "de" if i % 2 else "fr")) for i in range(6)])
+    assert [r["translated_text"] for r in res] == [f"T{i}" for i in range(6)]
+    assert sorted(client.log) == [("batch", 3, None), ("batch", 3, None)], client.log
+    assert mb.stats()["pending"] == 0
+
+
+async def _microbatch_flushes_at_max_batch():
+    client = _FakeClient()
+    mb = MicroBatcher(client, max_wait_ms=10_000, max_batch=4)
+    res = await asyncio.wait_for(asyncio.gather(*[mb.translate(_payload(f"t{i}")) for i in range(4)]), 1.0)
+    assert len(res) == 4 and client.log == [("batch", 4, None)], client.log
+
+
+def test_microbatch_coalescing():
+    asyncio.run(_microbatch_coalesces_per_pair())
+    asyncio.run(_microbatch_flushes_at_max_batch())
+
+
+async def _microbatch_unsupported(status):
+    client = _FakeClient(batch_status=status)
+    mb = MicroBatcher(client, max_wait_ms=2, max_batch=16)
+    res = await asyncio.gather(*[mb.translate(_payload(f"t{i}")) for i in range(3)])
+    assert [r["translated_text"] for r in res] == ["T0", "T1", "T2"]
+    assert client.kinds() == ["batch", "one", "one", "one"], client.log
+    assert not mb.batch_supported and mb.fallbacks == 1
+    # danach keine Batch-Versuche mehr
+    client.log.clear()
+    await asyncio.gather(*[mb.translate(_payload(f"u{i}")) for i in range(3)])
+    assert client.kinds() == ["one", "one", "one"], client.log
+
+
+async def _microbatch_5xx_keeps_batching():
+    client = _FakeClient(batch_status=503)
+    mb = MicroBatcher(client, max_wait_ms=2, max_batch=16)
+    res = await asyncio.gather(*[mb.translate(_payload(f"t{i}")) for i in range(2)])
+    assert [r["translated_text"] for r in res] == ["T0", "T1"]
+    assert mb.batch_supported, "a 503 is transient, batching stays on"
+
+
+def test_microbatch_404_405_fallback():
+    asyncio.run(_microbatch_unsupported(404))
+    asyncio.run(_microbatch_unsupported(405))
+    asyncio.run(_microbatch_5xx_keeps_batching())
+
+
+async def _microbatch_timeouts():
+    client = _FakeClient()
+    mb = MicroBatcher(client, max_wait_ms=2, max_batch=16)
+    await asyncio.gather(mb.translate(_payload("a"), 5.0), mb.translate(_payload("b"), 30.0))
+    assert client.log == [("batch", 2, 30.0)], client.log
+    client.log.clear()
+    await asyncio.gather(mb.translate(_payload("a"), 5.0), mb.translate(_payload("b")))
+    assert client.log == [("batch", 2, None)], client.log
+    client.log.clear()
+    await mb.translate(_payload("solo"), 7.0)
+    assert client.log == [("one", "solo", 7.0)], client.log
+
+
+def test_microbatch_timeout_passthrough():
+    asyncio.run(_microbatch_timeouts())
+
+
+# ---------- BatchRound
+
+async def _round_one_call_for_all():
+    client = _FakeClient()
+    rnd = BatchRound(client, 5, MicroBatcher(client, enabled=False).translate, max_batch=64)
+    res = await asyncio.gather(*[rnd.caller(i)(_payload(f"t{i}")) for i in range(5)])
+    assert [r["translated_text"] for r in res] == [f"T{i}" for i in range(5)]
+    assert client.log == [("batch", 5, None)] and rnd.calls == 1, client.log
+
+
+async def _round_splits_by_max_batch():
+    client = _FakeClient()
+    rnd = BatchRound(client, 10, MicroBatcher(client, enabled=False).translate, max_batch=4)
+    await asyncio.gather(*[rnd.caller(i)(_payload("x" * (i + 1))) for i in range(10)])
+    assert sorted(n for _, n, _ in client.log) == [2, 4, 4], client.log
+
+
+async def _round_leave_and_second_call():
+    client = _FakeClient()
+    fallback = MicroBatcher(client, enabled=False).translate
+    rnd = BatchRound(client, 3, fallback, max_batch=64)
+    first = asyncio.ensure_future(rnd.caller(0)(_payload("a")))
+    await asyncio.sleep(0)
+    rnd.caller(1).leave()  # z. B. Singleflight-Wartender ohne eigenen Call
+    await asyncio.sleep(0)
+    assert not first.done(), "round must wait for item 2"
+    second = await rnd.caller(2)(_payload("b"))
+    assert (await first)["translated_text"] == "A" and second["translated_text"] == "B"
+    assert client.log == [("batch", 2, None)], client.log
+    # zweiter Call desselben Items (Fallback-Pfad) geht nicht mehr in die Runde
+    await rnd.caller(0)(_payload("again"))
+    assert client.log[-1] == ("one", "again", None), client.log
+
+
+async def _round_shares_unsupported_flag():
+    client = _FakeClient(batch_status=404)
+    mb = MicroBatcher(client, max_wait_ms=1, max_batch=16)
+    rnd = BatchRound(client, 3, mb.translate, max_batch=64, batcher=mb)
+    res = await asyncio.gather(*[rnd.caller(i)(_payload(f"t{i}")) for i in range(3)])
+    assert [r["translated_text"] for r in res] == ["T0", "T1", "T2"]
+    assert not mb.batch_supported, "round 404 turns batching off for the micro-batcher too"
+    client.log.clear()
+    rnd2 = BatchRound(client, 2, mb.translate, max_batch=64, batcher=mb)
+    await asyncio.gather(*[rnd2.caller(i)(_payload(f"u{i}")) for i in range(2)])
+    assert client.kinds() == ["one", "one"], client.log
+
+
+def test_batch_round():
+    asyncio.run(_round_one_call_for_all())
+    asyncio.run(_round_splits_by_max_batch())
+    asyncio.run(_round_leave_and_second_call())
+    asyncio.run(_round_shares_unsupported_flag())
+
+
+if __name__ == "__main__":
+    test_microbatch_coalescing()
+    print("microbatch: coalescing per pair, flush at max_batch ok")
+    test_microbatch_404_405_fallback()
+    print("microbatch: 404/405 disable batching, 5xx keeps it, per-text fallback ok")
+    test_microbatch_timeout_passthrough()
+    print("microbatch: item timeouts passed through ok")
+    test_batch_round()
+    print("round: one call for all items, max_batch split, leave, shared flag ok")
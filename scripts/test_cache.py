@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Tests for Guard's caches (services/guard/guard/cache.py): the sharded, thread-safe L1
+(ShardedLRUCache), the byte-budgeted L1 with packed/compressed values (ByteBudgetCache), the process-wide SegmentCache used by the spans-only/interleave fallbacks, the persistent L2 tier (SQLiteStore: write-behind, TTL, purge,
+hotness) under TieredCache (read-through, promotion, warm start), and translation cache keys
+separated by resolved style, keep-terms and max_new_tokens (mt_guard.translate_one).
+
+Runs offline (no services needed; the key test needs fastapi + httpx from requirements.txt):
+python scripts/test_cache.py
+"""
+import asyncio
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "services", "guard"))
+from guard.cache import ByteBudgetCache, LRUCache, SegmentCache, ShardedLRUCache, SQLiteStore, TieredCache, _pack_value, _unpack_value  # noqa: E402
+
+
+# ---------- ShardedLRUCache
+
+def test_sharded_capacity_and_stats():
+    c = ShardedLRUCache(maxsize=10, shards=4)
+    assert sorted(sh.maxsize for sh in c._shards) == [2, 2, 3, 3]
+    assert len(ShardedLRUCache(maxsize=3, shards=16)._shards) == 3, "never more shards than entries"
+    for i in range(100):
+        c.set(f"k{i}", {"translated_text": str(i)})
+    st = c.stats()
+    assert st["size"] <= 10 and st["size"] + st["evictions"] == 100 and st["shards"] == 4, st
+    assert c.get("k99") == {"translated_text": "99"}
+    assert c.get("nope") is None
+    st = c.stats()
+    assert st["hits"] == 1 and st["misses"] == 1, st
+
+
+def test_sharded_single_shard_is_lru():
+    c = ShardedLRUCache(maxsize=2, shards=1)
+    c.set("a", {"v": 1})
+    c.set("b", {"v": 2})
+    c.get("a")
+    c.set("c", {"v": 3})
+    assert c.get("b") is None and c.get("a") == {"v": 1} and c.get("c") == {"v": 3}
+
+
+def test_sharded_threads():
+    c = ShardedLRUCache(maxsize=50_000, shards=8)
+    errors = []
+
+    def work(t):
+        try:
+            for i in range(2000):
+                key = f"t{t}-{i}"
+                c.set(key, {"translated_text": key})
+                assert c.get(key) == {"translated_text": key}
+        except Exception as e:  # Fehler aus dem Thread im Haupt-Thread prüfen
+            errors.append(e)
+
+    threads = [threading.Thread(target=work, args=(t,)) for t in range(8)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    st = c.stats()
+    assert not errors and st["size"] == 16_000 and st["hits"] == 16_000 and st["misses"] == 0, (errors, st)
+
+
+# ---------- ByteBudgetCache
+
+VALUES = [
+    {"translated_text": "Hallo Welt", "checks": {"ok": True, "html_ok": True, "num_ok": False}},
+    {"translated_text": "", "checks": {}},
+    {"translated_text": "Grüße 😀 " * 200, "checks": {"ok": False, "error": "missing_placeholders:2", "counts": {"email": 1}, "fallback_used": "spans_only"}},
+    {"translated_text": "x", "checks": {"ok": True, "cache_used": "miss_store", "freeze": {"replaced_total": 3, "missing": 0}}},
+]
+
+
+def test_pack_roundtrip():
+    for value in VALUES:
+        for compress_min in (0, 64, 10**9):
+            flags, blob, comp = _pack_value(value, compress_min)
+            assert _unpack_value(flags, blob, comp) == value, (value, compress_min)
+    _, blob, comp = _pack_value(VALUES[2], 64)
+    assert comp and len(blob) < len(VALUES[2]["translated_text"].encode("utf-8")) // 10
+
+
+def test_byte_budget_eviction():
+    c = ByteBudgetCache(max_bytes=2000, maxsize=1000, compress_min=10**9)
+    for i in range(50):
+        c.set(f"k{i}", {"translated_text": "t" * 100, "checks": {"ok": True}})
+        assert c.stats()["bytes"] <= 2000
+    st = c.stats()
+    assert 0 < st["size"] < 50 and st["evictions"] == 50 - st["size"], st
+    assert c.get("k49") is not None and c.get("k0") is None
+    # Überschreiben zählt die Bytes nicht doppelt
+    before = c.stats()["bytes"]
+    c.set("k49", {"translated_text": "t" * 100, "checks": {"ok": True}})
+    assert c.stats()["bytes"] == before
+
+
+def test_byte_budget_rejects_oversized_and_ttl():
+    c = ByteBudgetCache(max_bytes=1000, compress_min=10**9)
+    c.set("small", {"translated_text": "ok", "checks": {}})
+    c.set("huge", {"translated_text": "x" * 800, "checks": {}})
+    assert c.get("huge") is None and c.get("small") is not None and c.stats()["rejected"] == 1
+    # komprimiert passt derselbe Wert
+    z = ByteBudgetCache(max_bytes=1000, compress_min=64)
+    z.set("huge", {"translated_text": "x" * 800, "checks": {}})
+    assert z.get("huge") == {"translated_text": "x" * 800, "checks": {}} and z.stats()["compressed"] == 1
+    short = ByteBudgetCache(max_bytes=1000, ttl=0)
+    short.set("a", {"translated_text": "a", "checks": {}})
+    time.sleep(0.01)
+    assert short.get("a") is None and short.stats()["bytes"] == 0
+
+
+def test_byte_budget_as_l1():
+    c = TieredCache(ByteBudgetCache(max_bytes=10_000), SQLiteStore(_db("budget.sqlite"), flush_ms=10))
+    c.set("k", VALUES[0])
+    assert c.get("k") == VALUES[0]
+    c.l2.flush()
+    assert c.l2.get("k") == VALUES[0]
+
+
+# ---------- SegmentCache
+
+def test_segment_cache_keys():
+    sc = SegmentCache(maxsize=10)
+    sc.set("en", "de", "Hello", "gl=none", "Hallo")
+    assert sc.get("en", "de", "Hello", "gl=none") == "Hallo"
+    # Sprachpaar und Glossar-Signatur gehören zum Key
+    assert sc.get("en", "fr", "Hello", "gl=none") is None
+    assert sc.get("en", "de", "Hello", "gl=1234abcd") is None
+    assert sc.stats() == {"size": 1, "hits": 1, "misses": 2, "evictions": 0}
+
+
+def test_segment_cache_lru_and_ttl():
+    sc = SegmentCache(maxsize=2)
+    sc.set("en", "de", "a", "gl=none", "A")
+    sc.set("en", "de", "b", "gl=none", "B")
+    assert sc.get("en", "de", "a", "gl=none") == "A"  # a frisch, b ältester
+    sc.set("en", "de", "c", "gl=none", "C")
+    assert sc.get("en", "de", "b", "gl=none") is None
+    assert sc.get("en", "de", "a", "gl=none") == "A" and sc.stats()["evictions"] == 1
+    short = SegmentCache(maxsize=2, ttl=0)
+    short.set("en", "de", "a", "gl=none", "A")
+    time.sleep(0.01)
+    assert short.get("en", "de", "a", "gl=none") is None and short.stats()["size"] == 0
+
+
+# ---------- L2 (SQLiteStore) + TieredCache
+
+# ein Verzeichnis für den ganzen Lauf: Writer-Threads öffnen ihre Connection asynchron
+_TMP = tempfile.mkdtemp(prefix="guard-cache-test-")
+atexit.register(shutil.rmtree, _TMP, True)
+
+
+def _db(name):
+    return os.path.join(_TMP, name)
+
+
+def _value(text, ok=True):
+    return {"translated_text": text, "checks": {"ok": ok, "html_ok": True}}
+
+
+def test_l2_write_behind_and_warm_restart():
+    path = _db("warm.sqlite")
+    tc = TieredCache(LRUCache(maxsize=10), SQLiteStore(path, flush_ms=10))
+    tc.set("k1", _value("eins"))
+    tc.set("k2", _value("zwei"))
+    for _ in range(3):
+        assert tc.get("k2")["translated_text"] == "zwei"  # L1-Treffer zählen als L2-Zugriff
+    tc.l2.flush()
+    assert tc.l2.stats()["size"] == 2 and tc.l2.stats()["pending_writes"] == 0
+
+    # "Neustart": leerer L1, gleiche Datei
+    warm = TieredCache(LRUCache(maxsize=10), SQLiteStore(path, flush_ms=10))
+    assert warm.preload(1) == 1
+    assert warm.l1.get("k2") == _value("zwei"), "hottest entry is preloaded"
+    assert warm.l1.get("k1") is None
+    # Read-through mit Promotion in L1
+    assert warm.get("k1") == _value("eins") and warm.l1.get("k1") == _value("eins")
+    assert asyncio.run(warm.aget("missing")) is None
+    st = warm.stats()
+    assert st["l2"]["hits"] == 1 and st["l2"]["misses"] == 1 and st["l2"]["preloaded"] == 1, st
+
+
+def test_l2_ttl_and_purge():
+    store = SQLiteStore(_db("ttl.sqlite"), ttl=0, flush_ms=10, purge_s=0)
+    store.set("old", _value("alt"))
+    store.flush()
+    time.sleep(0.01)
+    assert store.get("old") is None
+    assert store.hottest(5) == []
+    assert store.purge_expired() == 1 and store.stats()["size"] == 0
+
+
+def test_l2_touches_bounded():
+    # langer flush_ms: der Writer sammelt die Zähler während des Tests nicht ein
+    store = SQLiteStore(_db("touch.sqlite"), flush_ms=60_000, max_pending=2)
+    for key in ("a", "a", "b", "c"):
+        store.touch(key)
+    assert store._touches == {"a": 2, "b": 1} and store.dropped == 1, (store._touches, store.dropped)
+
+
+# ---------- Cache-Keys: Stil, Keep-Terms, max_new_tokens
+
+class _CountingWorker:
+    base = "http://fake-worker"
+
+    def __init__(self):
+        self.calls = 0
+
+    async def translate(self, payload, timeout=None):
+        self.calls += 1
+        return {"translated_text": payload["text"]}
+
+    async def translate_text(self, text, src, tgt, max_new_tokens=None, timeout=None):
+        self.calls += 1
+        return text
+
+    async def translate_batch(self, texts, src, tgt, max_new_tokens=None, timeout=None):
+        self.calls += 1
+        return list(texts)
+
+
+def test_translation_keys_separate_style_and_keep_terms():
+    import mt_guard
+
+    fw = _CountingWorker()
+    mt_guard.WORKER = fw
+    mt_guard.BATCHER.client = fw
+    mt_guard.settings.CACHE_ENABLE = True
+    mt_guard._CACHE = LRUCache(maxsize=100)
+    text = "Thanks for your order, write to info@example.com."
+    variants = [
+        {},
+        {"request_style": mt_guard.StyleSpec(address="du")},
+        {"request_style": mt_guard.StyleSpec(address="sie")},
+        {"request_style": mt_guard.StyleSpec(address="du", gender="neutral")},
+        {"keep_terms": ["order"]},
+        {"keep_terms": ["order", "info"]},
+        # Style-Keep-Terms werden nicht eingefroren: eigener Key-Teil, nicht gleich Context-Keep-Terms
+        {"request_style": mt_guard.StyleSpec(keep_terms=["order"])},
+        {"max_new_tokens": 64},
+    ]
+
+    async def run():
+        for kw in variants:
+            kw = dict(kw)
+            mnt = kw.pop("max_new_tokens", None)
+            _, checks, _ = await mt_guard.translate_one("en", "de", text, mnt, **kw)
+            assert checks.get("cache_used") != "hit", (kw, checks)
+        n = fw.calls
+        # gleiche Signatur → Treffer, auch bei anderer Reihenfolge/Duplikaten der Keep-Terms
+        _, checks, _ = await mt_guard.translate_one("en", "de", text, None, request_style=mt_guard.StyleSpec(address="du"))
+        assert checks.get("cache_used") == "hit", checks
+        _, checks, _ = await mt_guard.translate_one("en", "de", text, None, keep_terms=["info", "order", "order"])
+        assert checks.get("cache_used") == "hit" and fw.calls == n, (checks, fw.calls, n)
+
+    asyncio.run(run())
+    assert mt_guard._CACHE.stats()["size"] == len(variants), mt_guard._CACHE.stats()
+
+
+if __name__ == "__main__":
+    test_sharded_capacity_and_stats()
+    test_sharded_single_shard_is_lru()
+    test_sharded_threads()
+    print("sharded lru: capacity split, LRU per shard, stats, 8 threads ok")
+    test_pack_roundtrip()
+    test_byte_budget_eviction()
+    test_byte_budget_rejects_oversized_and_ttl()
+    print("byte budget: pack/unpack roundtrip, compression, eviction by bytes, oversize reject, TTL ok")
+    test_segment_cache_keys()
+    test_segment_cache_lru_and_ttl()
+    print("segment cache: keys per pair/glossary, LRU, TTL ok")
+    test_l2_write_behind_and_warm_restart()
+    test_l2_ttl_and_purge()
+    test_l2_touches_bounded()
+    test_byte_budget_as_l1()
+    print("l2: write-behind, warm restart by hotness, read-through, TTL/purge, bounded touches ok")
+    test_translation_keys_separate_style_and_keep_terms()
+    print("keys: style, keep-terms and max_new_tokens get separate entries ok")
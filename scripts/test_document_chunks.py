@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Tests for Guard's document-mode splitter (services/guard/invariants.py: document_chunks):
+chunks cover the text exactly, stay within max_chars where a boundary allows it, cut only at
+sentence/line/block-tag ends, never inside an invariant and never inside an open HTML element.
+
+Runs offline (no services needed): python scripts/test_document_chunks.py [--n 2000]
+"""
+import argparse
+import os
+import random
+import re
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "services", "guard"))
+from invariants import document_chunks, find_non_overlapping_matches  # noqa: E402
+
+TAG_RE = re.compile(r"</?([a-zA-Z][a-zA-Z0-9-]*)[^>]*>")
+VOID = {"br", "img", "hr", "input", "meta", "link", "wbr", "source", "area", "col", "embed", "param", "track", "base"}
+
+SENTENCES = [
+    "Free shipping on all orders over 50 EUR.",
+    "Order by 14:30 and it ships on 01.09.2025!",
+    "Questions? Write to service@example.com or call +49 30 1234567.",
+    "See https://shop.example.com/help?id=42 for details.",
+    "Hello {name}, your code is {{code}}.",
+    "Price: 1.234,56 € incl. VAT.",
+    "欢迎光临。我们很高兴为您服务！",
+]
+
+
+def assert_cover(text, chunks):
+    assert chunks and chunks[0][0] == 0 and chunks[-1][1] == len(text), chunks
+    for (a, b), (c, _) in zip(chunks, chunks[1:]):
+        assert b == c and a < b, chunks
+    assert "".join(text[a:b] for a, b in chunks) == text
+
+
+def balanced(s):
+    stack = []
+    for m in TAG_RE.finditer(s):
+        name = m.group(1).lower()
+        if m.group(0).startswith("</"):
+            if not stack or stack[-1] != name:
+                return False
+            stack.pop()
+        elif name not in VOID and not m.group(0).endswith("/>"):
+            stack.append(name)
+    return not stack
+
+
+def cuts(chunks):
+    return [b for _, b in chunks[:-1]]
+
+
+def test_short_text_single_chunk():
+    assert document_chunks("Hello world.", 600) == [(0, 12)]
+
+
+def test_sentence_cuts_within_budget():
+    text = " ".join(SENTENCES[:4] * 10)
+    chunks = document_chunks(text, 120)
+    assert_cover(text, chunks)
+    assert len(chunks) > 1
+    for a, b in chunks:
+        assert b - a <= 120, (a, b)
+    for b in cuts(chunks):
+        assert re.search(r"[.!?]\s+$", text[:b]), text[b - 10:b]
+
+
+def test_never_cut_inside_invariant():
+    # "z. B." / "1.234,56" / URLs enthalten Punkte mit Folgezeichen, aber keinen Schnitt
+    text = " ".join(SENTENCES * 8)
+    spans = find_non_overlapping_matches(text)
+    for max_chars in (40, 80, 200):
+        chunks = document_chunks(text, max_chars)
+        assert_cover(text, chunks)
+        for b in cuts(chunks):
+            for s, e, raw, _ in spans:
+                assert not (s < b < e), (b, raw)
+
+
+def test_no_cut_inside_open_element():
+    para = "<p>" + " ".join(SENTENCES[:3]) + "</p>"
+    text = "\n".join([para] * 12)
+    chunks = document_chunks(text, 150)
+    assert_cover(text, chunks)
+    assert len(chunks) > 1
+    for a, b in chunks:
+        assert balanced(text[a:b]), text[a:b]
+
+
+def test_overlong_element_stays_whole():
+    text = "<div>" + " ".join(SENTENCES * 4) + "</div>"
+    assert document_chunks(text, 100) == [(0, len(text))]
+
+
+def test_void_tags_do_not_block_cuts():
+    text = "<br>".join(SENTENCES * 6) + " <img src='a.png'> " + " ".join(SENTENCES * 3)
+    chunks = document_chunks(text, 150)
+    assert_cover(text, chunks)
+    assert len(chunks) > 1
+
+
+def test_random_documents(n=2000, seed=0):
+    rnd = random.Random(seed)
+    blocks = ["p", "li", "h2", "blockquote"]
+    for _ in range(n):
+        parts = []
+        for _ in range(rnd.randint(1, 12)):
+            body = " ".join(rnd.choice(SENTENCES) for _ in range(rnd.randint(1, 4)))
+            if rnd.random() < 0.3:
+                body = body.replace("Free", "<b>Free</b>", 1)
+            if rnd.random() < 0.6:
+                tag = rnd.choice(blocks)
+                body = f"<{tag}>{body}</{tag}>"
+            parts.append(body)
+        text = rnd.choice(["\n", " ", ""]).join(parts)
+        max_chars = rnd.choice([30, 60, 120, 400])
+        chunks = document_chunks(text, max_chars)
+        assert_cover(text, chunks)
+        spans = find_non_overlapping_matches(text)
+        for b in cuts(chunks):
+            assert not any(s < b < e for s, e, _, _ in spans), (text, b)
+        for a, b in chunks:
+            assert balanced(text[a:b]), (text, text[a:b])
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=2000)
+    args = ap.parse_args()
+    test_short_text_single_chunk()
+    test_sentence_cuts_within_budget()
+    print("sentence cuts: within budget, at sentence ends")
+    test_never_cut_inside_invariant()
+    print("invariants: never cut inside")
+    test_no_cut_inside_open_element()
+    test_overlong_element_stays_whole()
+    test_void_tags_do_not_block_cuts()
+    print("html: chunks balanced, void tags ignored")
+    test_random_documents(args.n)
+    print(f"random documents: {args.n} pass")
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Tests for Guard's glossary matcher (services/guard/guard/glossary.py): freeze_glossary with the
+compiled Aho-Corasick/regex matcher must give exactly the text and mapping of the old term-by-term
+re.sub implementation (embedded below as legacy_freeze_glossary), across random glossaries and texts;
+plus the matcher cache and mtime-aware load_terms.
+
+Runs offline (no services needed): python scripts/test_glossary.py [--n 3000]
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "services", "guard"))
+from guard import glossary  # noqa: E402
+from guard.glossary import compiled_matcher, freeze_glossary, load_terms, unfreeze_glossary  # noqa: E402
+
+
+# ---------- bisherige Implementierung (Term für Term per re.sub), Referenz für die Äquivalenz
+
+def _legacy_sha6(s):
+    return hashlib.sha1(s.encode("utf-8")).hexdigest()[:6].upper()
+
+
+def _legacy_build_matchers(terms, lang_engine):
+    pats = []
+    for t in terms:
+        langs = t.get("langs", ["*"])
+        if "*" not in langs and lang_engine not in langs:
+            continue
+        s = t["term"]
+        if t.get("regex", "0") == "1":
+            pat = re.compile(s, re.U)
+        elif re.search(r"[A-Za-z]", s):
+            pat = re.compile(rf"\b{re.escape(s)}\b", re.U | re.I)
+        else:
+            pat = re.compile(re.escape(s), re.U)
+        pats.append((pat, t["canonical"]))
+    pats.sort(key=lambda x: -len(x[0].pattern))
+    return pats
+
+
+def legacy_freeze_glossary(text, lang_engine, terms):
+    if not terms:
+        return text, []
+    mapping = []
+    t = text
+    idx = 0
+    for pat, canon in _legacy_build_matchers(terms, lang_engine):
+        def repl(m, canon=canon):
+            nonlocal idx
+            ph = f"<|GLO:{idx}:{_legacy_sha6(m.group(0))}|>"
+            mapping.append({"ph": ph, "raw": canon})
+            idx += 1
+            return ph
+        t = pat.sub(repl, t)
+    return t, mapping
+
+
+# ---------- Zufalls-Glossare und -Texte
+
+LITERALS = ["TranceLate", "Trance", "trance", "OpenAI", "Open", "AI", "C++", "node.js", "Q&A", "e-mail",
+            "Ünïcode", "über", "GmbH", "ACME Corp", "ACME", "k8s", "_id", "x", "商品", "商品券", "東京", "서울", "Москва"]
+REGEXES = [r"\bSKU-\d{3,5}\b", r"v\d+\.\d+", r"#[a-z]+", r"[A-Z]{3}\d"]
+WORDS = ["the", "best", "price", "for", "shop", "now", "-", ",", ".", "!", "(", ")", "_", "1", "42", "ß", "日本", "のお", "x1"]
+
+
+def random_terms(rnd):
+    terms = []
+    for s in rnd.sample(LITERALS, rnd.randint(1, 8)):
+        langs = rnd.choice([["*"], ["*"], ["de"], ["fr"], ["de", "fr"]])
+        terms.append({"term": s, "canonical": rnd.choice([s, s.upper(), "Canon" + s]), "langs": langs, "regex": "0"})
+    for s in rnd.sample(REGEXES, rnd.randint(0, 2)):
+        terms.append({"term": s, "canonical": "RX", "langs": ["*"], "regex": "1"})
+    return terms
+
+
+def random_text(rnd):
+    pool = WORDS + LITERALS + [s.upper() for s in LITERALS[:6]] + ["SKU-1234", "v2.10", "#promo", "ABC1"]
+    seps = ["", " ", " ", " ", "-", "_", "/", "\n"]
+    return "".join(rnd.choice(pool) + rnd.choice(seps) for _ in range(rnd.randint(1, 30)))
+
+
+def test_equivalence_random(n=3000, seed=0):
+    rnd = random.Random(seed)
+    for i in range(n):
+        terms = random_terms(rnd)
+        text = random_text(rnd)
+        eng = rnd.choice(["de", "fr", "ja"])
+        got = freeze_glossary(text, eng, terms)
+        exp = legacy_freeze_glossary(text, eng, terms)
+        assert got == exp, (i, text, eng, terms, got, exp)
+
+
+def test_equivalence_cases():
+    terms = [
+        {"term": "TranceLate", "canonical": "TranceLate", "langs": ["*"], "regex": "0"},
+        {"term": "Trance", "canonical": "Trance", "langs": ["*"], "regex": "0"},
+        {"term": "C++", "canonical": "C++", "langs": ["*"], "regex": "0"},
+        {"term": "商品", "canonical": "商品", "langs": ["*"], "regex": "0"},
+        {"term": r"\bSKU-\d{3,5}\b", "canonical": "SKU", "langs": ["*"], "regex": "1"},
+    ]
+    for text in ["Try TranceLate and trance today", "tranceLATE,TRANCE;Trancelated", "C++ and C++x and xC++",
+                 "商品商品券 商品", "SKU-123 SKU-12 SKU-123456", "", "no terms at all"]:
+        assert freeze_glossary(text, "de", terms) == legacy_freeze_glossary(text, "de", terms), text
+
+
+def test_roundtrip():
+    terms = [{"term": "TranceLate", "canonical": "TranceLate", "langs": ["*"], "regex": "0"}]
+    frozen, mapping = freeze_glossary("use trancelate now", "de", terms)
+    assert frozen.startswith("use <|GLO:0:") and len(mapping) == 1
+    out, stats = unfreeze_glossary(frozen.replace("use", "nutze"), mapping)
+    assert out == "nutze TranceLate now" and stats == {"replaced_total": 1, "missing": 0}
+
+
+def test_matcher_cache():
+    terms = [{"term": "ACME", "canonical": "ACME", "langs": ["*"], "regex": "0"}]
+    m1 = compiled_matcher(terms, "de")
+    assert compiled_matcher([dict(t) for t in terms], "de") is m1, "same terms → cached matcher"
+    assert compiled_matcher(terms, "fr") is not m1
+    for i in range(glossary._MATCHERS_MAX + 5):
+        compiled_matcher([{"term": f"T{i}", "canonical": f"T{i}", "langs": ["*"], "regex": "0"}], "de")
+    assert len(glossary._MATCHERS) <= glossary._MATCHERS_MAX
+
+
+def test_load_terms_reloads_on_mtime():
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "glossary.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"terms": [{"term": "ACME"}]}, f)
+        first = load_terms(path, "OpenAI")
+        assert [t["term"] for t in first] == ["ACME", "OpenAI"]
+        first.append({"term": "mutated"})
+        assert len(load_terms(path, "OpenAI")) == 2, "callers get a copy"
+        time.sleep(0.01)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"terms": [{"term": "ACME"}, {"term": "Beta", "regex": True}]}, f)
+        os.utime(path, (time.time() + 5, time.time() + 5))
+        again = load_terms(path, "OpenAI")
+        assert [(t["term"], t["regex"]) for t in again] == [("ACME", "0"), ("Beta", "1"), ("OpenAI", "0")]
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=3000)
+    args = ap.parse_args()
+    test_equivalence_cases()
+    test_equivalence_random(args.n)
+    print(f"freeze_glossary: identical to the term-by-term implementation on {args.n} random glossaries/texts")
+    test_roundtrip()
+    print("roundtrip: freeze/unfreeze ok")
+    test_matcher_cache()
+    test_load_terms_reloads_on_mtime()
+    print("caches: compiled matcher per (terms, engine), bounded; load_terms reloads on mtime ok")
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for Guard's hedged-fallback budget (services/guard/guard/limiter.py HedgeBudget): token bucket
+(deposit/burst/try_acquire), max_inflight, won/wasted counters, the budget's own rolling normal-path
+failure rate per routing key, and that mt_guard's hedge trigger works with learned routing off.
+
+Runs offline (no services needed; the mt_guard check needs fastapi + httpx from requirements.txt):
+python scripts/test_hedge.py
+"""
+import os
+import sys
+
+os.environ.setdefault("CACHE_ENABLE", "0")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "services", "guard"))
+from guard.limiter import HedgeBudget  # noqa: E402
+
+KEY = ("km", True, "high")
+
+
+def test_token_budget():
+    hb = HedgeBudget(ratio=0.5, burst=2.0, max_inflight=8)
+    assert hb.try_acquire() and hb.try_acquire()
+    assert not hb.try_acquire() and hb.denied == 1, "burst used up"
+    hb.deposit()
+    assert not hb.try_acquire(), "half a token is not enough"
+    hb.deposit()
+    assert hb.try_acquire() and hb.hedged == 3
+    for _ in range(100):
+        hb.deposit()
+    assert hb.tokens == 2.0, "deposits are capped at burst"
+
+
+def test_max_inflight():
+    hb = HedgeBudget(ratio=1.0, burst=10.0, max_inflight=2)
+    assert hb.try_acquire() and hb.try_acquire()
+    assert not hb.try_acquire() and hb.inflight == 2
+    hb.finished()
+    assert hb.try_acquire()
+    hb.record(True)
+    hb.record(False)
+    hb.record(False)
+    st = hb.stats()
+    assert (st["hedged_total"], st["won_total"], st["wasted_total"], st["denied_total"]) == (3, 1, 2, 1), st
+
+
+def test_fallback_rate_window():
+    hb = HedgeBudget(window=10, min_samples=5)
+    assert hb.fallback_rate(KEY) is None
+    for _ in range(4):
+        hb.observe(KEY, False)
+    assert hb.fallback_rate(KEY) is None, "too few samples"
+    hb.observe(KEY, True)
+    assert hb.fallback_rate(KEY) == 0.8
+    for _ in range(10):
+        hb.observe(KEY, True)
+    assert hb.fallback_rate(KEY) == 0.0, "old failures drop out of the window"
+    assert hb.fallback_rate(("km", False, "high")) is None, "keys are separate"
+
+
+def test_disabled():
+    hb = HedgeBudget(min_samples=1, enabled=False)
+    assert not hb.try_acquire() and hb.denied == 0
+    hb.observe(KEY, False)
+    assert hb.fallback_rate(KEY) is None
+
+
+def test_trigger_without_routing():
+    import mt_guard
+
+    mt_guard.ROUTER.enabled = False
+    mt_guard.HEDGE = HedgeBudget(window=20, min_samples=10)
+    key = ("km", False, "low")
+    assert not mt_guard._hedge_risky(key, 0)
+    for _ in range(10):
+        mt_guard._record_normal(key, False)
+    assert mt_guard.ROUTER.pass_rate(key, "normal") == (0.0, 0), "router learns nothing while off"
+    assert mt_guard._hedge_risky(key, 0), "hedge statistics are kept anyway"
+    for _ in range(20):
+        mt_guard._record_normal(key, True)
+    assert not mt_guard._hedge_risky(key, 0)
+
+
+if __name__ == "__main__":
+    test_token_budget()
+    test_max_inflight()
+    print("budget: deposit/burst, max_inflight, won/wasted/denied counters ok")
+    test_fallback_rate_window()
+    test_disabled()
+    print("fallback rate: min_samples, rolling window, per key, disabled no-op ok")
+    test_trigger_without_routing()
+    print("trigger: fallback-rate hedging works with ROUTING_ENABLE=0 ok")
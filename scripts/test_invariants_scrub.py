@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Property tests: fused scrub_artifacts / unwrap_spurious_wrappers in Guard's invariants
+must produce exactly the same output as the previous multi-pass implementations.
+
+Runs offline (no services needed): python scripts/test_invariants_scrub.py [--n 20000]
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "services", "guard"))
+import invariants  # noqa: E402
+
+
+def legacy_scrub_artifacts(text):
+    if not text:
+        return text
+    text = text.replace('⁦', '').replace('⁧', '').replace('⁨', '').replace('⁩', '')
+    text = text.replace('♰', '')
+    text = re.sub(r'<\s*♰\s*', '', text)
+    text = re.sub(r'\s*♰\s*>', '', text)
+    text = re.sub(r'<(?![a-zA-Z/])', '', text)
+    text = re.sub(r'(?<![a-zA-Z/])>', '', text)
+    text = re.sub(r'<\s*\|\s*INV\s*:\s*\d+\s*:\s*[0-9A-Fa-f]{4,8}\s*\|\s*>', '', text)
+    text = re.sub(r'\|\s*INV\s*:\s*\d+\s*:\s*[0-9A-Fa-f]{4,8}\s*\|', '', text)
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\s+([.,!?;:])', r'\1', text)
+    text = text.strip()
+    for _ in range(3):
+        s2 = invariants.PIPE_CRC_WRAP_RE.sub(lambda m: m.group("inner"), text)
+        if s2 == text:
+            break
+        text = s2
+    return text
+
+
+def legacy_unwrap_spurious_wrappers(text, mapping, original_text=""):
+    if not text or not mapping:
+        return text
+    non_html_types = {"email", "url", "time", "date", "currency", "number", "ph1", "ph2"}
+    for item in mapping:
+        if item["type"] not in non_html_types:
+            continue
+        raw = item["raw"]
+        escaped_raw = re.escape(raw)
+        wrapper_patterns = [
+            r"<\s*%s\s*>" % escaped_raw,
+            r"\(\s*%s\s*\)" % escaped_raw,
+            r"\[\s*%s\s*\]" % escaped_raw,
+            r"［\s*%s\s*］" % escaped_raw,
+            r"＜\s*%s\s*＞" % escaped_raw,
+            r"〈\s*%s\s*〉" % escaped_raw,
+            r"「\s*%s\s*」" % escaped_raw,
+            r"『\s*%s\s*』" % escaped_raw,
+        ]
+        was_wrapped_in_original = False
+        if original_text:
+            for pattern in wrapper_patterns:
+                if re.search(pattern, original_text, flags=re.UNICODE):
+                    was_wrapped_in_original = True
+                    break
+        if not was_wrapped_in_original:
+            for pattern in wrapper_patterns:
+                text = re.sub(pattern, raw, text, flags=re.UNICODE)
+    return text
+
+
+SCRUB_TOKENS = [
+    "Hallo", "Welt", "a", "Z", "/", "<", ">", "<b>", "</b>", "<br/>", "< p>", "<<", ">>", "<>", " ", "  ", "\n", "\t",
+    " ", "⁦", "⁩", "♰", "<♰", "♰>", " ♰ ", "|INV:1:ABCD|", "| INV : 12 : 0a1b2c |", "<|INV:3:ABCDEF|>",
+    "|INV:2:AB|", "INV:4:ABCD", ".", ",", "!", "?", ";", ":", "|", "|<p>:63ADA5|", "|01.09.2025:F733BC|",
+    "|https://trancelate.it:2BBF2D|", "||x:ABCD||", "5", "12,50 €", "中文",
+]
+
+RAWS = ["5", "12", "12,50 €", "10:30", "01.09.2025", "info@x.de", "https://a.b/c", "{name}", "{{user}}", "1.234"]
+WRAPS = [("<", ">"), ("(", ")"), ("[", "]"), ("［", "］"), ("＜", "＞"), ("〈", "〉"), ("「", "」"), ("『", "』"), ("(", ">"), ("", "")]
+TYPES = ["number", "number", "currency", "time", "date", "email", "url", "ph1", "ph2", "number", "html"]
+
+
+def rand_scrub_text(rnd):
+    return "".join(rnd.choice(SCRUB_TOKENS) for _ in range(rnd.randint(0, 25)))
+
+
+def rand_wrapped(rnd, raws):
+    parts = []
+    for _ in range(rnd.randint(0, 12)):
+        r = rnd.random()
+        if r < 0.5 and raws:
+            o, c = rnd.choice(WRAPS)
+            sp1, sp2 = rnd.choice(["", " ", "  "]), rnd.choice(["", " "])
+            inner = rnd.choice(raws)
+            if rnd.random() < 0.15:  # verschachtelt
+                o2, c2 = rnd.choice(WRAPS)
+                inner = f"{o2}{inner}{c2}"
+            parts.append(f"{o}{sp1}{inner}{sp2}{c}")
+        else:
+            parts.append(rnd.choice(["Preis", " ", "ab", ",", "(", ")", "<", ">", "[x]", "中"]))
+    return "".join(parts)
+
+
+def test_scrub_artifacts_equivalent(n=20000, seed=0):
+    rnd = random.Random(seed)
+    for _ in range(n):
+        t = rand_scrub_text(rnd)
+        assert invariants.scrub_artifacts(t) == legacy_scrub_artifacts(t), repr(t)
+
+
+def test_unwrap_spurious_wrappers_equivalent(n=20000, seed=1):
+    rnd = random.Random(seed)
+    for _ in range(n):
+        raws = rnd.sample(RAWS, rnd.randint(0, 4))
+        mapping = [{"id": i, "crc": "ABCDEF", "raw": r, "type": rnd.choice(TYPES)} for i, r in enumerate(raws)]
+        if raws and rnd.random() < 0.3:  # doppelte raw-Werte im Mapping
+            mapping.append({"id": len(mapping), "crc": "ABCDEF", "raw": raws[0], "type": "number"})
+        out = rand_wrapped(rnd, raws)
+        orig = rand_wrapped(rnd, raws) if rnd.random() < 0.7 else ""
+        assert invariants.unwrap_spurious_wrappers(out, mapping, orig) == \
+            legacy_unwrap_spurious_wrappers(out, mapping, orig), (out, mapping, orig)
+
+
+def _bench():
+    rnd = random.Random(7)
+    raws = [f"{i},{i % 100:02d} €" if i % 3 == 0 else str(1000 + i) for i in range(60)]
+    mapping = [{"id": i, "crc": "ABCDEF", "raw": r, "type": "currency" if "€" in r else "number"} for i, r in enumerate(raws)]
+    out = " ".join(f"<b>Artikel</b> ({r}) Preis {r}." if rnd.random() < 0.1 else f"Artikel {r} Preis" for r in raws)
+    orig = " ".join(f"Artikel {r} Preis" for r in raws)
+    for name, fn in (("legacy", legacy_unwrap_spurious_wrappers), ("fused", invariants.unwrap_spurious_wrappers)):
+        t0 = time.perf_counter()
+        for _ in range(50):
+            fn(out, mapping, orig)
+        print(f"unwrap_spurious_wrappers {name:>6}: {(time.perf_counter() - t0) / 50 * 1000:.2f} ms (60 invariants)")
+    for name, fn in (("legacy", legacy_scrub_artifacts), ("fused", invariants.scrub_artifacts)):
+        t0 = time.perf_counter()
+        for _ in range(200):
+            fn(out)
+        print(f"scrub_artifacts          {name:>6}: {(time.perf_counter() - t0) / 200 * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=20000)
+    args = ap.parse_args()
+    test_scrub_artifacts_equivalent(args.n)
+    print(f"scrub_artifacts: {args.n} random texts identical")
+    test_unwrap_spurious_wrappers_equivalent(args.n)
+    print(f"unwrap_spurious_wrappers: {args.n} random cases identical")
+    _bench()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Tests for Guard's precomputed static endpoints (services/guard/guard/locales.py PrecomputedBody,
+mt_guard /locales, /locales.csv, /capabilities): ETag and If-None-Match → 304, rebuild only when the
+locales file changes, and the memoized BCP-47 normalization in lang.py (same results as uncached,
+callers get copies).
+
+Runs offline (no worker needed, needs fastapi + httpx from requirements.txt):
+python scripts/test_locales_etag.py
+"""
+import atexit
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+_TMP = tempfile.mkdtemp(prefix="guard-locales-")
+atexit.register(shutil.rmtree, _TMP, True)
+LOCALES = os.path.join(_TMP, "locales.json")
+with open(LOCALES, "w", encoding="utf-8") as f:
+    json.dump({"locales": ["de-DE", "en-US", "fr-FR"]}, f)
+
+os.environ["LOCALES_PUBLIC_PATH"] = LOCALES
+os.environ.setdefault("CACHE_ENABLE", "0")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "services", "guard"))
+from fastapi.testclient import TestClient  # noqa: E402
+
+import lang  # noqa: E402
+import mt_guard  # noqa: E402
+from guard.locales import PrecomputedBody, etag_matches  # noqa: E402
+
+
+def test_precomputed_body():
+    builds = []
+    stamp = [1]
+
+    def build():
+        builds.append(1)
+        return b"body-%d" % stamp[0]
+
+    pc = PrecomputedBody(build, lambda: stamp[0])
+    body, etag = pc.get()
+    assert pc.get() == (body, etag) and len(builds) == 1, "unchanged stamp → no rebuild"
+    stamp[0] = 2
+    body2, etag2 = pc.get()
+    assert body2 == b"body-2" and etag2 != etag and len(builds) == 2
+    assert etag.startswith('"') and etag.endswith('"')
+
+
+def test_etag_matches():
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('"x", W/"abc"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"abd"', '"abc"')
+    assert not etag_matches(None, '"abc"') and not etag_matches("", '"abc"')
+
+
+def _endpoint(client, path, media):
+    r = client.get(path)
+    assert r.status_code == 200 and r.headers["content-type"].startswith(media), (path, r.headers)
+    etag = r.headers["etag"]
+    again = client.get(path)
+    assert again.content == r.content and again.headers["etag"] == etag
+    nm = client.get(path, headers={"If-None-Match": etag})
+    assert nm.status_code == 304 and nm.content == b"" and nm.headers["etag"] == etag, path
+    assert client.get(path, headers={"If-None-Match": '"stale"'}).status_code == 200
+    return r, etag
+
+
+def test_endpoints_304():
+    client = TestClient(mt_guard.app)
+    r, _ = _endpoint(client, "/locales", "application/json")
+    data = r.json()
+    assert data["count"] == 3 and [x["bcp47"] for x in data["locales"]] == ["de-DE", "en", "fr-FR"], data
+    r, _ = _endpoint(client, "/locales.csv", "text/csv")
+    assert r.text.splitlines()[0] == "bcp47,engine" and len(r.text.splitlines()) == 4
+    _endpoint(client, "/capabilities", "application/json")
+
+
+def test_rebuild_on_locales_change():
+    client = TestClient(mt_guard.app)
+    old = client.get("/locales").headers["etag"]
+    with open(LOCALES, "w", encoding="utf-8") as f:
+        json.dump({"locales": ["de-DE", "en-US", "fr-FR", "ja-JP"]}, f)
+    st = os.stat(LOCALES)
+    os.utime(LOCALES, ns=(st.st_atime_ns, st.st_mtime_ns + 5_000_000_000))
+    r = client.get("/locales", headers={"If-None-Match": old})
+    assert r.status_code == 200 and r.headers["etag"] != old and r.json()["count"] == 4
+    assert "ja-JP,ja" in client.get("/locales.csv").text
+
+
+def test_normalization_memo():
+    for code in ["de-DE", "de_de", "EN", "zh-Hant", "iw", "jp", "pt_br", "xx-unknown", "", "sr-Latn-RS"]:
+        assert lang.normalize_lang_input(code) == lang._normalize_lang_input(code), code
+        assert lang.canonicalize_bcp47(code) == lang._canonicalize_bcp47(code), code
+    assert "de-DE" in lang._NORM_TABLE, "configured locales are in the warm table"
+    r = lang.normalize_lang_input("de-DE")
+    r["engine"] = "mutated"
+    assert lang.normalize_lang_input("de-DE")["engine"] != "mutated", "callers get a copy"
+    r = lang.normalize_lang_input("xx-unknown")
+    r["engine"] = "mutated"
+    assert lang.normalize_lang_input("xx-unknown")["engine"] != "mutated", "LRU results are copied too"
+
+
+if __name__ == "__main__":
+    test_precomputed_body()
+    test_etag_matches()
+    print("PrecomputedBody/etag_matches: rebuild on stamp change, If-None-Match forms ok")
+    test_endpoints_304()
+    print("endpoints: /locales, /locales.csv, /capabilities stable ETag, 304 without body ok")
+    test_rebuild_on_locales_change()
+    print("endpoints: new body and ETag after the locales file changes ok")
+    test_normalization_memo()
+    print("lang: memoized normalization equals uncached, returns copies ok")
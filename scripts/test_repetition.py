@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Tests for Guard's shared repetition/gibberish detector (services/guard/guard/repetition.py):
+real looping MT outputs must be caught, normal translations must pass, tail_loop must
+agree with a brute-force reference on random strings, and looks_like_gibberish must give the
+old verdict (whitespace tokens) everywhere except on looping tails, which it now also flags.
+
+Runs offline (no services needed): python scripts/test_repetition.py [--n 5000]
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+import unicodedata
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "services", "guard"))
+from guard.repetition import is_degenerate, looks_like_gibberish, tail_loop  # noqa: E402
+
+# (source segment, worker output) – Schleifen wie sie NLLB/Marian bei max_new_tokens liefern
+LOOPING = [
+    ("Free shipping on all orders", "Kostenloser Versand für alle Bestellungen Bestellungen Bestellungen Bestellungen Bestellungen Bestellungen Bestellungen Bestellungen"),
+    ("We are happy to help you.", "Wir helfen Ihnen gerne. Wir helfen Ihnen gerne. Wir helfen Ihnen gerne. Wir helfen Ihnen gerne. Wir helfen Ihnen gerne. Wir helfen Ihn"),
+    ("Thank you for your order", "感谢您的订单的的的的的的的的的的的的的的的的的的的的的的的的的"),
+    ("Contact us", "お問い合わせ、お問い合わせ、お問い合わせ、お問い合わせ、お問い合わせ、お問い合わせ"),
+    ("Add to cart", "Ajouter au panier - - - - - - - - - - - - - - - - - - - - - - - -"),
+    ("Opening hours", "Horario de apertura: de la de la de la de la de la de la de la de la de la de la de la"),
+    ("Privacy policy", "Политика конфиденциальности конфиденциальности конфиденциальности конфиденциальности конфиденциальности"),
+    ("Sale", "ลดราคา ลดราคา ลดราคา ลดราคา ลดราคา ลดราคา ลดราคา ลดราคา ลดราคา ลดราคา"),
+]
+
+NORMAL = [
+    ("Free shipping on all orders over 50 EUR", "Kostenloser Versand für alle Bestellungen über 50 EUR"),
+    ("We are happy to help you with any questions.", "Bei Fragen helfen wir Ihnen gerne weiter."),
+    ("Thank you for your order", "感谢您的订单"),
+    ("Please contact our customer service team.", "お客様サービスチームまでお問い合わせください。"),
+    ("The meeting is on Monday, Tuesday and Wednesday.", "La réunion a lieu lundi, mardi et mercredi."),
+    ("Yes, yes, yes!", "Ja, ja, ja!"),
+    ("Privacy policy and terms of service", "Политика конфиденциальности и условия обслуживания"),
+    ("Bye bye", "Tschüss, tschüss"),
+]
+
+GIBBERISH = [
+    "",
+    "x",
+    "Preis: !!!!!!!!!!!!!!",
+    "<<<<<<<<<<<< >>>>>>>>>",
+    "the the the the the the the the the the and the",
+    "Willkommen in unserem Shop. " + "Angebot des Tages, " * 12,
+]
+
+
+def legacy_looks_like_gibberish(s):
+    t = unicodedata.normalize("NFKC", (s or "")).strip()
+    if not t or len(t) < 2:
+        return True
+    if re.search(r"(.)\1{9,}", t):
+        return True
+    if re.search(r"[<>]{8,}", t):
+        return True
+    toks = t.split()
+    if len(toks) >= 8:
+        c = Counter(toks)
+        top = c.most_common(1)[0][1]
+        if len(c) / len(toks) < 0.2 and top / len(toks) >= 0.25:
+            return True
+    return False
+
+
+def ref_tail_loop(s, max_period=64, min_repeats=4.0):
+    """O(n²) reference: extend the periodic suffix one character at a time for every period."""
+    t = s.rstrip(" \t\r\n.,;:!?…。、！？")
+    n = len(t)
+    best = 0
+    for p in range(1, max_period + 1):
+        L = p
+        while L < n and t[n - L - 1] == t[n - L - 1 + p]:
+            L += 1
+        L = min(L, n)
+        if L >= min_repeats * p and L > best:
+            best = L
+    return best
+
+
+def test_looping_outputs_caught():
+    for src, out in LOOPING:
+        assert is_degenerate(out, src), out
+        assert looks_like_gibberish(out) or len(out) < 64, out
+
+
+def test_normal_outputs_pass():
+    for src, out in NORMAL:
+        assert not is_degenerate(out, src), out
+        assert not looks_like_gibberish(out), out
+
+
+def test_gibberish():
+    for out in GIBBERISH:
+        assert looks_like_gibberish(out), repr(out)
+
+
+def test_tail_loop_matches_reference(n=5000, seed=0):
+    rnd = random.Random(seed)
+    for _ in range(n):
+        alphabet = rnd.choice(["ab", "abc", "ab ", "xyz. "])
+        head = "".join(rnd.choice(alphabet) for _ in range(rnd.randint(0, 20)))
+        unit = "".join(rnd.choice(alphabet) for _ in range(rnd.randint(1, 6)))
+        s = head + unit * rnd.randint(0, 12) + unit[:rnd.randint(0, len(unit))]
+        assert tail_loop(s)[1] == ref_tail_loop(s), (s, tail_loop(s), ref_tail_loop(s))
+
+
+def test_gibberish_matches_legacy(n=5000, seed=0):
+    rnd = random.Random(seed)
+    words = ["gut", "gut,", "!!", "--", "de", "la", "Preis", "é", "ja", "<", ">>", "商品", "x\n", "\n", "a-b", "。"]
+    for _ in range(n):
+        s = rnd.choice(["", " ", "\n"]).join(rnd.choice(words) for _ in range(rnd.randint(0, 40)))
+        if rnd.random() < 0.2:
+            s = s.replace(" ", "\n")
+        got, exp = looks_like_gibberish(s), legacy_looks_like_gibberish(s)
+        if got != exp:
+            t = unicodedata.normalize("NFKC", s).strip()
+            assert got and len(t) >= 64 and tail_loop(t)[1] >= len(t) * 0.5, (s, got, exp)
+    # Satzzeichen am Wort: "ja," und "ja" sind verschiedene Tokens wie bisher
+    s = "ja, ja, ja, ja, nein nein nein nein ja"
+    assert looks_like_gibberish(s) == legacy_looks_like_gibberish(s)
+    assert looks_like_gibberish("!! " * 10 + "Preis"), "punctuation-only tokens count"
+    assert looks_like_gibberish("Zeile\n\n\n\n\n\n\n\n\n\n\nZeile") == legacy_looks_like_gibberish("Zeile\n\n\n\n\n\n\n\n\n\n\nZeile")
+
+
+def _bench():
+    loop = "Kostenloser Versand für alle Bestellungen " + "Bestellungen " * 4000
+    normal = "Kostenloser Versand für alle Bestellungen über 50 EUR, Rückgabe innerhalb von 30 Tagen. " * 40
+    for name, s in (("loop", loop), ("normal", normal)):
+        for label, fn in (("legacy", legacy_looks_like_gibberish), ("shared", looks_like_gibberish)):
+            t0 = time.perf_counter()
+            for _ in range(50):
+                fn(s)
+            print(f"looks_like_gibberish {label:>6} {name:>6}: {(time.perf_counter() - t0) / 50 * 1000:.3f} ms ({len(s)} chars)")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=5000)
+    args = ap.parse_args()
+    test_looping_outputs_caught()
+    print(f"looping outputs: {len(LOOPING)} caught")
+    test_normal_outputs_pass()
+    print(f"normal outputs: {len(NORMAL)} pass")
+    test_gibberish()
+    print(f"gibberish: {len(GIBBERISH)} caught")
+    test_tail_loop_matches_reference(args.n)
+    print(f"tail_loop: {args.n} random strings match reference")
+    test_gibberish_matches_legacy(args.n)
+    print(f"looks_like_gibberish: legacy verdict on {args.n} random strings (plus looping tails)")
+    _bench()
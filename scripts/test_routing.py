@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Tests for Guard's learned fallback routing (services/guard/guard/routing.py): route keys, when
+PathRouter.choose() starts with a fallback path (min_samples, skip_below, margin, only learnable
+paths), exploration of the normal path, the rolling window, and the disabled router.
+
+Runs offline (no services needed): python scripts/test_routing.py
+"""
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "services", "guard"))
+from guard.routing import LEARNABLE, PathRouter, route_key  # noqa: E402
+
+KEY = ("km", True, "high")
+
+
+def _feed(router, path, ok, n, key=KEY):
+    for _ in range(n):
+        router.record(key, path, ok)
+
+
+def test_route_key_buckets():
+    assert route_key("de", False, 0, 100) == ("de", False, "none")
+    assert route_key("de", True, 1, 100) == ("de", True, "low")
+    assert route_key("de", False, 3, 100) == ("de", False, "mid")
+    assert route_key("de", False, 6, 100) == ("de", False, "high")
+    assert route_key("de", False, 1, 0) == ("de", False, "high"), "empty text must not divide by zero"
+
+
+def test_choose_needs_evidence():
+    r = PathRouter(window=50, min_samples=10, skip_below=0.3, margin=0.3, explore=0.0)
+    assert r.choose(KEY) == "normal"
+    _feed(r, "normal", False, 9)
+    _feed(r, "spans_only", True, 10)
+    assert r.choose(KEY) == "normal", "too few normal samples"
+    _feed(r, "normal", False, 1)
+    assert r.choose(KEY) == "spans_only" and r.routed == 1
+    # anderer Key bleibt unberührt
+    assert r.choose(("km", False, "high")) == "normal"
+
+
+def test_choose_thresholds():
+    r = PathRouter(window=20, min_samples=10, skip_below=0.3, margin=0.3, explore=0.0)
+    _feed(r, "normal", True, 4)
+    _feed(r, "normal", False, 6)  # 40 % ≥ skip_below → Normalpfad
+    _feed(r, "interleave", True, 10)
+    assert r.choose(KEY) == "normal"
+    r = PathRouter(window=20, min_samples=10, skip_below=0.3, margin=0.3, explore=0.0)
+    _feed(r, "normal", True, 2)
+    _feed(r, "normal", False, 8)  # 20 %
+    _feed(r, "interleave", True, 4)
+    _feed(r, "interleave", False, 6)  # 40 % < 20 % + margin
+    assert r.choose(KEY) == "normal"
+    _feed(r, "spans_only", True, 8)
+    _feed(r, "spans_only", False, 2)  # 80 %
+    assert r.choose(KEY) == "spans_only"
+    # beste lernbare Quote gewinnt
+    _feed(r, "interleave", True, 20)
+    assert r.choose(KEY) == "interleave"
+
+
+def test_v3b_never_learned():
+    assert "v3b" not in LEARNABLE and "normal" not in LEARNABLE
+    r = PathRouter(window=20, min_samples=5, explore=0.0)
+    _feed(r, "normal", False, 10)
+    _feed(r, "v3b", True, 10)
+    assert r.choose(KEY) == "normal"
+
+
+def test_explore_runs_normal_path():
+    r = PathRouter(window=50, min_samples=5, explore=0.25)
+    _feed(r, "normal", False, 10)
+    _feed(r, "spans_only", True, 10)
+    random.seed(1)
+    picks = [r.choose(KEY) for _ in range(2000)]
+    share = picks.count("normal") / len(picks)
+    assert 0.2 < share < 0.3, share
+    assert set(picks) == {"normal", "spans_only"} and r.routed == picks.count("spans_only")
+
+
+def test_rolling_window_recovers():
+    r = PathRouter(window=10, min_samples=5, explore=0.0)
+    _feed(r, "normal", False, 10)
+    _feed(r, "spans_only", True, 10)
+    assert r.choose(KEY) == "spans_only"
+    _feed(r, "normal", True, 5)  # Exploration zeigt: Normalpfad geht wieder
+    assert r.pass_rate(KEY, "normal") == (0.5, 10)
+    assert r.choose(KEY) == "normal"
+    table = r.table()["routes"]["km|html|high"]
+    assert table["start"] == "normal" and table["paths"]["normal"] == {"n": 10, "success_rate": 0.5}
+
+
+def test_disabled_router():
+    r = PathRouter(min_samples=1, explore=0.0, enabled=False)
+    _feed(r, "normal", False, 10)
+    _feed(r, "spans_only", True, 10)
+    assert r.choose(KEY) == "normal" and r.pass_rate(KEY, "normal") == (0.0, 0)
+    assert r.table() == {"enabled": False, "routed_total": 0, "routes": {}}
+
+
+if __name__ == "__main__":
+    test_route_key_buckets()
+    print("route keys: density buckets ok")
+    test_choose_needs_evidence()
+    test_choose_thresholds()
+    test_v3b_never_learned()
+    print("choose: min_samples, skip_below, margin, best learnable path, no v3b start ok")
+    test_explore_runs_normal_path()
+    test_rolling_window_recovers()
+    print("explore/window: normal path explored, router recovers ok")
+    test_disabled_router()
+    print("disabled: always normal, no statistics ok")
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Tests for Guard's request coalescing (services/guard/guard/singleflight.py, mt_guard.translate_one):
+one leader per key, waiters share its result or error, a cancelled waiter does not cancel the shared
+result, a cancelled leader hands over to a waiter instead of failing it, and only identical requests
+(same resolved style, keep-terms, glossary) are coalesced.
+
+Runs offline (no worker needed; the translate_one tests need fastapi + httpx from requirements.txt):
+python scripts/test_singleflight.py
+"""
+import asyncio
+import os
+import sys
+
+os.environ.setdefault("CACHE_ENABLE", "0")
+os.environ.setdefault("MICROBATCH_MAX_WAIT_MS", "1")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "services", "guard"))
+from guard.singleflight import LeaderCancelled, SingleFlight  # noqa: E402
+
+
+# ---------- SingleFlight
+
+async def _leader_and_waiters():
+    sf = SingleFlight()
+    assert sf.join("k") is None
+    futs = [sf.join("k") for _ in range(3)]
+    assert all(f is futs[0] for f in futs)
+    assert sf.join("other") is None
+    sf.resolve("k", "value")
+    assert await asyncio.gather(*[sf.wait(f) for f in futs]) == ["value"] * 3
+    assert sf.join("k") is None, "resolved key starts a new flight"
+    assert sf.stats() == {"leaders": 3, "coalesced": 3, "handoffs": 0, "inflight": 2}
+
+
+async def _errors_and_shield():
+    sf = SingleFlight()
+    sf.join("k")
+    fut = sf.join("k")
+    waiter = asyncio.ensure_future(sf.wait(fut))
+    other = asyncio.ensure_future(sf.wait(fut))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    await asyncio.sleep(0)
+    assert not fut.cancelled(), "a cancelled waiter must not cancel the shared future"
+    sf.resolve("k", exc=ValueError("boom"))
+    try:
+        await other
+        raise AssertionError("worker error must reach the waiters")
+    except ValueError:
+        pass
+    # Fehler ohne Wartende: keine "exception was never retrieved"-Warnung
+    sf.join("lonely")
+    sf.resolve("lonely", exc=ValueError("nobody listens"))
+
+
+async def _cancel_hands_over():
+    sf = SingleFlight()
+    sf.join("k")
+    fut = sf.join("k")
+    sf.cancel("k")
+    try:
+        await sf.wait(fut)
+        raise AssertionError("waiters are woken with LeaderCancelled")
+    except LeaderCancelled:
+        pass
+    assert sf.join("k") is None and sf.stats()["handoffs"] == 1
+    sf.cancel("absent")
+    assert sf.stats()["handoffs"] == 1
+
+
+def test_singleflight():
+    asyncio.run(_leader_and_waiters())
+    asyncio.run(_errors_and_shield())
+    asyncio.run(_cancel_hands_over())
+
+
+# ---------- translate_one
+
+class _SlowWorker:
+    base = "http://fake-worker"
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.calls = 0
+
+    async def _work(self, text):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return text.upper()
+
+    async def translate(self, payload, timeout=None):
+        return {"translated_text": await self._work(payload["text"])}
+
+    async def translate_text(self, text, src, tgt, max_new_tokens=None, timeout=None):
+        return await self._work(text)
+
+    async def translate_batch(self, texts, src, tgt, max_new_tokens=None, timeout=None):
+        return [await self._work(t) for t in texts]
+
+
+def _install():
+    import mt_guard
+
+    fw = _SlowWorker()
+    mt_guard.WORKER = fw
+    mt_guard.BATCHER.client = fw
+    mt_guard.settings.CACHE_ENABLE = False
+    mt_guard.settings.SINGLEFLIGHT_ENABLE = True
+    return mt_guard, fw
+
+
+async def _coalesces_identical():
+    mt_guard, fw = _install()
+    text = "hello there, friend"
+    res = await asyncio.gather(*[mt_guard.translate_one("en", "de", text) for _ in range(5)])
+    assert [r[0] for r in res] == ["HELLO THERE, FRIEND"] * 5
+    assert fw.calls == 1 and sum(r[1].get("cache_used") == "coalesced" for r in res) == 4, (fw.calls, [r[1] for r in res])
+    # anderer Stil → eigener Lauf
+    fw.calls = 0
+    await asyncio.gather(
+        mt_guard.translate_one("en", "de", text, request_style=mt_guard.StyleSpec(address="du")),
+        mt_guard.translate_one("en", "de", text, request_style=mt_guard.StyleSpec(address="sie")),
+        mt_guard.translate_one("en", "de", text, keep_terms=["friend"]),
+    )
+    assert fw.calls == 3, fw.calls
+
+
+async def _leader_cancel_does_not_fail_waiters():
+    mt_guard, fw = _install()
+    text = "leader goes away"
+    leader = asyncio.ensure_future(mt_guard.translate_one("en", "de", text))
+    await asyncio.sleep(0.01)
+    waiters = [asyncio.ensure_future(mt_guard.translate_one("en", "de", text)) for _ in range(3)]
+    await asyncio.sleep(0.01)
+    handoffs = mt_guard._FLIGHT.stats()["handoffs"]
+    leader.cancel()
+    res = await asyncio.gather(*waiters, return_exceptions=True)
+    assert all(not isinstance(r, Exception) and r[0] == "LEADER GOES AWAY" and r[1]["ok"] for r in res), res
+    # einer der Wartenden übernimmt, die anderen warten auf ihn
+    assert fw.calls == 2 and mt_guard._FLIGHT.stats()["handoffs"] == handoffs + 1, (fw.calls, mt_guard._FLIGHT.stats())
+    assert sum(r[1].get("cache_used") == "coalesced" for r in res) == 2
+    assert mt_guard._FLIGHT.stats()["inflight"] == 0
+
+
+def test_translate_one_coalescing():
+    asyncio.run(_coalesces_identical())
+    asyncio.run(_leader_cancel_does_not_fail_waiters())
+
+
+if __name__ == "__main__":
+    test_singleflight()
+    print("singleflight: leader/waiters, shared errors, shielded waiters, leader handoff ok")
+    test_translate_one_coalescing()
+    print("translate_one: identical requests coalesced, styles apart, cancelled leader hands over ok")
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Tests for Guard's stage timing (services/guard/guard/metrics.py StageTimer, mt_guard.py): per request
+the stage times (debug "timing_ms", Server-Timing, anni_stage_seconds) never add up to more than the
+request's total, and time spent queued behind other batch items lands in `queue`, not in `freeze`.
+
+Runs offline (no worker needed, needs fastapi + httpx from requirements.txt): python scripts/test_stage_timing.py
+"""
+import asyncio
+import os
+import re
+import sys
+
+os.environ.setdefault("CACHE_ENABLE", "0")
+os.environ.setdefault("MICROBATCH_MAX_WAIT_MS", "1")
+os.environ.setdefault("BATCH_CONCURRENCY", "4")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "services", "guard"))
+from fastapi.testclient import TestClient  # noqa: E402
+
+import mt_guard  # noqa: E402
+from guard.metrics import REQUEST_LATENCY, STAGE_SECONDS  # noqa: E402
+
+SENTINEL_RE = re.compile(r"(\[#[^\]]*\]|<\|[^|]*\|>)")
+# 0,5 ms Toleranz: as_ms() rundet jede Stage einzeln
+EPS_MS = 0.5
+
+
+class SlowWorker:
+    """Großschreibender Worker mit fester Latenz pro Call; Sentinels bleiben erhalten."""
+    base = "http://fake-worker"
+
+    def __init__(self, delay=0.02):
+        self.delay = delay
+
+    @staticmethod
+    def _fn(text):
+        return "".join(p if i % 2 else p.upper() for i, p in enumerate(SENTINEL_RE.split(text)))
+
+    async def translate(self, payload, timeout=None):
+        await asyncio.sleep(self.delay)
+        return {"translated_text": self._fn(payload["text"])}
+
+    async def translate_text(self, text, src, tgt, max_new_tokens=None, timeout=None):
+        await asyncio.sleep(self.delay)
+        return self._fn(text)
+
+    async def translate_batch(self, texts, src, tgt, max_new_tokens=None, timeout=None):
+        await asyncio.sleep(self.delay)
+        return [self._fn(t) for t in texts]
+
+    async def health(self, timeout=3.0):
+        return True
+
+    def stats(self):
+        return {}
+
+    async def aclose(self):
+        pass
+
+
+def _client():
+    fw = SlowWorker()
+    mt_guard.WORKER = fw
+    mt_guard.BATCHER.client = fw
+    return TestClient(mt_guard.app)
+
+
+def _hist_sum(h):
+    with h._lock:
+        return sum(v[1] for v in h._series.values())
+
+
+def _server_timing(header):
+    stages = {}
+    for part in header.split(","):
+        m = re.match(r"\s*([\w-]+);dur=([\d.]+)", part)
+        if m:
+            stages[m.group(1)] = float(m.group(2))
+    return stages
+
+
+def _assert_within_total(timing_ms):
+    timing_ms = dict(timing_ms)
+    total = timing_ms.pop("total")
+    assert sum(timing_ms.values()) <= total + EPS_MS * len(timing_ms), (sum(timing_ms.values()), total, timing_ms)
+
+
+def test_translate_stages_within_total():
+    client = _client()
+    stage0, lat0 = _hist_sum(STAGE_SECONDS), _hist_sum(REQUEST_LATENCY)
+    r = client.post("/translate", json={"source": "en", "target": "de", "text": "Write to info@example.com by 10:30.", "debug": True})
+    assert r.status_code == 200, r.text
+    _assert_within_total(r.json()["debug"]["timing_ms"])
+    st = _server_timing(r.headers["Server-Timing"])
+    total = st.pop("total")
+    assert sum(st.values()) <= total + 0.1 * len(st), r.headers["Server-Timing"]
+    assert _hist_sum(STAGE_SECONDS) - stage0 <= _hist_sum(REQUEST_LATENCY) - lat0 + 1e-6
+
+
+def test_batch_items_queue_not_freeze():
+    client = _client()
+    items = [{"id": str(i), "text": f"Item <b>{i}</b> ships to a{i}@example.com on 01.09.2025."} for i in range(120)]
+    stage0, lat0 = _hist_sum(STAGE_SECONDS), _hist_sum(REQUEST_LATENCY)
+    r = client.post("/translate_batch", json={"source": "en", "target": "de", "items": items, "debug": True})
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert body["counts"]["ok"] == len(items), body["counts"]
+    for it in body["items"]:
+        tm = it["debug"]["timing_ms"]
+        _assert_within_total(tm)
+        # Freeze ist reine CPU-Zeit eines Items, das Warten hinter den anderen steht unter queue
+        assert tm.get("freeze", 0.0) < 0.5 * tm["total"], tm
+    assert any(it["debug"]["timing_ms"].get("queue", 0.0) > 0.0 for it in body["items"])
+    # Histogramme: je Item höchstens so viel Stage-Zeit wie Gesamtlatenz
+    assert _hist_sum(STAGE_SECONDS) - stage0 <= _hist_sum(REQUEST_LATENCY) - lat0 + 1e-6
+
+
+def test_document_stages_within_total():
+    client = _client()
+    text = " ".join(f"Sentence {i} names a{i}@example.com and https://shop.example.com/p/{i}." for i in range(60))
+    assert len(text) >= mt_guard.settings.DOC_MODE_MIN_CHARS
+    r = client.post("/translate", json={"source": "en", "target": "de", "text": text, "debug": True})
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert body["checks"]["doc_mode"]["chunks"] > 1, body["checks"]
+    _assert_within_total(body["debug"]["timing_ms"])
+
+
+if __name__ == "__main__":
+    test_translate_stages_within_total()
+    print("translate: timing_ms, Server-Timing and histograms within total")
+    test_batch_items_queue_not_freeze()
+    print("batch: per-item stages within total, queueing booked as queue")
+    test_document_stages_within_total()
+    print("document mode: chunk stages scaled into the document total")
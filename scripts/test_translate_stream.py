@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+End-to-end tests for Guard's POST /translate_stream (services/guard/mt_guard.py, guard/stream.py):
+NDJSON and JSON-array bodies, chunked uploads, invalid lines, the optional request header line
+(context/style/glossary) and the final summary, against a fake worker through FastAPI's TestClient.
+
+Runs offline (no worker needed, needs fastapi + httpx from requirements.txt):
+python scripts/test_translate_stream.py [--n 3000]
+"""
+import argparse
+import json
+import os
+import re
+import sys
+
+os.environ.setdefault("CACHE_ENABLE", "0")
+os.environ.setdefault("MICROBATCH_MAX_WAIT_MS", "1")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "services", "guard"))
+from fastapi.testclient import TestClient  # noqa: E402
+
+import mt_guard  # noqa: E402
+
+SENTINEL_RE = re.compile(r"(\[#[^\]]*\]|<\|[^|]*\|>)")
+
+
+class FakeWorker:
+    """Übersetzt durch Großschreiben; Sentinels (keep_terms, Invarianten) bleiben erhalten."""
+    base = "http://fake-worker"
+
+    def __init__(self):
+        self.calls = 0
+
+    @staticmethod
+    def _fn(text):
+        return "".join(p if i % 2 else p.upper() for i, p in enumerate(SENTINEL_RE.split(text)))
+
+    async def translate(self, payload, timeout=None):
+        self.calls += 1
+        return {"translated_text": self._fn(payload["text"])}
+
+    async def translate_text(self, text, src, tgt, max_new_tokens=None, timeout=None):
+        self.calls += 1
+        return self._fn(text)
+
+    async def translate_batch(self, texts, src, tgt, max_new_tokens=None, timeout=None):
+        self.calls += 1
+        return [self._fn(t) for t in texts]
+
+    async def health(self, timeout=3.0):
+        return True
+
+    def stats(self):
+        return {}
+
+    async def aclose(self):
+        pass
+
+
+def _client():
+    fw = FakeWorker()
+    mt_guard.WORKER = fw
+    mt_guard.BATCHER.client = fw
+    return TestClient(mt_guard.app), fw
+
+
+def _post(client, body, **params):
+    params = {"source": "en", "target": "de", **params}
+    r = client.post("/translate_stream", params=params, content=body, headers={"Content-Type": "application/x-ndjson"})
+    assert r.status_code == 200, (r.status_code, r.text)
+    lines = [json.loads(ln) for ln in r.text.splitlines() if ln.strip()]
+    assert lines and lines[-1].get("done") is True, lines[-1:]
+    return lines[:-1], lines[-1]
+
+
+def _ndjson(items):
+    return "".join(json.dumps(it) + "\n" for it in items).encode("utf-8")
+
+
+def test_small_ndjson_body():
+    client, _ = _client()
+    items = ["hello world", {"id": "b", "text": "good morning"}, "thank you"]
+    lines, summary = _post(client, _ndjson(items))
+    assert summary["counts"] == {"total": 3, "ok": 3, "failed": 0}, summary
+    by_index = {ln["index"]: ln for ln in lines}
+    assert sorted(by_index) == [0, 1, 2]
+    assert by_index[0]["translated_text"] == "HELLO WORLD"
+    assert by_index[1]["id"] == "b" and by_index[1]["translated_text"] == "GOOD MORNING"
+
+
+def test_json_array_body():
+    client, _ = _client()
+    lines, summary = _post(client, json.dumps(["one", "two"]).encode("utf-8"))
+    assert summary["counts"]["total"] == 2 and summary["counts"]["ok"] == 2, summary
+    assert sorted(ln["translated_text"] for ln in lines) == ["ONE", "TWO"]
+
+
+def test_chunked_upload(n=3000):
+    client, fw = _client()
+    items = [{"id": str(i), "text": f"line number {i}"} for i in range(n)]
+    body = _ndjson(items)
+
+    def chunks(size=997):
+        # ungerade Chunkgröße: Zeilen werden über Chunkgrenzen zerteilt
+        for i in range(0, len(body), size):
+            yield body[i:i + size]
+
+    lines, summary = _post(client, chunks())
+    assert summary["counts"] == {"total": n, "ok": n, "failed": 0}, summary
+    got = {ln["id"]: ln["translated_text"] for ln in lines}
+    assert len(got) == n
+    for i in range(n):
+        assert got[str(i)] == f"LINE NUMBER {i}", (i, got[str(i)])
+    assert fw.calls > 0
+
+
+def test_bad_and_empty_lines():
+    client, _ = _client()
+    body = b'"ok text"\n{not json\n\n{"text": "  "}\n'
+    lines, summary = _post(client, body)
+    assert summary["counts"] == {"total": 3, "ok": 1, "failed": 2}, summary
+    errors = sorted(ln["checks"].get("error", "") for ln in lines if not ln["checks"]["ok"])
+    assert errors[0] == "Text cannot be empty" and errors[1].startswith("invalid_json"), errors
+
+
+def test_header_line_applies_request_fields():
+    client, _ = _client()
+    header = {"context": {"keep_terms": ["order"]}}
+    lines, summary = _post(client, _ndjson([header, "please check your order at shop@example.com", "no terms here"]))
+    assert summary["counts"]["total"] == 2, summary
+    by_index = {ln["index"]: ln["translated_text"] for ln in lines}
+    assert by_index[0] == "PLEASE CHECK YOUR order AT shop@example.com", by_index
+    assert by_index[1] == "NO TERMS HERE"
+
+
+def test_invalid_header_is_400():
+    client, _ = _client()
+    r = client.post("/translate_stream", params={"source": "en", "target": "de"},
+                    content=_ndjson([{"style": {"address": "du"}, "bogus": 1}, "x"]))
+    assert r.status_code == 400, (r.status_code, r.text)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=3000)
+    args = ap.parse_args()
+    test_small_ndjson_body()
+    test_json_array_body()
+    print("bodies: small NDJSON and JSON array, every item + summary")
+    test_chunked_upload(args.n)
+    print(f"chunked upload: {args.n} items streamed back")
+    test_bad_and_empty_lines()
+    print("errors: invalid JSON and empty text get their own lines")
+    test_header_line_applies_request_fields()
+    test_invalid_header_is_400()
+    print("header line: keep_terms applied, invalid header rejected")
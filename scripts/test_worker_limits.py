@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Tests for Guard's worker-call protection (services/guard/guard/limiter.py, worker.py, pool.py):
+AIMD limiter (queueing, growth/backoff, per-bucket RTT baseline, cancellation), circuit breaker
+(open/half-open/close, cancelled probes), WorkerClient._post cancellation handling and connect-error
+retries, the
+WorkerPool (least-outstanding choice, failover, fallback backends, ejection) and Guard's
+/translate answer while the breaker is open (source text, fallback_used=circuit_open, Retry-After).
+
+Runs offline (no services needed, needs httpx from requirements.txt; the /translate check needs
+fastapi as well): python scripts/test_worker_limits.py
+"""
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+os.environ.setdefault("CACHE_ENABLE", "0")
+os.environ.setdefault("MICROBATCH_MAX_WAIT_MS", "1")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "services", "guard"))
+from guard.limiter import AIMDLimiter, CircuitBreaker  # noqa: E402
+from guard.pool import BackendSpec, WorkerPool  # noqa: E402
+from guard.worker import CircuitOpenError, WorkerClient, WorkerError, _rtt_key  # noqa: E402
+
+
+# ---------- AIMDLimiter
+
+async def _limiter_queues_beyond_limit():
+    lim = AIMDLimiter(initial=2, min_limit=1, max_limit=4)
+    await lim.acquire()
+    await lim.acquire()
+    waiter = asyncio.ensure_future(lim.acquire())
+    await asyncio.sleep(0)
+    assert not waiter.done() and lim.stats()["waiting"] == 1
+    lim.release("/translate", 0.01, True)
+    await asyncio.sleep(0)
+    assert waiter.done() and lim.inflight == 2
+
+
+async def _limiter_cancelled_waiter_frees_nothing():
+    lim = AIMDLimiter(initial=1)
+    await lim.acquire()
+    waiter = asyncio.ensure_future(lim.acquire())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    await asyncio.sleep(0)
+    lim.cancel()
+    assert lim.inflight == 0 and lim.stats()["waiting"] == 0
+
+
+def test_limiter_queueing():
+    asyncio.run(_limiter_queues_beyond_limit())
+    asyncio.run(_limiter_cancelled_waiter_frees_nothing())
+
+
+def test_limiter_grows_when_saturated_and_backs_off():
+    lim = AIMDLimiter(initial=2, min_limit=1, max_limit=4, backoff=0.5)
+    for _ in range(40):
+        lim.inflight = int(lim.limit)
+        lim.release("/translate", 0.01, True)
+    assert int(lim.limit) == 4, lim.limit
+    lim.inflight = 1
+    lim._last_decrease = 0.0
+    lim.release("/translate", 0.01, False)
+    assert int(lim.limit) == 2 and lim.decreases == 1
+    for _ in range(5):
+        lim.inflight = 1
+        lim._last_decrease = 0.0
+        lim.release("/translate", 0.01, False)
+    assert lim.limit == lim.min_limit
+
+
+def test_limiter_not_saturated_does_not_grow():
+    lim = AIMDLimiter(initial=8)
+    for _ in range(20):
+        lim.inflight = 1
+        lim.release("/translate", 0.01, True)
+    assert lim.limit == 8.0 and lim.increases == 0
+
+
+def test_rtt_baseline_per_batch_bucket():
+    assert _rtt_key("/translate", {"text": "a"}) == "/translate"
+    assert _rtt_key("/translate_batch", {"texts": ["a"]}) == "/translate_batch:1"
+    assert _rtt_key("/translate_batch", {"texts": ["a"] * 3}) == "/translate_batch:4"
+    assert _rtt_key("/translate_batch", {"texts": ["a"] * 64}) == "/translate_batch:64"
+    lim = AIMDLimiter(initial=4, tolerance=2.0)
+    lim.inflight = 1
+    lim.release(_rtt_key("/translate_batch", {"texts": ["a"]}), 0.05, True)
+    # ein 64er-Batch braucht länger, ist aber keine Überlast: eigener Bucket, kein Decrease
+    lim.inflight = 1
+    lim.release(_rtt_key("/translate_batch", {"texts": ["a"] * 64}), 1.0, True)
+    assert lim.decreases == 0, lim.stats()
+
+
+# ---------- CircuitBreaker
+
+def test_breaker_opens_and_recovers():
+    br = CircuitBreaker(error_rate=0.5, window=10, min_requests=4, open_s=0.05, half_open_probes=1)
+    for ok in (True, False, False, True):
+        assert br.allow()
+        br.record(ok)
+    assert br.state == "open" and not br.allow()
+    time.sleep(0.06)
+    assert br.allow() and br.state == "half_open"
+    assert not br.allow()  # nur ein Probe
+    br.record(False)
+    assert br.state == "open"
+    time.sleep(0.06)
+    assert br.allow()
+    br.record(True)
+    assert br.state == "closed" and br.allow()
+
+
+def test_breaker_cancelled_probe_is_returned():
+    br = CircuitBreaker(error_rate=0.5, window=4, min_requests=2, open_s=0.0, half_open_probes=1)
+    br.record(False)
+    br.record(False)
+    assert br.state == "open"
+    assert br.allow() and br.state == "half_open"
+    br.cancel()
+    assert br.allow(), "cancelled probe must not block the half-open breaker"
+
+
+# ---------- WorkerClient._post: Abbruch ist kein Fehler
+
+class _SlowHttp:
+    async def post(self, *a, **k):
+        await asyncio.sleep(10)
+
+    async def aclose(self):
+        pass
+
+
+async def _post_cancelled():
+    lim = AIMDLimiter(initial=4)
+    br = CircuitBreaker(min_requests=1, error_rate=0.01)
+    wc = WorkerClient("http://worker", limiter=lim, breaker=br)
+    wc._client = _SlowHttp()
+    task = asyncio.ensure_future(wc.translate({"source": "en", "target": "de", "text": "x"}))
+    await asyncio.sleep(0.01)
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    assert lim.inflight == 0 and lim.decreases == 0 and lim.limit == 4.0, lim.stats()
+    assert br.state == "closed" and br.stats()["window"] == 0, br.stats()
+
+
+def test_post_cancellation_not_a_failure():
+    asyncio.run(_post_cancelled())
+
+
+# ---------- WorkerClient._post: Verbindungsfehler werden wiederholt
+
+class _FlakyHttp:
+    """Wirft zuerst `errors` (Exceptions), danach 200."""
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        self.posts = 0
+
+    async def post(self, path, json=None, **k):
+        self.posts += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return httpx.Response(200, json={"translated_text": json["text"].upper()})
+
+    async def aclose(self):
+        pass
+
+
+def _req():
+    return httpx.Request("POST", "http://worker/translate")
+
+
+async def _post_retries_connect_errors():
+    lim = AIMDLimiter(initial=4)
+    br = CircuitBreaker(min_requests=10)
+    wc = WorkerClient("http://worker", retries=2, limiter=lim, breaker=br)
+    wc._client = _FlakyHttp([httpx.ConnectError("refused", request=_req()), httpx.ConnectTimeout("slow", request=_req())])
+    res = await wc.translate({"source": "en", "target": "de", "text": "x"})
+    assert res == {"translated_text": "X"} and wc._client.posts == 3
+    assert lim.inflight == 0 and br.stats()["window"] == 3, (lim.stats(), br.stats())
+
+
+async def _post_connect_retries_exhausted():
+    wc = WorkerClient("http://worker", retries=1)
+    wc._client = _FlakyHttp([httpx.ConnectError("refused", request=_req())] * 3)
+    try:
+        await wc.translate({"source": "en", "target": "de", "text": "x"})
+        raise AssertionError("last connect error must reach the caller")
+    except httpx.ConnectError:
+        pass
+    assert wc._client.posts == 2
+
+
+async def _post_no_retry_after_send():
+    # ReadTimeout: Request kann beim Worker angekommen sein → kein Retry
+    wc = WorkerClient("http://worker", retries=3)
+    wc._client = _FlakyHttp([httpx.ReadTimeout("read", request=_req())])
+    try:
+        await wc.translate({"source": "en", "target": "de", "text": "x"})
+        raise AssertionError("read timeout is not retried")
+    except httpx.ReadTimeout:
+        pass
+    assert wc._client.posts == 1
+
+
+async def _post_no_connect_retry_when_breaker_open():
+    br = CircuitBreaker(error_rate=0.5, window=4, min_requests=1, open_s=60.0)
+    wc = WorkerClient("http://worker", retries=3, breaker=br)
+    wc._client = _FlakyHttp([httpx.ConnectError("refused", request=_req())] * 3)
+    try:
+        await wc.translate({"source": "en", "target": "de", "text": "x"})
+        raise AssertionError("connect error must reach the caller")
+    except httpx.ConnectError:
+        pass
+    assert wc._client.posts == 1 and br.state == "open"
+
+
+def test_post_connect_retries():
+    asyncio.run(_post_retries_connect_errors())
+    asyncio.run(_post_connect_retries_exhausted())
+    asyncio.run(_post_no_retry_after_send())
+    asyncio.run(_post_no_connect_retry_when_breaker_open())
+
+
+# ---------- WorkerPool
+
+class _FakeClient:
+    def __init__(self, spec, log):
+        self.spec = spec
+        self.log = log
+        self.breaker = CircuitBreaker(enabled=False)
+        self.limiter = None
+        self.status = 200
+        self.delay = 0.0
+        self.healthy = True
+
+    async def translate(self, payload, timeout=None):
+        self.log.append(self.spec.name)
+        await asyncio.sleep(self.delay)
+        if self.status != 200:
+            raise WorkerError(self.status)
+        return {"translated_text": self.spec.name}
+
+    async def health(self, timeout=3.0):
+        return self.healthy
+
+    def stats(self):
+        return {}
+
+    async def aclose(self):
+        pass
+
+
+def _pool(specs, **kw):
+    log = []
+    pool = WorkerPool(specs, lambda s: _FakeClient(s, log), health_interval_s=0, **kw)
+    return pool, {b.spec.name: b.client for b in pool.backends}, log
+
+
+async def _pool_least_outstanding():
+    pool, clients, log = _pool([BackendSpec("a", "http://a"), BackendSpec("b", "http://b")])
+    clients["a"].delay = clients["b"].delay = 0.02
+    await asyncio.gather(*[pool.translate({"text": str(i)}) for i in range(10)])
+    assert log.count("a") == 5 and log.count("b") == 5, log
+
+
+async def _pool_weights():
+    pool, clients, log = _pool([BackendSpec("a", "http://a", 3.0), BackendSpec("b", "http://b", 1.0)])
+    clients["a"].delay = clients["b"].delay = 0.02
+    await asyncio.gather(*[pool.translate({"text": str(i)}) for i in range(8)])
+    assert log.count("a") == 6 and log.count("b") == 2, log
+
+
+async def _pool_failover_and_4xx():
+    pool, clients, log = _pool([BackendSpec("a", "http://a"), BackendSpec("b", "http://b")])
+    clients["a"].status = 503
+    for _ in range(6):
+        assert (await pool.translate({"text": "x"}))["translated_text"] == "b"
+    assert pool.failovers >= 1
+    clients["a"].status = clients["b"].status = 400
+    try:
+        await pool.translate({"text": "x"})
+        raise AssertionError("4xx must not fail over")
+    except WorkerError as e:
+        assert e.status_code == 400
+    assert len(log) - log.count("b") - log.count("a") == 0
+
+
+async def _pool_fallback_and_eject():
+    pool, clients, log = _pool([BackendSpec("a", "http://a"), BackendSpec("fb", "http://fb", fallback=True)], eject_after=2)
+    await pool.translate({"text": "x"})
+    assert log == ["a"]
+    clients["a"].healthy = False
+    await pool.probe()
+    assert pool.backends[0].healthy  # erst nach eject_after Fehlschlägen
+    await pool.probe()
+    assert not pool.backends[0].healthy
+    assert (await pool.translate({"text": "x"}))["translated_text"] == "fb"
+    clients["a"].healthy = True
+    await pool.probe()
+    assert (await pool.translate({"text": "x"}))["translated_text"] == "a"
+
+
+def test_pool():
+    asyncio.run(_pool_least_outstanding())
+    asyncio.run(_pool_weights())
+    asyncio.run(_pool_failover_and_4xx())
+    asyncio.run(_pool_fallback_and_eject())
+
+
+# ---------- Guard /translate bei offenem Breaker
+
+class _OpenWorker:
+    base = "http://fake-worker"
+
+    async def translate(self, payload, timeout=None):
+        raise CircuitOpenError()
+
+    async def translate_text(self, text, src, tgt, max_new_tokens=None, timeout=None):
+        raise CircuitOpenError()
+
+    async def translate_batch(self, texts, src, tgt, max_new_tokens=None, timeout=None):
+        raise CircuitOpenError()
+
+
+def test_translate_circuit_open():
+    from fastapi.testclient import TestClient
+    import mt_guard
+
+    fw = _OpenWorker()
+    mt_guard.WORKER = fw
+    mt_guard.BATCHER.client = fw
+    client = TestClient(mt_guard.app)
+    r = client.post("/translate", json={"source": "en", "target": "de", "text": "Hello world"})
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert body["translated_text"] == "Hello world", "open breaker answers with the source text"
+    assert body["checks"]["fallback_used"] == "circuit_open" and body["checks"]["ok"] is False, body
+    assert int(r.headers["retry-after"]) >= 1
+    r = client.post("/translate_batch", json={"source": "en", "target": "de", "items": [{"text": "a b"}, {"text": "c d"}]})
+    assert r.status_code == 200 and [it["translated_text"] for it in r.json()["items"]] == ["a b", "c d"], r.text
+
+
+if __name__ == "__main__":
+    test_limiter_queueing()
+    test_limiter_grows_when_saturated_and_backs_off()
+    test_limiter_not_saturated_does_not_grow()
+    test_rtt_baseline_per_batch_bucket()
+    print("limiter: queueing, AIMD, per-bucket baseline ok")
+    test_breaker_opens_and_recovers()
+    test_breaker_cancelled_probe_is_returned()
+    print("breaker: open/half-open/close, cancelled probe ok")
+    test_post_cancellation_not_a_failure()
+    print("worker: cancelled call is neither failure nor RTT sample")
+    test_post_connect_retries()
+    print("worker: connect errors retried (not after send, not with open breaker) ok")
+    test_pool()
+    print("pool: least-outstanding, weights, failover, fallback/eject ok")
+    test_translate_circuit_open()
+    print("guard: open breaker → source text, fallback_used=circuit_open, Retry-After ok")
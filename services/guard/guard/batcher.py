@@ -0,0 +1,205 @@
+import asyncio
+from typing import Any, Dict, List, Tuple
+
+from .metrics import BATCH_SIZE
+from .worker import WorkerClient, WorkerError
+
+
+def _batch_unsupported(e: Exception) -> bool:
+    """Worker ohne /translate_batch (404/405): Batching dauerhaft abschalten statt je Batch scheitern."""
+    return isinstance(e, WorkerError) and e.status_code in (404, 405)
+
+
+def _batch_timeout(timeouts: List[float | None]) -> float | None:
+    # ein Aufrufer ohne Timeout → Client-Default; sonst der großzügigste Item-Timeout
+    return None if any(t is None for t in timeouts) else max(timeouts)
+
+
+def _spawn(tasks: set, coro) -> asyncio.Task:
+    """Task starten und Referenz halten, bis er fertig ist (sonst kann der GC ihn einsammeln)."""
+    task = asyncio.ensure_future(coro)
+    tasks.add(task)
+    task.add_done_callback(tasks.discard)
+    return task
+
+
+class MicroBatcher:
+    """
+    Sammelt Einzel-Übersetzungen aller laufenden Requests pro (src, tgt, max_new_tokens)
+    für max_wait_ms bzw. bis max_batch erreicht ist und schickt sie als EIN /translate_batch.
+    Schlägt der Batch fehl, wird pro Text einzeln übersetzt; antwortet der Worker auf
+    /translate_batch mit 404/405, bleibt Batching danach aus (batch_supported=False).
+    Gleiche Signatur wie WorkerClient.translate → als call_worker verwendbar.
+    """
+    def __init__(self, client: WorkerClient, max_wait_ms: float = 5.0, max_batch: int = 16, enabled: bool = True):
+        self.client = client
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.max_batch = max(1, max_batch)
+        self.enabled = enabled and self.max_batch > 1
+        self.batch_supported = True
+        self._pending: Dict[Tuple, List[Tuple[str, asyncio.Future, float | None]]] = {}
+        self._timers: Dict[Tuple, asyncio.TimerHandle] = {}
+        self._tasks: set = set()
+        self.batches = 0
+        self.items = 0
+        self.fallbacks = 0
+
+    async def translate(self, payload: Dict[str, Any], timeout: float | None = None) -> Dict[str, Any]:
+        if not (self.enabled and self.batch_supported):
+            return await self.client.translate(payload, timeout)
+        loop = asyncio.get_running_loop()
+        key = (payload["source"], payload["target"], payload.get("max_new_tokens"))
+        fut: asyncio.Future = loop.create_future()
+        queue = self._pending.setdefault(key, [])
+        queue.append((payload.get("text", ""), fut, timeout))
+        if len(queue) >= self.max_batch:
+            self._flush(key)
+        elif len(queue) == 1:
+            self._timers[key] = loop.call_later(self.max_wait, self._flush, key)
+        return await fut
+
+    def _flush(self, key: Tuple):
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        items = self._pending.pop(key, None)
+        if items:
+            _spawn(self._tasks, self._dispatch(key, items))
+
+    async def _dispatch(self, key: Tuple, items: List[Tuple[str, asyncio.Future, float | None]]):
+        src, tgt, max_new_tokens = key
+        self.batches += 1
+        self.items += len(items)
+        BATCH_SIZE.observe(len(items), kind="microbatch")
+        try:
+            if len(items) == 1:
+                outs = [await self.client.translate_text(items[0][0], src, tgt, max_new_tokens, items[0][2])]
+            elif not self.batch_supported:
+                raise WorkerError(404)
+            else:
+                outs = await self.client.translate_batch([t for t, _, _ in items], src, tgt, max_new_tokens, _batch_timeout([to for _, _, to in items]))
+                if len(outs) != len(items):
+                    raise ValueError(f"batch_size_mismatch:{len(outs)}!={len(items)}")
+        except Exception as e:
+            if len(items) == 1:
+                self._resolve(items[0][1], exc=e)
+                return
+            if _batch_unsupported(e):
+                self.batch_supported = False
+            # Einzel-Fallback (parallel), Fehler landen beim jeweiligen Aufrufer
+            self.fallbacks += 1
+            results = await asyncio.gather(
+                *[self.client.translate_text(t, src, tgt, max_new_tokens, to) for t, _, to in items],
+                return_exceptions=True,
+            )
+            for (_, fut, _), res in zip(items, results):
+                if isinstance(res, Exception):
+                    self._resolve(fut, exc=res)
+                else:
+                    self._resolve(fut, {"translated_text": res})
+            return
+        for (_, fut, _), out in zip(items, outs):
+            self._resolve(fut, {"translated_text": out or ""})
+
+    @staticmethod
+    def _resolve(fut: asyncio.Future, value: Any = None, exc: Exception | None = None):
+        if fut.done():  # Aufrufer bereits abgebrochen
+            return
+        if exc is not None:
+            fut.set_exception(exc)
+        else:
+            fut.set_result(value)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "batch_supported": self.batch_supported,
+            "max_wait_ms": round(self.max_wait * 1000, 2),
+            "max_batch": self.max_batch,
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "fallbacks": self.fallbacks,
+            "pending": sum(len(q) for q in self._pending.values()),
+        }
+
+
+class BatchRound:
+    """
+    Ein Round-Trip für alle Items eines /translate_batch: jedes Item friert ein und
+    reicht seinen Primär-Payload ein; sobald alle Items eingereicht haben (oder ohne
+    Worker-Call fertig sind), gehen die Texte längensortiert in wenigen /translate_batch
+    an den Worker. Fallbacks pro Item laufen danach normal über `fallback`.
+    `batcher` (optional) teilt das batch_supported-Flag des MicroBatchers.
+    """
+    def __init__(self, client: WorkerClient, expected: int, fallback, max_batch: int = 64, batcher: MicroBatcher | None = None):
+        self.client = client
+        self.expected = expected
+        self.fallback = fallback
+        self.max_batch = max(1, max_batch)
+        self.batcher = batcher
+        self._seen: set[int] = set()
+        self._queue: List[Tuple[Dict[str, Any], asyncio.Future, float | None]] = []
+        self._flushed = False
+        self._tasks: set = set()
+        self.calls = 0
+
+    def caller(self, idx: int):
+        async def _call(payload: Dict[str, Any], timeout: float | None = None) -> Dict[str, Any]:
+            return await self._submit(idx, payload, timeout)
+        # Aufrufer ohne eigenen Worker-Call (z. B. Singleflight-Wartende) geben ihren Slot frei
+        _call.leave = lambda: self.leave(idx)
+        return _call
+
+    def leave(self, idx: int):
+        if idx not in self._seen:
+            self._seen.add(idx)
+            self._maybe_flush()
+
+    async def _submit(self, idx: int, payload: Dict[str, Any], timeout: float | None) -> Dict[str, Any]:
+        if self._flushed or idx in self._seen or (self.batcher is not None and not self.batcher.batch_supported):
+            self.leave(idx)
+            return await self.fallback(payload, timeout)
+        fut: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._queue.append((payload, fut, timeout))
+        self._seen.add(idx)
+        self._maybe_flush()
+        return await fut
+
+    def _maybe_flush(self):
+        if self._flushed or len(self._seen) < self.expected:
+            return
+        self._flushed = True
+        queue, self._queue = self._queue, []
+        groups: Dict[Tuple, List[Tuple[Dict[str, Any], asyncio.Future, float | None]]] = {}
+        for payload, fut, timeout in queue:
+            key = (payload["source"], payload["target"], payload.get("max_new_tokens"))
+            groups.setdefault(key, []).append((payload, fut, timeout))
+        for key, items in groups.items():
+            # Längen-Buckets: ähnlich lange Texte zusammen → wenig Padding im Worker
+            items.sort(key=lambda x: len(x[0].get("text", "")))
+            for i in range(0, len(items), self.max_batch):
+                _spawn(self._tasks, self._dispatch(key, items[i:i + self.max_batch]))
+
+    async def _dispatch(self, key: Tuple, items: List[Tuple[Dict[str, Any], asyncio.Future, float | None]]):
+        src, tgt, max_new_tokens = key
+        self.calls += 1
+        BATCH_SIZE.observe(len(items), kind="round")
+        try:
+            if self.batcher is not None and not self.batcher.batch_supported:
+                raise WorkerError(404)
+            outs = await self.client.translate_batch([p.get("text", "") for p, _, _ in items], src, tgt, max_new_tokens, _batch_timeout([to for _, _, to in items]))
+            if len(outs) != len(items):
+                raise ValueError(f"batch_size_mismatch:{len(outs)}!={len(items)}")
+        except Exception as e:
+            if _batch_unsupported(e) and self.batcher is not None:
+                self.batcher.batch_supported = False
+            results = await asyncio.gather(*[self.fallback(p, to) for p, _, to in items], return_exceptions=True)
+            for (_, fut, _), res in zip(items, results):
+                if isinstance(res, Exception):
+                    MicroBatcher._resolve(fut, exc=res)
+                else:
+                    MicroBatcher._resolve(fut, res)
+            return
+        for (_, fut, _), out in zip(items, outs):
+            MicroBatcher._resolve(fut, {"translated_text": out or ""})
@@ -1,48 +1,435 @@
-import time, hashlib
+import asyncio, time, hashlib, threading, json, queue, sqlite3, zlib
 from collections import OrderedDict
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 
 class LRUCache:
     def __init__(self, maxsize: int = 5000, ttl: int = 86400):
         self.maxsize = maxsize
         self.ttl = ttl
         self._d: "OrderedDict[str, tuple[float, Dict[str,Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
         self.hits = 0
         self.misses = 0
         self.evictions = 0
 
     def get(self, key: str):
         now = time.time()
-        v = self._d.get(key)
-        if not v:
-            self.misses += 1
-            return None
-        ts, data = v
-        if now - ts > self.ttl:
-            try: del self._d[key]
-            except KeyError: pass
-            self.misses += 1
-            return None
-        self._d.move_to_end(key, last=True)
-        self.hits += 1
-        return data
+        with self._lock:
+            v = self._d.get(key)
+            if not v:
+                self.misses += 1
+                return None
+            ts, data = v
+            if now - ts > self.ttl:
+                try: del self._d[key]
+                except KeyError: pass
+                self.misses += 1
+                return None
+            self._d.move_to_end(key, last=True)
+            self.hits += 1
+            return data
 
     def set(self, key: str, value: Dict[str,Any]):
         now = time.time()
-        self._d[key] = (now, value)
-        self._d.move_to_end(key, last=True)
-        if len(self._d) > self.maxsize:
-            self._d.popitem(last=False)
-            self.evictions += 1
+        with self._lock:
+            self._d[key] = (now, value)
+            self._d.move_to_end(key, last=True)
+            if len(self._d) > self.maxsize:
+                self._d.popitem(last=False)
+                self.evictions += 1
 
     def stats(self) -> Dict[str,int]:
-        return {"size": len(self._d), "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+        with self._lock:
+            return {"size": len(self._d), "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+class ShardedLRUCache:
+    """
+    N unabhängig gelockte LRUCache-Shards, Auswahl per Key-Hash → kein globaler Lock.
+    Gleiche get/set/stats-API und TTL-Semantik wie LRUCache; maxsize wird auf die Shards verteilt.
+    """
+    def __init__(self, maxsize: int = 5000, ttl: int = 86400, shards: int = 16):
+        n = max(1, min(shards, maxsize or 1))
+        self.maxsize = maxsize
+        self.ttl = ttl
+        per, rest = divmod(maxsize, n)
+        self._shards = [LRUCache(maxsize=per + (1 if i < rest else 0), ttl=ttl) for i in range(n)]
+
+    def _shard(self, key: str) -> LRUCache:
+        return self._shards[hash(key) % len(self._shards)]
+
+    def get(self, key: str):
+        return self._shard(key).get(key)
+
+    def set(self, key: str, value: Dict[str,Any]):
+        self._shard(key).set(key, value)
+
+    def stats(self) -> Dict[str,int]:
+        out = {"size": 0, "hits": 0, "misses": 0, "evictions": 0}
+        for sh in self._shards:
+            for k, v in sh.stats().items():
+                out[k] += v
+        out["shards"] = len(self._shards)
+        return out
+
+# Bool-Checks aus validate_invariants → Bitmaske (2 Bit je Flag: vorhanden, Wert)
+_CHECK_FLAGS = ("ok", "html_ok", "num_ok", "ph_ok", "paren_ok", "artifact_ok", "email_ok", "url_ok")
+# grobe Python-Objekt-Overheads pro Eintrag (Tuple, Key-String, OrderedDict-Node)
+_ENTRY_OVERHEAD = 160
+
+def _pack_value(value: Dict[str,Any], compress_min: int) -> Tuple[int, bytes, bool]:
+    checks = dict(value.get("checks") or {})
+    flags = 0
+    for i, name in enumerate(_CHECK_FLAGS):
+        v = checks.get(name)
+        if isinstance(v, bool):
+            del checks[name]
+            flags |= (1 << (2 * i)) | ((1 << (2 * i + 1)) if v else 0)
+    rest = json.dumps(checks, ensure_ascii=False, separators=(",", ":")).encode("utf-8") if checks else b""
+    blob = rest + b"\x00" + (value.get("translated_text") or "").encode("utf-8")
+    if len(blob) >= compress_min:
+        packed = zlib.compress(blob, 6)
+        if len(packed) < len(blob):
+            return flags, packed, True
+    return flags, blob, False
+
+def _unpack_value(flags: int, blob: bytes, compressed: bool) -> Dict[str,Any]:
+    if compressed:
+        blob = zlib.decompress(blob)
+    rest, _, text = blob.partition(b"\x00")
+    checks: Dict[str,Any] = json.loads(rest) if rest else {}
+    for i, name in enumerate(_CHECK_FLAGS):
+        if flags & (1 << (2 * i)):
+            checks[name] = bool(flags & (1 << (2 * i + 1)))
+    return {"translated_text": text.decode("utf-8"), "checks": checks}
+
+class ByteBudgetCache:
+    """
+    LRU mit Byte-Budget statt Eintragszahl: Werte kompakt gepackt (Text + Check-Bitmaske
+    + Rest-JSON), ab compress_min Bytes zlib-komprimiert. Gleiche get/set/stats-API wie LRUCache.
+    """
+    def __init__(self, max_bytes: int, ttl: int = 86400, maxsize: int = 5000, compress_min: int = 512):
+        self.max_bytes = max_bytes
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.compress_min = compress_min
+        self._d: "OrderedDict[str, tuple[float, int, bytes, bool]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.compressed = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejected = 0
+
+    @staticmethod
+    def _size(key: str, blob: bytes) -> int:
+        return len(key) + len(blob) + _ENTRY_OVERHEAD
+
+    def _drop(self, key: str):
+        _, _, blob, comp = self._d.pop(key)
+        self.bytes -= self._size(key, blob)
+        if comp:
+            self.compressed -= 1
+
+    def get(self, key: str):
+        now = time.time()
+        with self._lock:
+            v = self._d.get(key)
+            if v is None or now - v[0] > self.ttl:
+                if v is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+            self._d.move_to_end(key, last=True)
+            self.hits += 1
+        return _unpack_value(v[1], v[2], v[3])
+
+    def set(self, key: str, value: Dict[str,Any]):
+        flags, blob, comp = _pack_value(value, self.compress_min)
+        size = self._size(key, blob)
+        with self._lock:
+            if key in self._d:
+                self._drop(key)
+            # Einzelner Eintrag größer als das halbe Budget würde den Cache leerfegen
+            if size > self.max_bytes // 2:
+                self.rejected += 1
+                return
+            self._d[key] = (time.time(), flags, blob, comp)
+            self.bytes += size
+            if comp:
+                self.compressed += 1
+            while self._d and (self.bytes > self.max_bytes or len(self._d) > self.maxsize):
+                self._drop(next(iter(self._d)))
+                self.evictions += 1
+
+    def stats(self) -> Dict[str,int]:
+        with self._lock:
+            return {"size": len(self._d), "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "bytes": self.bytes, "max_bytes": self.max_bytes, "compressed": self.compressed, "rejected": self.rejected}
+
+class SQLiteStore:
+    """
+    Persistente L2-Stufe unter dem LRU (SQLite, WAL). Lesen synchron (read-through; aus dem
+    Event-Loop über TieredCache.aget im Thread), Schreiben write-behind über einen Hintergrund-Thread.
+    Zugriffszähler werden pro Key zusammengefasst; Schreib-Queue und Zähler sind auf `max_pending`
+    begrenzt (Überlauf wird verworfen und gezählt). Abgelaufene Einträge räumt der Writer alle
+    `purge_s` Sekunden ab (0 = nie).
+    """
+    def __init__(self, path: str, ttl: int = 86400, flush_ms: int = 200, max_pending: int = 10000, purge_s: int = 3600):
+        self.path = path
+        self.ttl = ttl
+        self.flush_s = max(1, flush_ms) / 1000.0
+        self.max_pending = max(1, max_pending)
+        self.purge_s = purge_s
+        self._conn = self._connect()
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, ts REAL NOT NULL, hits INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_hot ON cache(hits DESC, ts DESC)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_ts ON cache(ts)")
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._q: "queue.Queue[tuple]" = queue.Queue(maxsize=self.max_pending)
+        self._touch_lock = threading.Lock()
+        self._touches: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.dropped = 0
+        self.write_errors = 0
+        self.purged = 0
+        self._writer = threading.Thread(target=self._write_loop, name="cache-l2-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def get(self, key: str):
+        with self._lock:
+            row = self._conn.execute("SELECT value, ts FROM cache WHERE key=?", (key,)).fetchone()
+            if row is None or time.time() - row[1] > self.ttl:
+                self.misses += 1
+                return None
+            self.hits += 1
+        self.touch(key)
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Dict[str,Any]):
+        try:
+            self._q.put_nowait(("set", key, json.dumps(value, ensure_ascii=False), time.time()))
+        except queue.Full:
+            # L1 hat den Wert bereits; lieber ein L2-Write verlieren als den Aufrufer blockieren
+            self.dropped += 1
+
+    def touch(self, key: str):
+        with self._touch_lock:
+            if key in self._touches:
+                self._touches[key] += 1
+            elif len(self._touches) < self.max_pending:
+                self._touches[key] = 1
+            else:
+                self.dropped += 1
+
+    def hottest(self, n: int) -> List[Tuple[str, Dict[str,Any]]]:
+        """Die n meistgenutzten, nicht abgelaufenen Einträge (für Warm-Start des L1)."""
+        if n <= 0:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, value FROM cache WHERE ts >= ? ORDER BY hits DESC, ts DESC LIMIT ?",
+                (time.time() - self.ttl, n),
+            ).fetchall()
+        return [(k, json.loads(v)) for k, v in rows]
+
+    def _write_loop(self):
+        conn = self._connect()
+        next_purge = time.time() + self.purge_s
+        while True:
+            try:
+                ops = [self._q.get(timeout=self.flush_s)]
+            except queue.Empty:
+                ops = []
+            deadline = time.time() + self.flush_s
+            while ops and len(ops) < 512:
+                try:
+                    ops.append(self._q.get(timeout=max(0.0, deadline - time.time())))
+                except queue.Empty:
+                    break
+            with self._touch_lock:
+                touches, self._touches = self._touches, {}
+            try:
+                if ops or touches:
+                    self._write(conn, ops, touches)
+                if self.purge_s > 0 and time.time() >= next_purge:
+                    next_purge = time.time() + self.purge_s
+                    self.purge_expired(conn)
+            finally:
+                for _ in ops:
+                    self._q.task_done()
+
+    def _write(self, conn: sqlite3.Connection, ops: List[tuple], touches: Dict[str, int]):
+        sets = [op[1:] for op in ops if op[0] == "set"]
+        try:
+            conn.execute("BEGIN")
+            conn.executemany(
+                "INSERT INTO cache(key, value, ts, hits) VALUES(?,?,?,0) "
+                "ON CONFLICT(key) DO UPDATE SET value=excluded.value, ts=excluded.ts",
+                sets,
+            )
+            conn.executemany("UPDATE cache SET hits=hits+? WHERE key=?", [(n, k) for k, n in touches.items()])
+            conn.execute("COMMIT")
+            self.writes += len(sets) + len(touches)
+        except sqlite3.Error as e:
+            try: conn.execute("ROLLBACK")
+            except sqlite3.Error: pass
+            self.write_errors += 1
+            self.dropped += len(sets) + len(touches)
+            print(f"WARN: cache L2 write failed ({self.path}): {e}; dropped {len(sets)} writes, {len(touches)} touches")
+
+    def flush(self):
+        """Wartet, bis alle ausstehenden Writes (inkl. bis dahin gesammelter Zugriffe) geschrieben sind."""
+        self._q.put(("flush",))
+        self._q.join()
+
+    def purge_expired(self, conn: sqlite3.Connection | None = None) -> int:
+        """Löscht abgelaufene Einträge; läuft periodisch im Writer-Thread (eigene Connection)."""
+        cutoff = time.time() - self.ttl
+        try:
+            if conn is not None:
+                n = conn.execute("DELETE FROM cache WHERE ts < ?", (cutoff,)).rowcount
+            else:
+                with self._lock:
+                    n = self._conn.execute("DELETE FROM cache WHERE ts < ?", (cutoff,)).rowcount
+        except sqlite3.Error as e:
+            print(f"WARN: cache L2 purge failed ({self.path}): {e}")
+            return 0
+        self.purged += n
+        return n
+
+    def stats(self) -> Dict[str,Any]:
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        return {"path": self.path, "size": size, "hits": self.hits, "misses": self.misses,
+                "writes": self.writes, "pending_writes": self._q.qsize(), "pending_touches": len(self._touches),
+                "dropped": self.dropped, "write_errors": self.write_errors, "purged": self.purged}
+
+class TieredCache:
+    """
+    L1 (LRUCache/ShardedLRUCache/ByteBudgetCache, In-Memory) + L2 (SQLiteStore). get: L1 → L2 (read-through, Promotion in L1);
+    set: L1 sofort, L2 write-behind. Gleiche Schnittstelle wie LRUCache.
+    """
+    def __init__(self, l1: LRUCache | ShardedLRUCache | ByteBudgetCache, l2: SQLiteStore):
+        self.l1 = l1
+        self.l2 = l2
+        self.preloaded = 0
+
+    def preload(self, n: int) -> int:
+        # kälteste zuerst setzen, damit die heißesten im LRU am "frischen" Ende landen
+        items = self.l2.hottest(min(n, self.l1.maxsize))
+        for key, value in reversed(items):
+            self.l1.set(key, value)
+        self.preloaded = len(items)
+        return self.preloaded
+
+    def get(self, key: str):
+        v = self.l1.get(key)
+        if v is not None:
+            self.l2.touch(key)
+            return v
+        v = self.l2.get(key)
+        if v is not None:
+            self.l1.set(key, v)
+        return v
+
+    async def aget(self, key: str):
+        """Wie get, aber der L2-Lookup (SQLite) läuft im Thread statt auf dem Event-Loop."""
+        v = self.l1.get(key)
+        if v is not None:
+            self.l2.touch(key)
+            return v
+        v = await asyncio.to_thread(self.l2.get, key)
+        if v is not None:
+            self.l1.set(key, v)
+        return v
+
+    def set(self, key: str, value: Dict[str,Any]):
+        self.l1.set(key, value)
+        self.l2.set(key, value)
+
+    def stats(self) -> Dict[str,Any]:
+        l1 = self.l1.stats()
+        l2 = self.l2.stats()
+        l1_n = l1["hits"] + l1["misses"]
+        l2_n = l2["hits"] + l2["misses"]
+        return {
+            **l1,
+            "l1": {**l1, "hit_rate": round(l1["hits"] / l1_n, 3) if l1_n else 0.0},
+            "l2": {**l2, "hit_rate": round(l2["hits"] / l2_n, 3) if l2_n else 0.0, "preloaded": self.preloaded},
+            "hit_rate": round((l1["hits"] + l2["hits"]) / l1_n, 3) if l1_n else 0.0,
+        }
+
+class SegmentCache:
+    """
+    Prozessweiter Cache für Text-Segmente (Spans-only/Interleave), thread-safe, TTL, begrenzt.
+    Key: (src_engine, tgt_engine, segment, glossary_signature).
+    """
+    def __init__(self, maxsize: int = 20000, ttl: int = 86400):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._d: "OrderedDict[Tuple[str,str,str,str], tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, src: str, tgt: str, segment: str, sig: str) -> str | None:
+        key = (src, tgt, segment, sig)
+        now = time.time()
+        with self._lock:
+            v = self._d.get(key)
+            if v is None or now - v[0] > self.ttl:
+                if v is not None:
+                    del self._d[key]
+                self.misses += 1
+                return None
+            self._d.move_to_end(key, last=True)
+            self.hits += 1
+            return v[1]
+
+    def set(self, src: str, tgt: str, segment: str, sig: str, value: str):
+        key = (src, tgt, segment, sig)
+        with self._lock:
+            self._d[key] = (time.time(), value)
+            self._d.move_to_end(key, last=True)
+            while len(self._d) > self.maxsize:
+                self._d.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> Dict[str,int]:
+        with self._lock:
+            return {"size": len(self._d), "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
 
 def style_signature(address: str | None, gender: str | None) -> str:
     a = (address or "auto").lower()
     g = (gender or "none").lower()
     return f"a={a};g={g}"
 
+def _terms_hash(terms: List[str] | None) -> str:
+    uniq = sorted({t.strip() for t in (terms or []) if t and t.strip()})
+    return hashlib.sha1("|".join(uniq).encode("utf-8")).hexdigest()[:8] if uniq else "none"
+
+def keep_terms_signature(keep_terms: List[str] | None, style_keep_terms: List[str] | None = None) -> str:
+    """
+    Keep-Terms dedupliziert und stabil sortiert. Context-Keep-Terms werden eingefroren,
+    Style-Keep-Terms schützen nur vor dem Style-Filter → getrennte Teile der Signatur.
+    """
+    kt, skt = _terms_hash(keep_terms), _terms_hash(style_keep_terms)
+    return f"kt={kt}" if skt == "none" else f"kt={kt};skt={skt}"
+
 def glossary_signature(terms: List[Dict[str,str]] | None) -> str:
     if not terms:
         return "gl=none"
@@ -55,5 +442,6 @@ def build_key(src_engine: str, tgt_engine: str, freeze_text_std: str, sig: str)
     h = hashlib.sha1(freeze_text_std.encode("utf-8")).hexdigest()[:16]
     return f"{src_engine}->{tgt_engine}|{sig}|{h}"
 
-# singleton; wird in mt_guard mit Settings parametriert
-cache: LRUCache | None = None
+# singletons; werden in mt_guard mit Settings parametriert
+cache: LRUCache | ShardedLRUCache | ByteBudgetCache | TieredCache | None = None
+segment_cache: SegmentCache | None = None
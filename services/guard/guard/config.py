@@ -7,12 +7,40 @@ class Settings:
         self.MAX_WORKERS_GUARD: int = int(os.environ.get("MAX_WORKERS_GUARD", "3") or "3")
         self.WORKER_TIMEOUT_S: float = float(os.environ.get("WORKER_TIMEOUT_S", "60") or "60")
         self.ENABLE_WORKER_BATCH: bool = os.environ.get("ENABLE_WORKER_BATCH", "1") not in ("0","","false","False")
+        # async worker client (httpx pool)
+        self.WORKER_MAX_CONNECTIONS: int = int(os.environ.get("WORKER_MAX_CONNECTIONS", "100") or "100")
+        self.WORKER_RETRIES: int = int(os.environ.get("WORKER_RETRIES", "3") or "3")
+        self.BATCH_CONCURRENCY: int = int(os.environ.get("BATCH_CONCURRENCY", "8") or "8")
+        # mehrere Worker-Replicas: router.yaml (WORKER_ROUTER_PATH) oder CSV "url|weight,url" (WORKER_BACKENDS)
+        self.WORKER_ROUTER_PATH: str = os.environ.get("WORKER_ROUTER_PATH", "")
+        self.WORKER_BACKENDS: str = os.environ.get("WORKER_BACKENDS", "")
+        self.POOL_HEALTH_INTERVAL_S: float = float(os.environ.get("POOL_HEALTH_INTERVAL_S", "5") or "5")
+        self.POOL_EJECT_AFTER: int = int(os.environ.get("POOL_EJECT_AFTER", "2") or "2")
+        self.POOL_FAILOVER: int = int(os.environ.get("POOL_FAILOVER", "1") or "1")
+        # cross-request micro-batching → worker /translate_batch
+        self.MICROBATCH_ENABLE: bool = os.environ.get("MICROBATCH_ENABLE", "1") not in ("0","","false","False")
+        self.MICROBATCH_MAX_WAIT_MS: float = float(os.environ.get("MICROBATCH_MAX_WAIT_MS", "5") or "5")
+        self.MICROBATCH_MAX_SIZE: int = int(os.environ.get("MICROBATCH_MAX_SIZE", "16") or "16")
+        # /translate_batch: alle Items in einem (längensortierten) Worker-Round-Trip
+        self.BATCH_ROUND_ENABLE: bool = os.environ.get("BATCH_ROUND_ENABLE", "1") not in ("0","","false","False")
+        self.BATCH_ROUND_MAX: int = int(os.environ.get("BATCH_ROUND_MAX", "64") or "64")
+        # /translate_stream (NDJSON): gleichzeitige Items und Queue-Tiefe (Backpressure)
+        self.STREAM_CONCURRENCY: int = int(os.environ.get("STREAM_CONCURRENCY", "16") or "16")
+        self.STREAM_QUEUE: int = int(os.environ.get("STREAM_QUEUE", "64") or "64")
+        # Dokument-Modus: Texte ab DOC_MODE_MIN_CHARS in ≤DOC_CHUNK_CHARS-Stücke (Satz-/Blockgrenzen) teilen
+        self.DOC_MODE_ENABLE: bool = os.environ.get("DOC_MODE_ENABLE", "1") not in ("0","","false","False")
+        self.DOC_MODE_MIN_CHARS: int = int(os.environ.get("DOC_MODE_MIN_CHARS", "1500") or "1500")
+        self.DOC_CHUNK_CHARS: int = int(os.environ.get("DOC_CHUNK_CHARS", "600") or "600")
+        # Server-Timing-Header (Stage-Aufschlüsselung) auf /translate und /translate_batch
+        self.SERVER_TIMING_ENABLE: bool = (os.environ.get("SERVER_TIMING_ENABLE","1") not in ("0","","false","False"))
 
         # locales/public
         self.LOCALES_PUBLIC_PATH: str | None = os.environ.get("LOCALES_PUBLIC_PATH")
         self.LOCALES_EXTRA: str = os.environ.get("LOCALES_EXTRA","")
         self.LOCALES_DISABLE: str = os.environ.get("LOCALES_DISABLE","")
         self.PUBLIC_DIR: str | None = os.environ.get("PUBLIC_DIR")
+        # Locale-Alias-Datei (z. B. jp→ja, iw→he); Default: lang_aliases.json im Repo-Root
+        self.LANG_ALIASES_PATH: str | None = os.environ.get("LANG_ALIASES_PATH")
 
         # style filter
         self.ENABLE_STYLE_FILTER: bool = os.environ.get("ENABLE_STYLE_FILTER","1") not in ("0","false","False","")
@@ -24,17 +52,52 @@ class Settings:
         # circuit breaker
         self.CB_ENABLE: bool = (os.environ.get("CB_ENABLE","1") not in ("0","","false","False"))
         self.CB_MAX_RETRIES: int = int(os.environ.get("CB_MAX_RETRIES","0") or "0")
+        # Fehlerquote über die letzten CB_WINDOW Worker-Calls (ab CB_MIN_REQUESTS) → open für CB_OPEN_S
+        self.CB_ERROR_RATE: float = float(os.environ.get("CB_ERROR_RATE","0.5") or "0.5")
+        self.CB_WINDOW: int = int(os.environ.get("CB_WINDOW","20") or "20")
+        self.CB_MIN_REQUESTS: int = int(os.environ.get("CB_MIN_REQUESTS","10") or "10")
+        self.CB_OPEN_S: float = float(os.environ.get("CB_OPEN_S","10") or "10")
+        self.CB_HALF_OPEN_PROBES: int = int(os.environ.get("CB_HALF_OPEN_PROBES","1") or "1")
+        # adaptives Concurrency-Limit (AIMD) für Worker-Calls
+        self.LIMITER_ENABLE: bool = (os.environ.get("LIMITER_ENABLE","1") not in ("0","","false","False"))
+        self.LIMITER_INITIAL: int = int(os.environ.get("LIMITER_INITIAL","8") or "8")
+        self.LIMITER_MIN: int = int(os.environ.get("LIMITER_MIN","1") or "1")
+        self.LIMITER_MAX: int = int(os.environ.get("LIMITER_MAX","64") or "64")
+        self.LIMITER_TOLERANCE: float = float(os.environ.get("LIMITER_TOLERANCE","2.0") or "2.0")
         
         # cache
         self.CACHE_ENABLE: bool = (os.environ.get("CACHE_ENABLE","1") not in ("0","","false","False"))
         self.CACHE_MAX: int = int(os.environ.get("CACHE_MAX","5000") or "5000")
         self.CACHE_TTL: int = int(os.environ.get("CACHE_TTL","86400") or "86400")
+        # Anzahl unabhängig gelockter LRU-Shards (1 = ein einzelner LRUCache; Sharding ist opt-in)
+        self.CACHE_SHARDS: int = int(os.environ.get("CACHE_SHARDS","1") or "1")
+        # Byte-Budget statt Eintragszahl (0 = aus); Werte ab CACHE_COMPRESS_MIN Bytes zlib-komprimiert
+        self.CACHE_MAX_BYTES: int = int(os.environ.get("CACHE_MAX_BYTES","0") or "0")
+        self.CACHE_COMPRESS_MIN: int = int(os.environ.get("CACHE_COMPRESS_MIN","512") or "512")
+        # L2 (SQLite/WAL) unter dem LRU; leerer Pfad = aus
+        self.CACHE_L2_PATH: str = os.environ.get("CACHE_L2_PATH","")
+        self.CACHE_L2_PRELOAD: int = int(os.environ.get("CACHE_L2_PRELOAD","1000") or "1000")
+        self.CACHE_L2_FLUSH_MS: int = int(os.environ.get("CACHE_L2_FLUSH_MS","200") or "200")
+        # Obergrenze ausstehender L2-Writes/-Zugriffszähler; Purge-Intervall für abgelaufene Einträge (0 = aus)
+        self.CACHE_L2_MAX_PENDING: int = int(os.environ.get("CACHE_L2_MAX_PENDING","10000") or "10000")
+        self.CACHE_L2_PURGE_S: int = int(os.environ.get("CACHE_L2_PURGE_S","3600") or "3600")
+        # singleflight: identische gleichzeitige Übersetzungen zusammenfassen
+        self.SINGLEFLIGHT_ENABLE: bool = (os.environ.get("SINGLEFLIGHT_ENABLE","1") not in ("0","","false","False"))
+        # segment cache (spans-only / interleave), prozessweit
+        self.SEGMENT_CACHE_ENABLE: bool = (os.environ.get("SEGMENT_CACHE_ENABLE","1") not in ("0","","false","False"))
+        self.SEGMENT_CACHE_MAX: int = int(os.environ.get("SEGMENT_CACHE_MAX","20000") or "20000")
+        self.SEGMENT_CACHE_TTL: int = int(os.environ.get("SEGMENT_CACHE_TTL", str(self.CACHE_TTL)) or str(self.CACHE_TTL))
         
         # glossary
         self.GLOSSARY_ENABLE: bool = (os.environ.get("GLOSSARY_ENABLE","0") not in ("0","","false","False"))
         self.GLOSSARY_PATH: str = os.environ.get("GLOSSARY_PATH","")
         self.GLOSSARY_TERMS: str = os.environ.get("GLOSSARY_TERMS","")  # CSV
         
+        # Pivot (src→PIVOT_MID_LANG→tgt) bei Latin-Leaks > LEAK_LATIN_MAX für PIVOT_LANGS
+        self.PIVOT_LANGS: set[str] = {x.strip() for x in os.environ.get("PIVOT_LANGS", "km,lo,my").split(",") if x.strip()}
+        self.PIVOT_MID_LANG: str = os.environ.get("PIVOT_MID_LANG", "en").strip() or "en"
+        self.LEAK_LATIN_MAX: float = float(os.environ.get("LEAK_LATIN_MAX", "0.15") or "0.15")
+
         # --- SAFE MODE / FORCE SPANS-ONLY ---
         # Comma-separated BCP47 list, e.g. "zh-CN,zh-TW,ja-JP,ko-KR,he-IL,ar-SA,fa-IR,ur-PK,ps-AF,ru-RU,bg-BG,uk-UA,el-GR"
         def _csv_set(env_key: str) -> set[str]:
@@ -43,5 +106,24 @@ class Settings:
         self.SPANS_ONLY_FORCE_BCP47: set[str] = _csv_set("SPANS_ONLY_FORCE")
         # Comma-separated engine list, e.g. "zh,ja,ko,th,vi,km,lo,my,he,ar,fa,ur,ps,ru,bg,uk,sr,el,ka,hy"
         self.SPANS_ONLY_FORCE_ENGINES: set[str] = _csv_set("SPANS_ONLY_FORCE_ENGINES")
+        # Gelerntes Routing: je (Ziel-Engine, has_html, Invarianten-Dichte) direkt mit dem Pfad starten,
+        # der zuletzt bestanden hat, wenn der Normalpfad dort < ROUTING_SKIP_BELOW besteht
+        self.ROUTING_ENABLE: bool = (os.environ.get("ROUTING_ENABLE","0") not in ("0","","false","False"))
+        self.ROUTING_WINDOW: int = int(os.environ.get("ROUTING_WINDOW","50") or "50")
+        self.ROUTING_MIN_SAMPLES: int = int(os.environ.get("ROUTING_MIN_SAMPLES","20") or "20")
+        self.ROUTING_SKIP_BELOW: float = float(os.environ.get("ROUTING_SKIP_BELOW","0.3") or "0.3")
+        self.ROUTING_MARGIN: float = float(os.environ.get("ROUTING_MARGIN","0.3") or "0.3")
+        self.ROUTING_EXPLORE: float = float(os.environ.get("ROUTING_EXPLORE","0.05") or "0.05")
+        # Hedging: riskante Requests (HTML + ≥ HEDGE_MIN_INVARIANTS Invarianten oder Normalpfad-Fehlerquote
+        # ≥ HEDGE_FALLBACK_RATE) starten spans-only parallel zum Primärlauf; Budget ≈ HEDGE_BUDGET_RATIO × Requests
+        self.HEDGE_ENABLE: bool = (os.environ.get("HEDGE_ENABLE","0") not in ("0","","false","False"))
+        self.HEDGE_MIN_INVARIANTS: int = int(os.environ.get("HEDGE_MIN_INVARIANTS","8") or "8")
+        self.HEDGE_FALLBACK_RATE: float = float(os.environ.get("HEDGE_FALLBACK_RATE","0.5") or "0.5")
+        self.HEDGE_BUDGET_RATIO: float = float(os.environ.get("HEDGE_BUDGET_RATIO","0.1") or "0.1")
+        self.HEDGE_BUDGET_BURST: float = float(os.environ.get("HEDGE_BUDGET_BURST","10") or "10")
+        self.HEDGE_MAX_INFLIGHT: int = int(os.environ.get("HEDGE_MAX_INFLIGHT","8") or "8")
+        # Fehlerquote des Normalpfads je Routing-Key: eigene Statistik (auch bei ROUTING_ENABLE=0)
+        self.HEDGE_WINDOW: int = int(os.environ.get("HEDGE_WINDOW","50") or "50")
+        self.HEDGE_MIN_SAMPLES: int = int(os.environ.get("HEDGE_MIN_SAMPLES","20") or "20")
 
 settings = Settings()
@@ -1,4 +1,6 @@
-import os, json, re, hashlib, unicodedata
+import os, json, re, hashlib, unicodedata, threading
+from bisect import bisect_left
+from collections import OrderedDict
 from typing import List, Dict, Tuple
 
 _SENT_FMT = "<|GLO:{id}:{crc}|>"
@@ -11,7 +13,7 @@ _TOL_RE = re.compile(
 def _sha6(s: str) -> str:
     return hashlib.sha1(s.encode("utf-8")).hexdigest()[:6].upper()
 
-def load_terms(path: str | None, env_terms: str | None) -> List[Dict[str,str]]:
+def _load_terms_uncached(path: str | None, env_terms: str | None) -> List[Dict[str,str]]:
     terms: List[Dict[str,str]] = []
     if path and os.path.exists(path):
         with open(path, "r", encoding="utf-8") as f:
@@ -39,6 +41,28 @@ def load_terms(path: str | None, env_terms: str | None) -> List[Dict[str,str]]:
         seen.add(key); out.append(t)
     return out
 
+# load_terms-Cache: (path, mtime, env_terms) → Terms; neue mtime ⇒ Neuladen + Matcher-Cache leeren
+_TERMS_CACHE: Dict[Tuple, List[Dict[str,str]]] = {}
+_LOCK = threading.Lock()
+
+def load_terms(path: str | None, env_terms: str | None) -> List[Dict[str,str]]:
+    try:
+        mtime = os.path.getmtime(path) if path else None
+    except OSError:
+        mtime = None
+    key = (path, mtime, env_terms)
+    with _LOCK:
+        terms = _TERMS_CACHE.get(key)
+    if terms is None:
+        terms = _load_terms_uncached(path, env_terms)
+        with _LOCK:
+            if any(k[0] == path and k[1] != mtime for k in _TERMS_CACHE):
+                _MATCHERS.clear()
+            for k in [k for k in _TERMS_CACHE if k[0] == path]:
+                del _TERMS_CACHE[k]
+            _TERMS_CACHE[key] = terms
+    return list(terms)
+
 def _build_matchers(terms: List[Dict[str,str]], lang_engine: str) -> List[Tuple[re.Pattern,str]]:
     pats: List[Tuple[re.Pattern,str]] = []
     for t in terms:
@@ -58,22 +82,173 @@ def _build_matchers(terms: List[Dict[str,str]], lang_engine: str) -> List[Tuple[
     pats.sort(key=lambda x: -len(x[0].pattern))
     return pats
 
+def _is_word(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+def _fold(ch: str) -> str:
+    # 1:1 Case-Folding, damit Offsets im Original gültig bleiben
+    lo = ch.lower()
+    return lo if len(lo) == 1 else lo[:1] or ch
+
+class _AhoCorasick:
+    """Aho-Corasick-Automat über Literal-Terms; liefert alle (start, end, pattern_idx)."""
+    def __init__(self, patterns: List[str], fold: bool):
+        self.fold = fold
+        self.goto: List[Dict[str,int]] = [{}]
+        self.fail: List[int] = [0]
+        self.out: List[List[int]] = [[]]
+        self.lens = [len(p) for p in patterns]
+        for i, p in enumerate(patterns):
+            node = 0
+            for ch in (map(_fold, p) if fold else p):
+                nxt = self.goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[node][ch] = nxt
+                    self.goto.append({}); self.fail.append(0); self.out.append([])
+                node = nxt
+            self.out[node].append(i)
+        queue = list(self.goto[0].values())
+        for node in queue:
+            for ch, nxt in self.goto[node].items():
+                queue.append(nxt)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def finditer(self, text: str):
+        goto, fail, out, lens = self.goto, self.fail, self.out, self.lens
+        node = 0
+        for pos, ch in enumerate(text):
+            if self.fold:
+                ch = _fold(ch)
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for i in out[node]:
+                yield pos + 1 - lens[i], pos + 1, i
+
+class _CompiledGlossary:
+    """
+    Alle Terms einer (Glossar, Ziel-Engine)-Kombination in einem Durchlauf:
+    Literal-Terms über Aho-Corasick (Latein: case-insensitiv + Wortgrenzen, sonst exakt),
+    Regex-Terms als eine kombinierte Alternation. Priorität wie _build_matchers (längere zuerst).
+    """
+    def __init__(self, terms: List[Dict[str,str]], lang_engine: str):
+        self.canon: List[str] = []
+        ci: List[Tuple[str,int]] = []
+        cs: List[Tuple[str,int]] = []
+        rx: List[Tuple[str,int]] = []
+        for pat, canon in _build_matchers(terms, lang_engine):
+            prio = len(self.canon)
+            self.canon.append(canon)
+            if pat.flags & re.I and pat.pattern.startswith(r"\b") and pat.pattern.endswith(r"\b"):
+                ci.append((_unescape(pat.pattern[2:-2]), prio))
+            elif not _is_regex_term(pat):
+                cs.append((_unescape(pat.pattern), prio))
+            else:
+                rx.append((pat.pattern, prio))
+        self._ci = _AhoCorasick([t for t, _ in ci], fold=True) if ci else None
+        self._ci_prio = [p for _, p in ci]
+        self._cs = _AhoCorasick([t for t, _ in cs], fold=False) if cs else None
+        self._cs_prio = [p for _, p in cs]
+        # Regex-Terms: kombinierte Alternation als Vorfilter (meist kein Treffer → ein Scan),
+        # bei Treffer je Term finditer, damit Überlappungen wie früher nach Priorität aufgelöst werden
+        self._rx = None
+        self._rx_terms = [(re.compile(p, re.U), prio) for p, prio in rx]
+        if rx:
+            try:
+                self._rx = re.compile("|".join(f"(?:{p})" for p, _ in rx), re.U)
+            except re.error:
+                self._rx = None
+
+    def matches(self, text: str) -> List[Tuple[int,int,int,bool]]:
+        """Kandidaten (prio, start, end, braucht_wortgrenzen), inkl. Überlappungen."""
+        cands: List[Tuple[int,int,int,bool]] = []
+        if self._ci is not None:
+            for a, b, i in self._ci.finditer(text):
+                cands.append((self._ci_prio[i], a, b, True))
+        if self._cs is not None:
+            for a, b, i in self._cs.finditer(text):
+                cands.append((self._cs_prio[i], a, b, False))
+        if self._rx_terms and (self._rx is None or self._rx.search(text)):
+            for pat, prio in self._rx_terms:
+                for m in pat.finditer(text):
+                    if m.end() > m.start():
+                        cands.append((prio, m.start(), m.end(), False))
+        return cands
+
+def _unescape(s: str) -> str:
+    return re.sub(r"\\(.)", r"\1", s, flags=re.S)
+
+def _is_regex_term(pat: re.Pattern) -> bool:
+    # Literal-Terms wurden mit re.escape kompiliert → nach Unescape identisch re-escapebar
+    return re.escape(_unescape(pat.pattern)) != pat.pattern
+
+# Kompilierte Matcher pro (Terms, Ziel-Engine), LRU-begrenzt
+_MATCHERS: "OrderedDict[Tuple, _CompiledGlossary]" = OrderedDict()
+_MATCHERS_MAX = int(os.environ.get("GLOSSARY_MATCHER_CACHE", "64") or "64")
+
+def _terms_key(terms: List[Dict[str,str]]) -> Tuple:
+    return tuple((t.get("term",""), t.get("canonical",""), tuple(t.get("langs", ["*"])), t.get("regex","0")) for t in terms)
+
+def compiled_matcher(terms: List[Dict[str,str]], lang_engine: str) -> _CompiledGlossary:
+    key = (_terms_key(terms), lang_engine)
+    with _LOCK:
+        m = _MATCHERS.get(key)
+        if m is not None:
+            _MATCHERS.move_to_end(key)
+            return m
+    m = _CompiledGlossary(terms, lang_engine)
+    with _LOCK:
+        _MATCHERS[key] = m
+        while len(_MATCHERS) > _MATCHERS_MAX:
+            _MATCHERS.popitem(last=False)
+    return m
+
 def freeze_glossary(text: str, lang_engine: str, terms: List[Dict[str,str]]):
     if not terms: 
         return text, []
+    matcher = compiled_matcher(terms, lang_engine)
+    # wie früher: Term für Term (Priorität), je Term links→rechts, ohne Überlappung mit bereits Ersetztem
+    starts: List[int] = []
+    ends: List[int] = []
+    accepted: List[Tuple[int,int,int]] = []
+    n = len(text)
+    for prio, a, b, word_bounds in sorted(matcher.matches(text)):
+        k = bisect_left(starts, a)
+        if k > 0 and ends[k-1] > a:
+            continue
+        if k < len(starts) and starts[k] < b:
+            continue
+        if word_bounds:
+            # \b-Semantik wie beim früheren Term-für-Term-Ersetzen: angrenzende Platzhalter
+            # zählen als Nicht-Wort-Zeichen ("<|...|>")
+            left = a > 0 and not (k > 0 and ends[k-1] == a) and _is_word(text[a-1])
+            right = b < n and not (k < len(starts) and starts[k] == b) and _is_word(text[b])
+            if left == _is_word(text[a]) or right == _is_word(text[b-1]):
+                continue
+        starts.insert(k, a); ends.insert(k, b)
+        accepted.append((a, b, prio))
+    if not accepted:
+        return text, []
     mapping = []
-    t = text
-    idx = 0
-    for pat, canon in _build_matchers(terms, lang_engine):
-        def repl(m):
-            nonlocal idx
-            raw = m.group(0)
-            ph = _SENT_FMT.format(id=idx, crc=_sha6(raw))
-            mapping.append({"ph": ph, "raw": canon})
-            idx += 1
-            return ph
-        t = pat.sub(repl, t)
-    return t, mapping
+    ph_at: Dict[int, Tuple[int,str]] = {}
+    for idx, (a, b, prio) in enumerate(accepted):
+        raw = text[a:b]
+        ph = _SENT_FMT.format(id=idx, crc=_sha6(raw))
+        mapping.append({"ph": ph, "raw": matcher.canon[prio]})
+        ph_at[a] = (b, ph)
+    parts = []
+    pos = 0
+    for a in sorted(ph_at):
+        b, ph = ph_at[a]
+        parts.append(text[pos:a]); parts.append(ph)
+        pos = b
+    parts.append(text[pos:])
+    return "".join(parts), mapping
 
 def to_safe_tokens(text: str, mapping: list[dict]) -> str:
     """
@@ -0,0 +1,252 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Tuple
+
+
+class AIMDLimiter:
+    """
+    Adaptives Concurrency-Limit für Worker-Calls (AIMD, latenzgesteuert):
+    jede Antwort innerhalb von tolerance × Basis-RTT erhöht das Limit um 1/limit
+    (≈ +1 pro Fenster), Fehler/Timeouts oder RTT darüber senken es um `backoff`
+    (höchstens einmal pro Basis-RTT). Basis-RTT = minimale RTT je Key (Endpoint bzw. Endpoint +
+    Batch-Größen-Bucket), driftet langsam nach oben.
+    """
+
+    def __init__(self, initial: int = 8, min_limit: int = 1, max_limit: int = 64, tolerance: float = 2.0, backoff: float = 0.9, enabled: bool = True):
+        self.enabled = enabled
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(self.max_limit, max(self.min_limit, initial)))
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.inflight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._baseline: Dict[str, float] = {}
+        self._last_decrease = 0.0
+        self.increases = 0
+        self.decreases = 0
+
+    def _capacity(self) -> int:
+        return int(self.limit) if self.enabled else 1 << 30
+
+    async def acquire(self):
+        if self.inflight < self._capacity() and not self._waiters:
+            self.inflight += 1
+            return
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # Slot wurde schon vergeben: zurückgeben
+                self.inflight -= 1
+                self._wake()
+            else:
+                try:
+                    self._waiters.remove(fut)
+                except ValueError:
+                    pass
+            raise
+
+    def cancel(self):
+        """Slot ohne Messung zurückgeben (Call fand nicht statt)."""
+        self.inflight -= 1
+        self._wake()
+
+    def release(self, key: str, rtt: float, ok: bool):
+        self.inflight -= 1
+        base = self._baseline.get(key)
+        if base is None or rtt < base:
+            base = rtt
+        else:
+            base += (rtt - base) * 0.01
+        self._baseline[key] = base
+        if not ok or rtt > base * self.tolerance:
+            now = time.monotonic()
+            if now - self._last_decrease >= base:
+                self.limit = max(float(self.min_limit), self.limit * self.backoff)
+                self._last_decrease = now
+                self.decreases += 1
+        elif self.inflight + 1 >= int(self.limit):
+            # nur wachsen, wenn das Limit tatsächlich ausgeschöpft war
+            self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+            self.increases += 1
+        self._wake()
+
+    def _wake(self):
+        while self._waiters and self.inflight < self._capacity():
+            fut = self._waiters.popleft()
+            if not fut.done():
+                self.inflight += 1
+                fut.set_result(None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "limit": int(self.limit),
+            "inflight": self.inflight,
+            "waiting": len(self._waiters),
+            "min": self.min_limit,
+            "max": self.max_limit,
+            "increases": self.increases,
+            "decreases": self.decreases,
+            "baseline_rtt_ms": {k: round(v * 1000.0, 1) for k, v in self._baseline.items()},
+        }
+
+
+class CircuitBreaker:
+    """
+    Circuit Breaker über die letzten `window` Worker-Calls: ab `min_requests` Calls und
+    Fehlerquote ≥ error_rate → open (Calls schlagen sofort fehl). Nach open_s → half_open,
+    `half_open_probes` Probe-Calls; Erfolg schließt, Fehler öffnet erneut.
+    """
+    STATES = ("closed", "half_open", "open")
+
+    def __init__(self, error_rate: float = 0.5, window: int = 20, min_requests: int = 10, open_s: float = 10.0, half_open_probes: int = 1, enabled: bool = True):
+        self.enabled = enabled
+        self.error_rate = error_rate
+        self.min_requests = max(1, min_requests)
+        self.open_s = open_s
+        self.half_open_probes = max(1, half_open_probes)
+        self.state = "closed"
+        self._outcomes: Deque[bool] = deque(maxlen=max(1, window))
+        self._opened_at = 0.0
+        self._probes = 0
+        self.opened = 0
+        self.rejected = 0
+
+    def allow(self) -> bool:
+        if not self.enabled:
+            return True
+        if self.state == "open":
+            if time.monotonic() - self._opened_at < self.open_s:
+                self.rejected += 1
+                return False
+            self.state = "half_open"
+            self._probes = 0
+        if self.state == "half_open":
+            if self._probes >= self.half_open_probes:
+                self.rejected += 1
+                return False
+            self._probes += 1
+        return True
+
+    def cancel(self):
+        """Zugelassener Call wurde vom Aufrufer abgebrochen: Probe-Slot zurückgeben, nichts zählen."""
+        if self.enabled and self.state == "half_open":
+            self._probes = max(0, self._probes - 1)
+
+    def record(self, ok: bool):
+        if not self.enabled:
+            return
+        if self.state == "half_open":
+            self._probes = max(0, self._probes - 1)
+            if ok:
+                self.state = "closed"
+                self._outcomes.clear()
+            else:
+                self._open()
+            return
+        if self.state == "open":
+            return
+        self._outcomes.append(ok)
+        n = len(self._outcomes)
+        if n >= self.min_requests and (n - sum(self._outcomes)) / n >= self.error_rate:
+            self._open()
+
+    def _open(self):
+        self.state = "open"
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self.opened += 1
+
+    def stats(self) -> Dict[str, Any]:
+        n = len(self._outcomes)
+        return {
+            "enabled": self.enabled,
+            "state": self.state,
+            "error_rate": round((n - sum(self._outcomes)) / n, 3) if n else 0.0,
+            "window": n,
+            "threshold": self.error_rate,
+            "opened_total": self.opened,
+            "rejected_total": self.rejected,
+        }
+
+
+class HedgeBudget:
+    """
+    Prozessweites Budget für gehedgte Fallback-Läufe (Token-Bucket wie ein Retry-Budget):
+    jeder Request zahlt `ratio` Token ein (max. `burst`), ein Hedge kostet 1 Token und
+    höchstens `max_inflight` Hedges laufen gleichzeitig. Verschwendete Arbeit bleibt so bei
+    ≈ ratio × Requests. Die Fehlerquote des Normalpfads je Routing-Key (letzte `window`
+    Ergebnisse) führt das Budget selbst – unabhängig davon, ob PathRouter lernt.
+    """
+
+    def __init__(self, ratio: float = 0.1, burst: float = 10.0, max_inflight: int = 8, window: int = 50, min_samples: int = 20, enabled: bool = True):
+        self.enabled = enabled
+        self.ratio = max(0.0, ratio)
+        self.burst = max(1.0, burst)
+        self.max_inflight = max(1, max_inflight)
+        self.window = max(1, window)
+        self.min_samples = max(1, min_samples)
+        self._normal: Dict[Tuple, Deque[bool]] = {}
+        self.tokens = self.burst
+        self.inflight = 0
+        self.hedged = 0
+        self.won = 0
+        self.wasted = 0
+        self.denied = 0
+
+    def deposit(self):
+        self.tokens = min(self.burst, self.tokens + self.ratio)
+
+    def try_acquire(self) -> bool:
+        if not self.enabled:
+            return False
+        if self.tokens < 1.0 or self.inflight >= self.max_inflight:
+            self.denied += 1
+            return False
+        self.tokens -= 1.0
+        self.inflight += 1
+        self.hedged += 1
+        return True
+
+    def finished(self, _task=None):
+        """Hedge-Lauf beendet oder abgebrochen (als add_done_callback verwendbar)."""
+        self.inflight -= 1
+
+    def record(self, won: bool):
+        if won:
+            self.won += 1
+        else:
+            self.wasted += 1
+
+    def observe(self, key: Tuple, ok: bool):
+        """Ergebnis des Normalpfads für `key` (nur mit aktivem Hedging gesammelt)."""
+        if not self.enabled:
+            return
+        q = self._normal.get(key)
+        if q is None:
+            q = self._normal[key] = deque(maxlen=self.window)
+        q.append(bool(ok))
+
+    def fallback_rate(self, key: Tuple) -> float | None:
+        """Fehlerquote des Normalpfads für `key`; None unter `min_samples` Ergebnissen."""
+        q = self._normal.get(key)
+        if not q or len(q) < self.min_samples:
+            return None
+        return 1.0 - sum(q) / len(q)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "ratio": self.ratio,
+            "tokens": round(self.tokens, 2),
+            "inflight": self.inflight,
+            "hedged_total": self.hedged,
+            "won_total": self.won,
+            "wasted_total": self.wasted,
+            "denied_total": self.denied,
+        }
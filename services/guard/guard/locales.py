@@ -1,5 +1,5 @@
-import os, json
-from typing import List
+import os, json, hashlib
+from typing import Any, Callable, List, Tuple
 # lang wird über sys.path in mt_guard.py importiert
 
 def _default_list() -> list[str]:
@@ -52,3 +52,48 @@ def map_locales_with_engine(codes: list[str]) -> list[dict]:
         except Exception:
             out.append({"bcp47": code, "engine": (code.split("-")[0] if code else "")})
     return out
+
+
+class PrecomputedBody:
+    """
+    Einmal gerenderter Response-Body (bytes) mit ETag für statische Endpoints (/locales,
+    /locales.csv, /capabilities). Neu gebaut nur, wenn sich stamp() ändert (z. B. mtime
+    der Locales-Datei), statt pro Request Locales zu laden, zu normalisieren und zu serialisieren.
+    """
+
+    def __init__(self, build: Callable[[], bytes], stamp: Callable[[], Any] = lambda: None):
+        self._build = build
+        self._stamp = stamp
+        self._key: Any = object()
+        self._body = b""
+        self._etag = ""
+
+    def get(self) -> Tuple[bytes, str]:
+        key = self._stamp()
+        if key != self._key:
+            body = self._build()
+            self._body, self._etag = body, '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+            self._key = key
+        return self._body, self._etag
+
+
+def file_stamp(path: str | None):
+    """mtime der Datei (None, wenn kein Pfad/keine Datei) – als PrecomputedBody-stamp."""
+    if not path:
+        return None
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def json_body(obj: Any) -> bytes:
+    # wie Starlettes JSONResponse
+    return json.dumps(obj, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags or ("W/" + etag) in tags
@@ -0,0 +1,164 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Tuple
+
+# Standard-Buckets (Sekunden) für Latenzen; Stage-Buckets feiner, Batch-Größen ganzzahlig
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+def _fmt(v: float) -> str:
+    return "+Inf" if v == float("inf") else repr(float(v))
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    kv = [f'{k}="{v}"' for k, v in zip(names, values)]
+    if extra:
+        kv.append(extra)
+    return "{" + ",".join(kv) + "}" if kv else ""
+
+
+class Histogram:
+    """Prometheus-Histogramm (kumulative Buckets, _sum, _count) mit Labels; thread-safe."""
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(k, "")) for k in self.labelnames)
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            s = self._series.get(key)
+            if s is None:
+                s = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            s[0][i] += 1
+            s[1] += value
+            s[2] += 1
+
+    def render(self) -> str:
+        with self._lock:
+            series = {k: ([*v[0]], v[1], v[2]) for k, v in self._series.items()}
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total, n) in sorted(series.items()):
+            acc = 0
+            for le, c in zip(self.buckets + (float("inf"),), counts):
+                acc += c
+                le_kv = 'le="' + _fmt(le) + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le_kv)} {acc}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {total:.6f}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {n}")
+        return "\n".join(lines) + "\n"
+
+
+class Counters:
+    """Thread-safe Zähler (ersetzt `dict[key] += n` aus Executor-Threads)."""
+
+    def __init__(self, initial: Dict[str, float]):
+        self._d = dict(initial)
+        self._lock = threading.Lock()
+
+    def inc(self, key: str, n: float = 1):
+        with self._lock:
+            self._d[key] = self._d.get(key, 0) + n
+
+    def __getitem__(self, key: str):
+        with self._lock:
+            return self._d.get(key, 0)
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._d)
+
+
+REQUEST_LATENCY = Histogram(
+    "anni_translate_latency_seconds", "End-to-end translate_one latency",
+    ("target", "fallback"), LATENCY_BUCKETS,
+)
+STAGE_SECONDS = Histogram(
+    "anni_stage_seconds", "Time per translate_one pipeline stage",
+    ("stage", "target"), STAGE_BUCKETS,
+)
+BATCH_SIZE = Histogram(
+    "anni_batch_size", "Items per batch (request=/translate_batch, stream=/translate_stream, round/microbatch=worker /translate_batch)",
+    ("kind",), SIZE_BUCKETS,
+)
+
+
+def fallback_label(checks: dict | None) -> str:
+    """Fallback-Grund ohne variable Teile (breaker_degrade_spans_only:missing_placeholders:3 → breaker_degrade_spans_only)."""
+    fb = str((checks or {}).get("fallback_used") or "")
+    if not fb:
+        return "cache_hit" if (checks or {}).get("cache_used") == "hit" else "none"
+    return fb.split(":", 1)[0]
+
+
+class StageTimer:
+    """
+    Monotone Stage-Zeiten eines translate_one-Laufs. lap(name) bucht die Zeit seit dem
+    letzten lap auf `name`; add(name, s) bucht direkt (z. B. parallele Pivot-Calls).
+    finish() schreibt jede Stage einmal pro Request in STAGE_SECONDS; mit observe=False (Teilstück
+    eines Dokuments) nur die Gesamtzeit, der Dokument-Timer übernimmt die Stages.
+    """
+    __slots__ = ("target", "observe", "t0", "_last", "stages", "total")
+
+    def __init__(self, target: str = "", observe: bool = True):
+        self.target = target
+        self.observe = observe
+        self.t0 = self._last = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self.total: float | None = None
+
+    def lap(self, name: str):
+        now = time.perf_counter()
+        self.stages[name] = self.stages.get(name, 0.0) + (now - self._last)
+        self._last = now
+
+    def add(self, name: str, seconds: float):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def skip(self):
+        """Zeit seit dem letzten lap keiner Stage zuordnen (bereits über add() gebucht)."""
+        self._last = time.perf_counter()
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.t0
+
+    def finish(self, checks: dict | None) -> float:
+        total = self.total = self.elapsed()
+        if not self.observe:
+            return total
+        for name, secs in self.stages.items():
+            STAGE_SECONDS.observe(secs, stage=name, target=self.target)
+        REQUEST_LATENCY.observe(total, target=self.target, fallback=fallback_label(checks))
+        return total
+
+    def as_ms(self) -> Dict[str, float]:
+        """Stage-Aufschlüsselung in Millisekunden (für den debug-Payload)."""
+        out = {name: round(secs * 1000.0, 3) for name, secs in self.stages.items()}
+        out["total"] = round((self.total if self.total is not None else self.elapsed()) * 1000.0, 3)
+        return out
+
+
+def server_timing(timers: List[StageTimer], total: float | None = None) -> str:
+    """
+    Server-Timing-Header (dur in ms). Mehrere Timer (Batch) werden pro Stage summiert –
+    Items laufen parallel, die Summen können also über der Wanduhrzeit `total` liegen.
+    """
+    sums: Dict[str, float] = {}
+    for t in timers:
+        for name, secs in t.stages.items():
+            sums[name] = sums.get(name, 0.0) + secs
+    if total is None:
+        total = max((t.total if t.total is not None else t.elapsed() for t in timers), default=0.0)
+    parts = [f"{name};dur={secs * 1000.0:.1f}" for name, secs in sums.items()]
+    if len(timers) > 1:
+        parts.append(f'items;desc="{len(timers)}"')
+    parts.append(f"total;dur={total * 1000.0:.1f}")
+    return ", ".join(parts)
@@ -0,0 +1,219 @@
+import asyncio
+import random
+import re
+from typing import Any, Callable, Dict, List, NamedTuple
+
+import httpx
+
+from .worker import CircuitOpenError, WorkerClient, WorkerError
+
+
+class BackendSpec(NamedTuple):
+    name: str
+    url: str
+    weight: float = 1.0
+    fallback: bool = False
+
+
+def _base_url(u: str) -> str:
+    u = (u or "").strip().rstrip("/")
+    return re.sub(r"/translate$", "", u, flags=re.IGNORECASE)
+
+
+def parse_backends(spec: str) -> List[BackendSpec]:
+    """WORKER_BACKENDS: "http://a:8093|3,http://b:8093" (|weight optional, Default 1)."""
+    out: List[BackendSpec] = []
+    for i, part in enumerate(p.strip() for p in (spec or "").split(",")):
+        if not part:
+            continue
+        url, _, w = part.partition("|")
+        out.append(BackendSpec(f"w{i}", _base_url(url), float(w or 1.0)))
+    return out
+
+
+def load_router_yaml(path: str) -> List[BackendSpec]:
+    """
+    config/router.yaml: translators.<name>.url (type mt) + router.weights / router.fallback.
+    Fallback-Backends (String oder Liste) werden nur genutzt, wenn kein primäres Backend verfügbar ist.
+    """
+    import yaml  # optional, nur für WORKER_ROUTER_PATH nötig
+
+    with open(path, "r", encoding="utf-8") as f:
+        cfg = yaml.safe_load(f) or {}
+    translators = cfg.get("translators") or {}
+    router = cfg.get("router") or {}
+    weights = router.get("weights") or {}
+    fb = router.get("fallback") or []
+    fallbacks = {fb} if isinstance(fb, str) else set(fb)
+    out: List[BackendSpec] = []
+    for name, t in translators.items():
+        if not isinstance(t, dict) or (t.get("type") or "mt") != "mt" or not t.get("url"):
+            continue
+        w = float(weights.get(name, 1.0 if not weights else 0.0))
+        if w <= 0 and name not in fallbacks:
+            continue
+        out.append(BackendSpec(str(name), _base_url(t["url"]), w if w > 0 else 1.0, name in fallbacks))
+    return out
+
+
+class _Backend:
+    __slots__ = ("spec", "client", "outstanding", "healthy", "fails", "picked")
+
+    def __init__(self, spec: BackendSpec, client: WorkerClient):
+        self.spec = spec
+        self.client = client
+        self.outstanding = 0
+        self.healthy = True
+        self.fails = 0
+        self.picked = 0
+
+    def available(self) -> bool:
+        b = self.client.breaker
+        return self.healthy and (b is None or b.state != "open")
+
+
+class WorkerPool:
+    """
+    Mehrere Worker-Replicas hinter einer WorkerClient-kompatiblen Schnittstelle.
+    Auswahl: least-outstanding-requests, gewichtet ((outstanding+1)/weight) unter den
+    verfügbaren primären Backends; Fallback-Backends nur, wenn kein primäres verfügbar ist.
+    Ausgeworfen wird per Health-Probe (eject_after Fehlschläge in Folge) oder offenem Breaker.
+    Schlägt ein Call mit 5xx/Transportfehler/offenem Breaker fehl, wird einmal auf ein
+    anderes Backend ausgewichen.
+    """
+
+    def __init__(self, specs: List[BackendSpec], make_client: Callable[[BackendSpec], WorkerClient], health_interval_s: float = 5.0, eject_after: int = 2, failover: int = 1):
+        if not specs:
+            raise ValueError("WorkerPool needs at least one backend")
+        self.backends = [_Backend(s, make_client(s)) for s in specs]
+        self.health_interval_s = health_interval_s
+        self.eject_after = max(1, eject_after)
+        self.failover = max(0, failover)
+        self._probe_task: asyncio.Task | None = None
+        self.failovers = 0
+
+    @property
+    def base(self) -> str:
+        return ",".join(b.spec.url for b in self.backends)
+
+    # -- Auswahl
+    def _candidates(self, exclude: set) -> List[_Backend]:
+        prim = [b for b in self.backends if not b.spec.fallback and b.available() and id(b) not in exclude]
+        if prim:
+            return prim
+        fb = [b for b in self.backends if b.spec.fallback and b.available() and id(b) not in exclude]
+        if fb:
+            return fb
+        # alles ausgeworfen: trotzdem versuchen (Breaker entscheidet), statt hart zu scheitern
+        return [b for b in self.backends if id(b) not in exclude]
+
+    def _pick(self, exclude: set) -> _Backend | None:
+        self._ensure_probe()
+        cands = self._candidates(exclude)
+        if not cands:
+            return None
+        best = min((b.outstanding + 1) / b.spec.weight for b in cands)
+        return random.choice([b for b in cands if (b.outstanding + 1) / b.spec.weight == best])
+
+    async def _call(self, fn: Callable[[WorkerClient], Any]):
+        tried: set = set()
+        last_exc: Exception | None = None
+        for attempt in range(self.failover + 1):
+            b = self._pick(tried)
+            if b is None:
+                break
+            tried.add(id(b))
+            if attempt:
+                self.failovers += 1
+            b.outstanding += 1
+            b.picked += 1
+            try:
+                return await fn(b.client)
+            except CircuitOpenError as e:
+                last_exc = e
+            except WorkerError as e:
+                if e.status_code < 500:
+                    raise
+                last_exc = e
+            except (httpx.TransportError, asyncio.TimeoutError) as e:
+                last_exc = e
+            finally:
+                b.outstanding -= 1
+        raise last_exc if last_exc is not None else CircuitOpenError()
+
+    # -- WorkerClient-Schnittstelle
+    async def translate(self, payload: Dict[str, Any], timeout: float | None = None) -> Dict[str, Any]:
+        return await self._call(lambda c: c.translate(payload, timeout))
+
+    async def translate_text(self, text: str, src: str, tgt: str, max_new_tokens: int | None = None, timeout: float | None = None) -> str:
+        return await self._call(lambda c: c.translate_text(text, src, tgt, max_new_tokens, timeout))
+
+    async def translate_batch(self, texts: List[str], src: str, tgt: str, max_new_tokens: int | None = None, timeout: float | None = None) -> List[str]:
+        return await self._call(lambda c: c.translate_batch(texts, src, tgt, max_new_tokens, timeout))
+
+    async def health(self, timeout: float = 3.0) -> bool:
+        await self.probe(timeout)
+        return any(b.healthy for b in self.backends)
+
+    # -- Health-Probes
+    async def probe(self, timeout: float = 3.0):
+        results = await asyncio.gather(*[b.client.health(timeout=timeout) for b in self.backends])
+        for b, ok in zip(self.backends, results):
+            if ok:
+                b.fails = 0
+                b.healthy = True
+            else:
+                b.fails += 1
+                if b.fails >= self.eject_after:
+                    b.healthy = False
+
+    def _ensure_probe(self):
+        if self._probe_task is None and self.health_interval_s > 0:
+            self._probe_task = asyncio.ensure_future(self._probe_loop())
+
+    async def _probe_loop(self):
+        while True:
+            try:
+                await self.probe()
+            except Exception:
+                pass
+            await asyncio.sleep(self.health_interval_s)
+
+    def clients(self) -> List[tuple]:
+        return [(b.spec.name, b.client) for b in self.backends]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "strategy": "least_outstanding_weighted",
+            "failovers": self.failovers,
+            "backends": [
+                {
+                    "name": b.spec.name,
+                    "url": b.spec.url,
+                    "weight": b.spec.weight,
+                    "fallback": b.spec.fallback,
+                    "healthy": b.healthy,
+                    "available": b.available(),
+                    "outstanding": b.outstanding,
+                    "picked": b.picked,
+                    **b.client.stats(),
+                }
+                for b in self.backends
+            ],
+        }
+
+    async def aclose(self):
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            self._probe_task = None
+        for b in self.backends:
+            await b.client.aclose()
+
+
+def resolve_backends(default_url: str, router_path: str = "", spec: str = "") -> List[BackendSpec]:
+    """WORKER_ROUTER_PATH (router.yaml) > WORKER_BACKENDS (CSV) > einzelnes default_url."""
+    if router_path:
+        specs = load_router_yaml(router_path)
+        if specs:
+            return specs
+    return parse_backends(spec) or [BackendSpec("default", _base_url(default_url))]
@@ -0,0 +1,100 @@
+import math
+import re
+import unicodedata as _ud
+from collections import Counter
+from typing import List, Tuple
+
+# Wiederholungs-/Gibberish-Erkennung für Worker-Outputs, gemeinsam für Spans-only, Interleave
+# und should_degrade. Schleifen am Textende ("… gut gut gut gut", abgeschnitten bei max_new_tokens)
+# werden pro Periodenlänge per Galopp-/Binärsuche über Slice-Vergleiche gefunden (C-Speed, kein
+# Aufbau von Einheit × Länge); Zeichenfolgen-Regexe matchen mit fester Länge (≤ 10 Schritte je Position).
+
+_WORD_RE = re.compile(r"\w+")
+_RUN_RE = re.compile(r"(.)\1{9}")         # 10x dasselbe Zeichen (ohne Zeilenumbrüche)
+_ANGLE_RE = re.compile(r"[<>]{8}")        # <<<<<<<<
+_TAIL_STRIP = " \t\r\n.,;:!?…。、！？"
+
+
+def _periodic(t: str, n: int, length: int, p: int) -> bool:
+    """Hat das Suffix t[n-length:] die Periode p?"""
+    return t[n - length:n - p] == t[n - length + p:]
+
+
+def tail_loop(s: str, max_period: int = 64, min_repeats: float = 4.0) -> Tuple[int, int]:
+    """
+    (Periode, Länge) des längsten Suffixes von `s` (ohne abschließende Satzzeichen/Leerzeichen),
+    das aus ≥ min_repeats Wiederholungen einer Einheit von ≤ max_period Zeichen besteht; die letzte
+    Wiederholung darf abgeschnitten sein. (0, 0), wenn es keine solche Schleife gibt.
+    Pro Periode: ein Test der Mindestlänge, nur bei Treffer Galopp + Binärsuche → für normalen
+    Text O(max_period²) Zeichenvergleiche, für Schleifen O(n log n) in memcmp.
+    """
+    t = s.rstrip(_TAIL_STRIP)
+    n = len(t)
+    best_p = best_len = 0
+    for p in range(1, min(max_period, int(n / min_repeats)) + 1):
+        if best_len == n:
+            break  # ganzer Text ist schon eine Schleife
+        if t[n - 1] != t[n - 1 - p]:
+            continue
+        good = math.ceil(min_repeats * p)
+        if not _periodic(t, n, good, p):
+            continue
+        bad = n + 1
+        while good < n:
+            probe = min(n, good * 2)
+            if _periodic(t, n, probe, p):
+                good = probe
+            else:
+                bad = probe
+                break
+        while bad - good > 1:
+            mid = (good + bad) // 2
+            if _periodic(t, n, mid, p):
+                good = mid
+            else:
+                bad = mid
+        if good > best_len:
+            best_p, best_len = p, good
+    return best_p, best_len
+
+
+def _token_stats(toks: List[str]) -> Tuple[int, int, int]:
+    """(Anzahl Tokens, verschiedene Tokens, Häufigkeit des häufigsten Tokens)."""
+    counts = Counter(toks)
+    if not counts:
+        return 0, 0, 0
+    return len(toks), len(counts), counts.most_common(1)[0][1]
+
+
+def is_degenerate(out: str, src: str = "") -> bool:
+    """
+    Anti-Loop für übersetzte Segmente: sehr geringe Zeichenvielfalt, Schleife über mindestens die
+    Hälfte des Outputs, ein Token > 65 % aller Tokens oder Überlänge relativ zur Quelle (src).
+    Kurze Outputs (< 16 Zeichen) gelten nie als entartet.
+    """
+    n = len(out or "")
+    if n < 16:
+        return False
+    if len(set(out)) / n < 0.12:
+        return True
+    if src and n > len(src) * 6 + 64:
+        return True
+    if tail_loop(out)[1] >= max(16, n * 0.5):
+        return True
+    toks, _, top = _token_stats(_WORD_RE.findall(out))
+    return toks >= 10 and top / toks > 0.65
+
+
+def looks_like_gibberish(s: str) -> bool:
+    """Gibberish im kompletten Worker-Output (für should_degrade)."""
+    t = _ud.normalize("NFKC", (s or "")).strip()
+    if not t or len(t) < 2:
+        return True
+    # Modell läuft in eine Schleife (typisch bis max_new_tokens) – billigster Test, daher zuerst
+    if len(t) >= 64 and tail_loop(t)[1] >= len(t) * 0.5:
+        return True
+    if _RUN_RE.search(t) or (("<" in t or ">" in t) and _ANGLE_RE.search(t)):
+        return True
+    # Tokens wie bisher per Whitespace ("!!!" / "--" zählen mit, Satzzeichen hängen am Wort)
+    toks, distinct, top = _token_stats(t.split())
+    return toks >= 8 and distinct / toks < 0.2 and top / toks >= 0.25   # low variety
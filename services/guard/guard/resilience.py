@@ -1,25 +1,11 @@
-import unicodedata as _ud, re as _re
+import re as _re
+
+from .repetition import looks_like_gibberish as _looks_like_gibberish
 
 _CYR_ENGINES = {"ru","bg","uk","sr","mk","be"}
 _SAFE_PLACEHOLDER_RE = _re.compile(r"\[#INV:(\d+)#\]")
 _STD_PLACEHOLDER_RE  = _re.compile(r"<\|INV:(\d+):([0-9A-Fa-f]{4,8})\|>")
 
-def _norm(s:str)->str:
-    return _ud.normalize("NFKC", (s or "")).strip()
-
-def _looks_like_gibberish(s:str)->bool:
-    t=_norm(s)
-    if not t or len(t)<2: return True
-    if _re.search(r"(.)\1{9,}", t): return True               # 10x gleich
-    if _re.search(r"[<>]{8,}", t): return True                # <<<<<<<<
-    toks=t.split()
-    if len(toks)>=8:
-        from collections import Counter
-        c=Counter(toks); top=c.most_common(1)[0][1]
-        if len(c)/len(toks) < 0.2 and top/len(toks) >= 0.25:  # low variety
-            return True
-    return False
-
 def _count_ph(s:str)->int:
     return len(_SAFE_PLACEHOLDER_RE.findall(s)) + len(_STD_PLACEHOLDER_RE.findall(s))
 
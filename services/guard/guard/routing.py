@@ -0,0 +1,100 @@
+import random
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Tuple
+
+# Pfade der translate_one-Pipeline in Fallback-Reihenfolge
+PATHS = ("normal", "v3b", "interleave", "spans_only")
+# Als Startpfad lernbar: v3b nicht (verwirft inneres Markup, ok ohne Validierung der vollen Mapping)
+LEARNABLE = ("interleave", "spans_only")
+
+
+def route_key(tgt_engine: str, has_html: bool, n_invariants: int, text_len: int) -> Tuple[str, bool, str]:
+    """(Ziel-Engine, HTML ja/nein, Invarianten-Dichte pro 100 Zeichen als Bucket)."""
+    density = 100.0 * n_invariants / max(1, text_len)
+    if n_invariants == 0:
+        bucket = "none"
+    elif density < 2:
+        bucket = "low"
+    elif density < 5:
+        bucket = "mid"
+    else:
+        bucket = "high"
+    return (tgt_engine, bool(has_html), bucket)
+
+
+class PathRouter:
+    """
+    Rollierende Erfolgsstatistik je (Ziel-Engine, has_html, Dichte) und Pipeline-Pfad
+    (letzte `window` Ergebnisse). choose() startet direkt mit dem Fallback-Pfad, wenn der
+    Normalpfad dort fast immer scheitert und ein späterer Pfad deutlich besser besteht –
+    verallgemeinert SPANS_ONLY_FORCE_ENGINES. Mit Wahrscheinlichkeit `explore` läuft trotzdem
+    der Normalpfad, damit seine Statistik aktuell bleibt.
+    """
+
+    def __init__(self, window: int = 50, min_samples: int = 20, skip_below: float = 0.3, margin: float = 0.3, explore: float = 0.05, enabled: bool = True):
+        self.window = max(1, window)
+        self.min_samples = max(1, min_samples)
+        self.skip_below = skip_below
+        self.margin = margin
+        self.explore = explore
+        self.enabled = enabled
+        self._stats: Dict[Tuple, Dict[str, Deque[bool]]] = {}
+        self._lock = threading.Lock()
+        self.routed = 0
+
+    def record(self, key: Tuple, path: str, ok: bool):
+        if not self.enabled:
+            return
+        with self._lock:
+            paths = self._stats.setdefault(key, {})
+            q = paths.get(path)
+            if q is None:
+                q = paths[path] = deque(maxlen=self.window)
+            q.append(bool(ok))
+
+    def _rate(self, paths: Dict[str, Deque[bool]], path: str) -> Tuple[float, int]:
+        q = paths.get(path)
+        if not q:
+            return 0.0, 0
+        return sum(q) / len(q), len(q)
+
+    def _best(self, paths: Dict[str, Deque[bool]]) -> str:
+        normal, n = self._rate(paths, "normal")
+        if n < self.min_samples or normal >= self.skip_below:
+            return "normal"
+        best, best_rate = "normal", normal + self.margin
+        for path in LEARNABLE:
+            rate, m = self._rate(paths, path)
+            if m >= self.min_samples and rate >= best_rate:
+                best, best_rate = path, rate
+        return best
+
+    def pass_rate(self, key: Tuple, path: str) -> Tuple[float, int]:
+        """(Erfolgsquote, Anzahl) der letzten Ergebnisse von `path` für `key`."""
+        with self._lock:
+            return self._rate(self._stats.get(key) or {}, path)
+
+    def choose(self, key: Tuple) -> str:
+        if not self.enabled:
+            return "normal"
+        with self._lock:
+            paths = self._stats.get(key)
+            path = self._best(paths) if paths else "normal"
+        if path != "normal":
+            if random.random() < self.explore:
+                return "normal"
+            self.routed += 1
+        return path
+
+    def table(self) -> Dict[str, Any]:
+        with self._lock:
+            snap = {k: {p: list(q) for p, q in v.items()} for k, v in self._stats.items()}
+        out = {}
+        for key, paths in sorted(snap.items()):
+            dq = {p: deque(v) for p, v in paths.items()}
+            out["|".join((key[0], "html" if key[1] else "text", key[2]))] = {
+                "start": self._best(dq),
+                "paths": {p: {"n": len(v), "success_rate": round(sum(v) / len(v), 3)} for p, v in paths.items() if v},
+            }
+        return {"enabled": self.enabled, "routed_total": self.routed, "routes": out}
@@ -0,0 +1,55 @@
+import asyncio
+from typing import Any, Dict
+
+
+class LeaderCancelled(Exception):
+    """Leader wurde abgebrochen (Disconnect, verlorener Hedge): Wartende joinen neu."""
+
+
+class SingleFlight:
+    """
+    Request-Coalescing pro Key (z. B. cache_key): der erste Aufrufer (Leader) arbeitet,
+    gleichzeitige Duplikate warten auf sein Ergebnis statt selbst den Worker zu rufen.
+    Bricht der Leader ab, bekommen Wartende LeaderCancelled und joinen neu – der erste wird
+    neuer Leader, statt dass fremde Requests den Abbruch als Fehler erben.
+    """
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.leaders = 0
+        self.coalesced = 0
+        self.handoffs = 0
+
+    def join(self, key: str) -> asyncio.Future | None:
+        """None → Aufrufer ist Leader und muss resolve() aufrufen; sonst Future des Leaders."""
+        fut = self._inflight.get(key)
+        if fut is not None:
+            self.coalesced += 1
+            return fut
+        self._inflight[key] = asyncio.get_running_loop().create_future()
+        self.leaders += 1
+        return None
+
+    def resolve(self, key: str, value: Any = None, exc: BaseException | None = None):
+        fut = self._inflight.pop(key, None)
+        if fut is None or fut.done():
+            return
+        if exc is not None:
+            fut.set_exception(exc)
+            fut.exception()  # ohne Wartende keine "never retrieved"-Warnung
+        else:
+            fut.set_result(value)
+
+    def cancel(self, key: str):
+        """Leader abgebrochen: Wartende wecken, ohne ihnen einen Fehler zu liefern."""
+        fut = self._inflight.get(key)
+        if fut is not None and not fut.done():
+            self.handoffs += 1
+        self.resolve(key, exc=LeaderCancelled(key))
+
+    @staticmethod
+    async def wait(fut: asyncio.Future) -> Any:
+        # shield: ein abgebrochener Wartender bricht nicht das gemeinsame Ergebnis ab
+        return await asyncio.shield(fut)
+
+    def stats(self) -> Dict[str, int]:
+        return {"leaders": self.leaders, "coalesced": self.coalesced, "handoffs": self.handoffs, "inflight": len(self._inflight)}
@@ -0,0 +1,143 @@
+import asyncio
+import json
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+class BadLine:
+    """Nicht parsebare Eingabezeile; bekommt im Stream eine eigene Fehlerzeile."""
+    __slots__ = ("error",)
+
+    def __init__(self, error: str):
+        self.error = error
+
+
+def _parse_line(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        return BadLine(f"invalid_json: {e}")
+
+
+async def iter_items(chunks: AsyncIterator[bytes]) -> AsyncIterator[Any]:
+    """
+    Items aus einem Request-Body: NDJSON (eine JSON-Zeile pro Item, inkrementell gelesen)
+    oder ein JSON-Array (beginnt mit '[', wird am Stück geparst). Leerzeilen werden übersprungen.
+    """
+    buf = b""
+    mode = None
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        buf += chunk
+        if mode is None:
+            head = buf.lstrip()
+            if not head:
+                buf = b""
+                continue
+            mode = "array" if head[:1] == b"[" else "ndjson"
+        if mode == "ndjson" and b"\n" in buf:
+            *lines, buf = buf.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield _parse_line(line)
+    if mode == "array":
+        arr = _parse_line(buf)
+        if isinstance(arr, BadLine):
+            yield arr
+        elif not isinstance(arr, list):
+            yield BadLine("invalid_json: expected array")
+        else:
+            for item in arr:
+                yield item
+    elif buf.strip():
+        yield _parse_line(buf)
+
+
+async def read_items(chunks: AsyncIterator[bytes]) -> Tuple[List[Any], Optional[str]]:
+    """
+    Liest den ganzen Body vor Antwortbeginn: Starlettes StreamingResponse lauscht parallel auf
+    receive() (Disconnect) und konsumiert dabei Body-Nachrichten, die ein Leser im Generator
+    nie sähe. Liefert (items, read_error); ein Lesefehler nach n Items behält die n Items.
+    """
+    items: List[Any] = []
+    try:
+        async for item in iter_items(chunks):
+            items.append(item)
+    except Exception as e:
+        return items, str(e) or type(e).__name__
+    return items, None
+
+
+async def replay(items: List[Any], read_error: Optional[str] = None) -> AsyncIterator[Any]:
+    """Gelesene Items als AsyncIterator für run_stream; ein Lesefehler landet in der Summary."""
+    for item in items:
+        yield item
+    if read_error:
+        raise IOError(read_error)
+
+
+_DONE = object()
+
+
+async def run_stream(
+    items: AsyncIterator[Any],
+    handle: Callable[[int, Any], Awaitable[Dict[str, Any]]],
+    concurrency: int = 16,
+    queue_size: int = 64,
+) -> AsyncIterator[bytes]:
+    """
+    Übersetzt Items mit höchstens `concurrency` gleichzeitigen handle()-Aufrufen und liefert
+    je Item eine NDJSON-Zeile in Fertigstellungsreihenfolge, am Ende eine Summary-Zeile.
+    Backpressure: beide Queues sind begrenzt – liest der Client nicht, stoppen die Worker.
+    Bricht der Client ab, werden alle Tasks gecancelt.
+    """
+    concurrency = max(1, concurrency)
+    inq: asyncio.Queue = asyncio.Queue(maxsize=max(1, queue_size))
+    outq: asyncio.Queue = asyncio.Queue(maxsize=max(1, queue_size))
+    state = {"read": 0, "read_error": None}
+
+    async def produce():
+        try:
+            async for item in items:
+                await inq.put((state["read"], item))
+                state["read"] += 1
+        except Exception as e:
+            state["read_error"] = str(e)
+        finally:
+            for _ in range(concurrency):
+                await inq.put(_DONE)
+
+    async def work():
+        while True:
+            job = await inq.get()
+            if job is _DONE:
+                break
+            idx, item = job
+            try:
+                line = await handle(idx, item)
+            except Exception as e:
+                line = {"index": idx, "translated_text": "", "checks": {"ok": False, "error": str(e)}}
+            await outq.put(line)
+        await outq.put(_DONE)
+
+    tasks = [asyncio.ensure_future(produce())] + [asyncio.ensure_future(work()) for _ in range(concurrency)]
+    finished = 0
+    ok = 0
+    total = 0
+    try:
+        while finished < concurrency:
+            line = await outq.get()
+            if line is _DONE:
+                finished += 1
+                continue
+            total += 1
+            if (line.get("checks") or {}).get("ok", False):
+                ok += 1
+            yield (json.dumps(line, ensure_ascii=False) + "\n").encode("utf-8")
+        summary: Dict[str, Any] = {"done": True, "counts": {"total": total, "ok": ok, "failed": total - ok}}
+        if state["read_error"]:
+            summary["error"] = state["read_error"]
+        yield (json.dumps(summary, ensure_ascii=False) + "\n").encode("utf-8")
+    finally:
+        for t in tasks:
+            t.cancel()
@@ -0,0 +1,163 @@
+import asyncio
+import time
+from typing import Any, Dict, List
+
+import httpx
+
+from .limiter import AIMDLimiter, CircuitBreaker
+
+# 5xx, die wir (wie früher Retry(total=3) auf der requests-Session) kurz wiederholen
+_RETRY_STATUS = {500, 502, 503, 504}
+# Verbindungsaufbau gescheitert (Worker-Neustart, Replica weg): Request kam nie an
+_RETRY_CONNECT = (httpx.ConnectError, httpx.ConnectTimeout)
+
+
+class WorkerError(Exception):
+    """Worker antwortete mit != 200."""
+    def __init__(self, status_code: int):
+        super().__init__(f"Worker returned {status_code}")
+        self.status_code = status_code
+
+
+class CircuitOpenError(WorkerError):
+    """Circuit Breaker offen: Call wird ohne Worker-Request abgelehnt."""
+    def __init__(self):
+        Exception.__init__(self, "Worker circuit open")
+        self.status_code = 503
+
+
+def _rtt_key(path: str, payload: Dict[str, Any]) -> str:
+    """Basis-RTT je Endpoint und Batch-Größen-Bucket (Zweierpotenz): große Batches sind keine Überlast."""
+    texts = payload.get("texts")
+    if texts is None:
+        return path
+    return f"{path}:{1 << max(0, len(texts) - 1).bit_length()}"
+
+
+class WorkerClient:
+    """
+    Async, gepoolter Client für den MT-Worker (/translate, /translate_batch, /health).
+    Der httpx.AsyncClient wird lazy im laufenden Event-Loop angelegt.
+    """
+    def __init__(self, base: str, timeout: float = 120.0, max_connections: int = 100, max_keepalive: int = 20, retries: int = 3, limiter: AIMDLimiter | None = None, breaker: CircuitBreaker | None = None):
+        self.base = (base or "").rstrip("/")
+        self.timeout = timeout
+        self.retries = max(0, retries)
+        self.limiter = limiter
+        self.breaker = breaker
+        self._limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive)
+        self._client: httpx.AsyncClient | None = None
+        # Pool-Statistik: neue TCP-Verbindungen via httpcore-Trace, Rest ist Reuse
+        self.requests = 0
+        self.connects = 0
+
+    async def _trace(self, event_name: str, info: Dict[str, Any]):
+        if event_name == "connection.connect_tcp.complete":
+            self.connects += 1
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(base_url=self.base, timeout=self.timeout, limits=self._limits, trust_env=False)
+        return self._client
+
+    async def _post(self, path: str, payload: Dict[str, Any], timeout: float | None = None) -> httpx.Response:
+        client = self._get_client()
+        attempt = 0
+        while True:
+            if self.limiter is not None:
+                await self.limiter.acquire()
+            # erst nach dem Slot prüfen: im Limiter wartende Calls sollen nach dem Öffnen nicht mehr durchgehen
+            if self.breaker is not None and not self.breaker.allow():
+                if self.limiter is not None:
+                    self.limiter.cancel()
+                raise CircuitOpenError()
+            self.requests += 1
+            ok = False
+            cancelled = False
+            r = None
+            connect_error: httpx.TransportError | None = None
+            t0 = time.perf_counter()
+            try:
+                r = await client.post(path, json=payload, timeout=timeout or self.timeout, extensions={"trace": self._trace})
+                ok = r.status_code < 500
+            except _RETRY_CONNECT as e:
+                # Verbindung kam nicht zustande: der Worker hat nichts gesehen, Retry ist sicher
+                connect_error = e
+            except asyncio.CancelledError:
+                cancelled = True
+                raise
+            finally:
+                if cancelled:
+                    # Abbruch durch den Aufrufer (verlorener Hedge, Client weg): kein Signal über den Worker
+                    if self.limiter is not None:
+                        self.limiter.cancel()
+                    if self.breaker is not None:
+                        self.breaker.cancel()
+                else:
+                    # Fehler/Timeouts/5xx senken das Limit und zählen für den Breaker; 4xx nicht
+                    if self.limiter is not None:
+                        self.limiter.release(_rtt_key(path, payload), time.perf_counter() - t0, ok)
+                    if self.breaker is not None:
+                        self.breaker.record(ok)
+            retry = connect_error is not None or r.status_code in _RETRY_STATUS
+            # keine Retries, sobald der Breaker nicht mehr geschlossen ist (Last nicht vervielfachen)
+            if not retry or attempt >= self.retries or (self.breaker is not None and self.breaker.state != "closed"):
+                if connect_error is not None:
+                    raise connect_error
+                return r
+            await asyncio.sleep(0.1 * (2 ** attempt))
+            attempt += 1
+
+    async def translate(self, payload: Dict[str, Any], timeout: float | None = None) -> Dict[str, Any]:
+        r = await self._post("/translate", payload, timeout)
+        if r.status_code != 200:
+            raise WorkerError(r.status_code)
+        return r.json()
+
+    async def translate_text(self, text: str, src: str, tgt: str, max_new_tokens: int | None = None, timeout: float | None = None) -> str:
+        payload: Dict[str, Any] = {"source": src, "target": tgt, "text": text}
+        if max_new_tokens:
+            payload["max_new_tokens"] = max_new_tokens
+        j = await self.translate(payload, timeout)
+        return j.get("translated_text", "") or ""
+
+    async def translate_batch(self, texts: List[str], src: str, tgt: str, max_new_tokens: int | None = None, timeout: float | None = None) -> List[str]:
+        payload: Dict[str, Any] = {"source": src, "target": tgt, "texts": texts}
+        if max_new_tokens:
+            payload["max_new_tokens"] = max_new_tokens
+        r = await self._post("/translate_batch", payload, timeout)
+        if r.status_code != 200:
+            raise WorkerError(r.status_code)
+        return r.json().get("translated_texts") or []
+
+    async def health(self, timeout: float = 3.0) -> bool:
+        try:
+            self.requests += 1
+            r = await self._get_client().get("/health", timeout=timeout, extensions={"trace": self._trace})
+            return r.status_code == 200 and bool(r.json().get("ok", False))
+        except Exception:
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        open_n = idle_n = 0
+        pool = getattr(getattr(self._client, "_transport", None), "_pool", None)
+        for c in (getattr(pool, "connections", None) or []):
+            open_n += 1
+            if c.is_idle():
+                idle_n += 1
+        reused = max(0, self.requests - self.connects)
+        return {
+            "backend": self.base,
+            "max_connections": self._limits.max_connections,
+            "max_keepalive": self._limits.max_keepalive_connections,
+            "open": open_n,
+            "idle": idle_n,
+            "requests": self.requests,
+            "new_connections": self.connects,
+            "reuse_ratio": round(reused / self.requests, 3) if self.requests else 0.0,
+        }
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
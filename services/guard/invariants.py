@@ -7,6 +7,8 @@ Uses stable sentinels <|INV:{id}:{crc}|> with CRC validation.
 import re
 import hashlib
 import unicodedata
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
 from typing import List, Dict, Tuple, Any
 
 # Simple regex patterns for robust matching
@@ -58,6 +60,42 @@ def make_crc(raw: str) -> str:
     return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:6].upper()
 
 
+# RTL-Isolates (U+2066..U+2069) und "♰" (U+2670)
+_SCRUB_DROP_CHARS = ("\u2066", "\u2067", "\u2068", "\u2069", "♰")
+# "<"/">"-Artefakte (keine gültigen Tags); ein ">" direkt nach entfernten "<" prüft der Callback
+_SCRUB_ANGLE_RE = re.compile(r"<(?![a-zA-Z/])|(?<![a-zA-Z/])>")
+# Sentinel-Reste ohne <>
+_SCRUB_INV = r"\|\s*INV\s*:\s*\d+\s*:\s*[0-9A-Fa-f]{4,8}\s*\|"
+_SCRUB_INV_RE = re.compile(_SCRUB_INV)
+# Läufe aus Whitespace/Sentinel-Resten, die sich ändern würden (ein einzelnes " " vor Nicht-Satzzeichen
+# bleibt ohne Callback stehen); Lookahead-Gruppe 1 = folgendes Satzzeichen
+_SCRUB_INV_WS_RE = re.compile(
+    fr"(?:(?:\s|{_SCRUB_INV}){{2,}}|[^\S ]|{_SCRUB_INV}| (?=[.,!?;:]))(?=([.,!?;:])?)"
+)
+_ANGLE_KEEP_PREV = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ/")
+
+
+def _scrub_angle(m: re.Match) -> str:
+    if m.group(0) == "<":
+        return ""
+    # ">" bleibt nur nach Buchstabe oder "/" – gezählt im Text nach Entfernen der "<" davor
+    s, i = m.string, m.start() - 1
+    while i >= 0 and s[i] == "<":
+        i -= 1
+    return ">" if i >= 0 and s[i] in _ANGLE_KEEP_PREV else ""
+
+
+def _scrub_inv_ws(m: re.Match) -> str:
+    # Lauf aus Whitespace/Sentinel-Resten → ein Leerzeichen (falls außerhalb der Reste Whitespace steht),
+    # vor Satzzeichen keins
+    if m.group(1) is not None:
+        return ""
+    run = m.group(0)
+    if "|" in run:
+        run = _SCRUB_INV_RE.sub("", run)
+    return " " if run else ""
+
+
 def scrub_artifacts(text: str) -> str:
     """
     Remove all artifact wrappers and sentinel residues from text.
@@ -66,44 +104,59 @@ def scrub_artifacts(text: str) -> str:
     if not text:
         return text
     
-    # Remove RTL isolates (U+2066..U+2069)
-    text = text.replace('\u2066', '').replace('\u2067', '').replace('\u2068', '').replace('\u2069', '')
-    
-    # Remove the rare symbol "♰" (U+2670)
-    text = text.replace('♰', '')
+    # Remove RTL isolates and the rare symbol "♰" (this also covers "<♰"/"♰>" pairs: the
+    # leftover "<"/">" are handled by the angle pass below)
+    for ch in _SCRUB_DROP_CHARS:
+        if ch in text:
+            text = text.replace(ch, "")
     
-    # Remove "<♰" and "♰>" pairs in any whitespace variation
-    text = re.sub(r'<\s*♰\s*', '', text)
-    text = re.sub(r'\s*♰\s*>', '', text)
+    # Remove "<" not followed by letter or / and ">" not preceded by letter or /
+    # (a "<|INV:...|>" residue loses its "<"/">" here as well)
+    if "<" in text or ">" in text:
+        text = _SCRUB_ANGLE_RE.sub(_scrub_angle, text)
     
-    # Remove any remaining "<" or ">" that might be artifacts
-    # Only remove if they're not part of valid HTML tags
-    text = re.sub(r'<(?![a-zA-Z/])', '', text)  # Remove < not followed by letter or /
-    text = re.sub(r'(?<![a-zA-Z/])>', '', text)  # Remove > not preceded by letter or /
-    
-    # Remove any remaining "<|INV:...|>" fragments or deformed variants
-    text = re.sub(r'<\s*\|\s*INV\s*:\s*\d+\s*:\s*[0-9A-Fa-f]{4,8}\s*\|\s*>', '', text)
-    text = re.sub(r'\|\s*INV\s*:\s*\d+\s*:\s*[0-9A-Fa-f]{4,8}\s*\|', '', text)  # Remove without < >
-    
-    # Normalize whitespace: multiple spaces -> single space
-    text = re.sub(r'\s+', ' ', text)
-    
-    # Remove space before punctuation
-    text = re.sub(r'\s+([.,!?;:])', r'\1', text)
+    # One pass: "|INV:..|" residues, whitespace runs -> single space, no space before punctuation
+    text = _SCRUB_INV_WS_RE.sub(_scrub_inv_ws, text)
     
     # Remove leading/trailing whitespace
     text = text.strip()
     
     # 1–3 Passes: Pipe-CRC-Wrapper entfernen (idempotent; bricht, wenn keine Änderungen)
-    for _ in range(3):
-        s2 = PIPE_CRC_WRAP_RE.sub(lambda m: m.group("inner"), text)
-        if s2 == text:
-            break
-        text = s2
+    if "|" in text:
+        for _ in range(3):
+            text, n = PIPE_CRC_WRAP_RE.subn(lambda m: m.group("inner"), text)
+            if not n:
+                break
     
     return text
 
 
+# Wrapper-Paare um Nicht-HTML-Invarianten (inkl. Fullwidth-Varianten), in Prüf-/Ersetzungsreihenfolge
+_WRAPPER_PAIRS = (("<", ">"), ("(", ")"), ("[", "]"), ("［", "］"), ("＜", "＞"), ("〈", "〉"), ("「", "」"), ("『", "』"))
+_WRAP_OPEN = "".join(re.escape(o) for o, _ in _WRAPPER_PAIRS)
+_WRAP_CLOSE = "".join(re.escape(c) for _, c in _WRAPPER_PAIRS)
+_UNWRAP_TYPES = {"email", "url", "time", "date", "currency", "number", "ph1", "ph2"}
+
+
+@lru_cache(maxsize=4096)
+def _wrapper_patterns(raw: str) -> Tuple[re.Pattern, Tuple[re.Pattern, ...]]:
+    """
+    Für einen raw-Wert: ein fusioniertes Pattern (beliebiger Öffner … beliebiger Schließer, Obermenge
+    aller acht Wrapper) als Vorfilter, plus die acht exakten Wrapper-Patterns in fester Reihenfolge.
+    """
+    esc = re.escape(raw)
+    fused = re.compile(fr"[{_WRAP_OPEN}]\s*{esc}\s*[{_WRAP_CLOSE}]", re.UNICODE)
+    exact = tuple(re.compile(fr"{re.escape(o)}\s*{esc}\s*{re.escape(c)}", re.UNICODE) for o, c in _WRAPPER_PAIRS)
+    return fused, exact
+
+
+def _is_wrapped(raw: str, text: str) -> bool:
+    fused, exact = _wrapper_patterns(raw)
+    if not fused.search(text):
+        return False
+    return any(p.search(text) for p in exact)
+
+
 def unwrap_spurious_wrappers(text: str, mapping: List[Dict[str, Any]], original_text: str = "") -> str:
     """
     Remove spurious wrappers around non-HTML invariants that weren't present in the original.
@@ -112,40 +165,29 @@ def unwrap_spurious_wrappers(text: str, mapping: List[Dict[str, Any]], original_
     if not text or not mapping:
         return text
     
-    # Non-HTML invariant types that should be checked for spurious wrappers
-    non_html_types = {"email", "url", "time", "date", "currency", "number", "ph1", "ph2"}
+    # Ohne jegliches Wrapper-Zeichen kann kein Pattern matchen
+    if not any(o in text for o, _ in _WRAPPER_PAIRS):
+        return text
     
+    wrapped_in_original: Dict[str, bool] = {}
     for item in mapping:
-        if item["type"] not in non_html_types:
+        if item["type"] not in _UNWRAP_TYPES:
             continue
-            
         raw = item["raw"]
-        escaped_raw = re.escape(raw)
-        
-        # Define wrapper patterns (including fullwidth variants)
-        wrapper_patterns = [
-            r"<\s*%s\s*>" % escaped_raw,      # <...>
-            r"\(\s*%s\s*\)" % escaped_raw,    # (...)
-            r"\[\s*%s\s*\]" % escaped_raw,    # [...]
-            r"［\s*%s\s*］" % escaped_raw,    # ［...］
-            r"＜\s*%s\s*＞" % escaped_raw,    # ＜...＞
-            r"〈\s*%s\s*〉" % escaped_raw,    # 〈...〉
-            r"「\s*%s\s*」" % escaped_raw,    # 「...」
-            r"『\s*%s\s*』" % escaped_raw,    # 『...』
-        ]
+        fused, exact = _wrapper_patterns(raw)
+        # Vorfilter: kein Wrapper um raw im aktuellen Text → alle acht Ersetzungen wären No-ops
+        if not fused.search(text):
+            continue
         
         # Check if the raw content was already wrapped in the original text
-        was_wrapped_in_original = False
-        if original_text:
-            for pattern in wrapper_patterns:
-                if re.search(pattern, original_text, flags=re.UNICODE):
-                    was_wrapped_in_original = True
-                    break
+        if raw not in wrapped_in_original:
+            wrapped_in_original[raw] = bool(original_text) and _is_wrapped(raw, original_text)
+        if wrapped_in_original[raw]:
+            continue
         
-        # Only unwrap if it wasn't wrapped in the original
-        if not was_wrapped_in_original:
-            for pattern in wrapper_patterns:
-                text = re.sub(pattern, raw, text, flags=re.UNICODE)
+        # Reihenfolge wie bisher (verschachtelte Wrapper werden dadurch gleich behandelt)
+        for pattern in exact:
+            text = pattern.sub(lambda m, r=raw: r, text)
     
     return text
 
@@ -177,33 +219,134 @@ def is_artifact_free(text: str) -> bool:
     return True
 
 
-def find_non_overlapping_matches(text: str) -> List[Tuple[int, int, str, str]]:
-    """
-    Find non-overlapping matches in priority order.
-    Returns: [(start, end, matched_text, type), ...]
-    """
+# Pattern wird nur gescannt, wenn sein Pflicht-Zeichen im Text vorkommt (billiger `in`-Check)
+_ANY_DIGIT = re.compile(r"\d", re.UNICODE)
+_DIGIT_TYPES = ("time", "date", "currency", "number")
+_PATTERN_TRIGGERS = {
+    "html": lambda t: "<" in t,
+    "email": lambda t: "@" in t,
+    "url": lambda t: "://" in t,
+    "time": lambda t: ":" in t,
+    "date": lambda t: "." in t,
+    "ph1": lambda t: "{" in t,
+    "ph2": lambda t: "{{" in t,
+}
+
+
+@lru_cache(maxsize=512)
+def _scan(text: str) -> Tuple[Tuple[int, int, str, str], ...]:
+    # Priorität wie PATTERNS; belegte Bereiche als sortierte, disjunkte Intervalle (bisect statt O(n²))
+    starts: List[int] = []
+    ends: List[int] = []
     matches = []
-    occupied_ranges = set()
-    
+    digits = _ANY_DIGIT.search(text) is not None
     for pattern, inv_type in PATTERNS:
+        trigger = _PATTERN_TRIGGERS.get(inv_type)
+        if trigger is not None and not trigger(text):
+            continue
+        if inv_type in _DIGIT_TYPES and not digits:
+            continue
         for match in pattern.finditer(text):
             start, end = match.span()
-            matched_text = match.group(0)
-            
-            # Check if this range overlaps with any existing match
-            overlaps = False
-            for existing_start, existing_end in occupied_ranges:
-                if start < existing_end and end > existing_start:
-                    overlaps = True
-                    break
-            
-            if not overlaps:
-                matches.append((start, end, matched_text, inv_type))
-                occupied_ranges.add((start, end))
-    
-    # Sort by start position for deterministic processing
+            k = bisect_left(starts, start)
+            # Intervalle sind disjunkt: nur die Nachbarn links/rechts können überlappen
+            if k > 0 and ends[k - 1] > start:
+                continue
+            if k < len(starts) and starts[k] < end and ends[k] > start:
+                continue
+            starts.insert(k, start)
+            ends.insert(k, end)
+            matches.append((start, end, match.group(0), inv_type))
     matches.sort(key=lambda x: x[0])
-    return matches
+    return tuple(matches)
+
+
+def find_non_overlapping_matches(text: str) -> List[Tuple[int, int, str, str]]:
+    """
+    Find non-overlapping matches in priority order.
+    Returns: [(start, end, matched_text, type), ...]
+    """
+    return list(_scan(text))
+
+
+# Schnittkandidaten für den Dokument-Modus: Satzende (+ schließende Quotes/Klammern) mit Whitespace,
+# CJK-Satzzeichen, Zeilenumbrüche, Ende von Block-Tags bzw. <br>
+_DOC_BREAK_RE = re.compile(
+    r"[.!?…]+[\"'”’»)\]]*\s+"
+    r"|[。！？]+\s*"
+    r"|\n+"
+    r"|</(?:p|div|li|ul|ol|h[1-6]|tr|table|section|article|blockquote|pre)>\s*"
+    r"|<br\s*/?>\s*",
+    re.IGNORECASE,
+)
+
+
+# Elemente ohne schließendes Tag (zählen nicht für die Verschachtelungstiefe)
+_VOID_TAGS = frozenset(("area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track", "wbr"))
+_TAG_NAME_RE = re.compile(r"</?([a-zA-Z][a-zA-Z0-9-]*)")
+
+
+def _tag_depths(spans) -> Tuple[List[int], List[int]]:
+    """(Tag-Enden, HTML-Tiefe nach dem Tag) für alle html-Invarianten in Textreihenfolge."""
+    tag_ends: List[int] = []
+    depths: List[int] = []
+    depth = 0
+    for _, end, raw, inv_type in spans:
+        if inv_type != "html":
+            continue
+        m = _TAG_NAME_RE.match(raw)
+        name = m.group(1).lower() if m else ""
+        if raw.startswith("</"):
+            depth = max(0, depth - 1)
+        elif name not in _VOID_TAGS and not raw.endswith("/>"):
+            depth += 1
+        tag_ends.append(end)
+        depths.append(depth)
+    return tag_ends, depths
+
+
+def document_chunks(text: str, max_chars: int = 600) -> List[Tuple[int, int]]:
+    """
+    Split a long document into contiguous (start, end) spans of at most ~max_chars.
+    Cuts only at sentence/line/block-tag boundaries outside any open HTML element (every
+    chunk keeps its tags balanced) and never inside an invariant (tag, URL, number,
+    placeholder, ...); a single overlong sentence or element stays whole.
+    The spans cover the text exactly, so "".join(text[a:b]) == text.
+    """
+    n = len(text)
+    if n <= max_chars:
+        return [(0, n)]
+    # ungecacht scannen: ganze Dokumente sollen nicht im _scan-LRU landen
+    spans = _scan.__wrapped__(text)
+    starts = [s for s, _, _, _ in spans]
+    ends = [e for _, e, _, _ in spans]
+
+    tag_ends, depths = _tag_depths(spans)
+
+    def _protected(pos: int) -> bool:
+        k = bisect_left(starts, pos) - 1
+        if k >= 0 and ends[k] > pos:
+            return True
+        # innerhalb eines offenen Elements (z. B. zwischen zwei Sätzen in <p>…</p>) nicht schneiden
+        t = bisect_right(tag_ends, pos) - 1
+        return t >= 0 and depths[t] > 0
+
+    out: List[Tuple[int, int]] = []
+    a = 0
+    last = 0
+    for m in _DOC_BREAK_RE.finditer(text):
+        b = m.end()
+        if b >= n or _protected(b):
+            continue
+        if b - a > max_chars and last > a:
+            out.append((a, last))
+            a = last
+        last = b
+    if n - a > max_chars and last > a:
+        out.append((a, last))
+        a = last
+    out.append((a, n))
+    return out
 
 
 def freeze_invariants(text: str) -> Tuple[str, List[Dict[str, Any]]]:
@@ -498,6 +641,63 @@ def validate_invariants(original: str, out: str, mapping: List[Dict[str, Any]])
     return checks
 
 
+_SPLIT_TAGS_RE = re.compile(r"(</?[A-Za-z][^>]*>)")
+
+
+class FrozenDoc:
+    """
+    Immutable, once-per-request freeze of a text, shared by every pipeline stage and fallback.
+    Holds the sentinel text and mapping; safe-sentinel form, HTML split and (text|invariant)
+    split are computed lazily on first use.
+    """
+    __slots__ = ("text", "std", "mapping", "_safe", "_html_parts", "_inv_parts")
+
+    def __init__(self, text: str):
+        std, mapping = freeze_invariants(text or "")
+        object.__setattr__(self, "text", text or "")
+        object.__setattr__(self, "std", std)
+        object.__setattr__(self, "mapping", tuple(mapping))
+        for name in ("_safe", "_html_parts", "_inv_parts"):
+            object.__setattr__(self, name, None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("FrozenDoc is immutable")
+
+    def mapping_list(self) -> List[Dict[str, Any]]:
+        """Mutable copy of the mapping (callers may extend it, e.g. with keep terms)."""
+        return [dict(m) for m in self.mapping]
+
+    @property
+    def safe(self) -> str:
+        """Sentinel text with ASCII-safe [#INV:id#] tokens for worker transport."""
+        if self._safe is None:
+            object.__setattr__(self, "_safe", STRICT.sub(lambda m: f"[#INV:{m.group(1)}#]", self.std))
+        return self._safe
+
+    @property
+    def html_parts(self) -> Tuple[str, ...]:
+        """Original text split into [text, <tag>, text, ...]."""
+        if self._html_parts is None:
+            object.__setattr__(self, "_html_parts", tuple(_SPLIT_TAGS_RE.split(self.text)))
+        return self._html_parts
+
+    @property
+    def inv_parts(self) -> Tuple[Tuple[str, Any], ...]:
+        """Sentinel text split into ("T", text) / ("I", id) parts."""
+        if self._inv_parts is None:
+            parts = []
+            last = 0
+            for m in STRICT.finditer(self.std):
+                if m.start() > last:
+                    parts.append(("T", self.std[last:m.start()]))
+                parts.append(("I", int(m.group(1))))
+                last = m.end()
+            if last < len(self.std):
+                parts.append(("T", self.std[last:]))
+            object.__setattr__(self, "_inv_parts", tuple(parts))
+        return self._inv_parts
+
+
 def _freeze_keep_terms_into(frozen_text: str, mapping: List[Dict[str, Any]], keep_terms: List[str]) -> Tuple[str, List[Dict[str, Any]]]:
     """
     Freeze keep_terms into the frozen text and mapping.
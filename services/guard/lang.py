@@ -5,6 +5,7 @@ Language detection and BCP-47 canonicalization module for Guard service.
 
 import re
 import os
+from functools import lru_cache
 from typing import Dict, List, Tuple, Any, Optional
 
 # Try to import language detection libraries
@@ -596,7 +597,7 @@ def detect_lang(text: str, top_k: int = 3, accept_lang: Optional[List[str]] = No
         "recommendation": recommendation
     }
 
-def canonicalize_bcp47(code: str) -> Dict[str, Any]:
+def _canonicalize_bcp47(code: str) -> Dict[str, Any]:
     """
     Canonicalize a BCP-47 language code with proper normalization.
     
@@ -771,7 +772,7 @@ def engine_lang_from_bcp47(bcp47: str) -> str:
     
     return engine_mappings.get(lang, lang)
 
-def normalize_lang_input(code: str) -> Dict[str, Any]:
+def _normalize_lang_input(code: str) -> Dict[str, Any]:
     """
     Normalize language input by canonicalizing BCP-47 and mapping to engine code.
     
@@ -805,6 +806,66 @@ def normalize_lang_input(code: str) -> Dict[str, Any]:
         "engine": engine
     }
 
+# Normalisierung ist pro Code deterministisch und die Menge der Codes klein: Tabelle für alle
+# konfigurierten Locales + Aliase (warm_normalization beim Start), LRU für unbekannte Eingaben.
+# Rückgaben sind Kopien – Aufrufer dürfen sie verändern.
+_CANON_TABLE: Dict[Any, Dict[str, Any]] = {}
+_NORM_TABLE: Dict[Any, Dict[str, Any]] = {}
+
+
+@lru_cache(maxsize=2048)
+def _canonicalize_bcp47_lru(code):
+    return _canonicalize_bcp47(code)
+
+
+@lru_cache(maxsize=2048)
+def _normalize_lang_input_lru(code):
+    return _normalize_lang_input(code)
+
+
+def canonicalize_bcp47(code: str) -> Dict[str, Any]:
+    """Memoized _canonicalize_bcp47 (same result dict, see there)."""
+    r = _CANON_TABLE.get(code)
+    return dict(r if r is not None else _canonicalize_bcp47_lru(code))
+
+
+def normalize_lang_input(code: str) -> Dict[str, Any]:
+    """Memoized _normalize_lang_input: {"input", "bcp47", "engine"}."""
+    r = _NORM_TABLE.get(code)
+    return dict(r if r is not None else _normalize_lang_input_lru(code))
+
+
+def load_alias_codes(path: str | None) -> List[str]:
+    """Keys und Ziele einer Alias-Datei ({"jp": "ja", "iw": "he", ...}); fehlende/kaputte Datei → []."""
+    if not path or not os.path.isfile(path):
+        return []
+    try:
+        import json
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return []
+    if not isinstance(data, dict):
+        return []
+    return [str(c) for kv in data.items() for c in kv if c]
+
+
+def warm_normalization(codes: List[str] = ()) -> int:
+    """
+    Precompute canonicalize_bcp47/normalize_lang_input for `codes` (configured locales),
+    all alias keys/targets and their lower-case/underscore spellings. Returns the table size.
+    """
+    variants = set()
+    for c in list(codes) + list(BCP47_ALIASES) + list(BCP47_ALIASES.values()) + list(SIMPLE_MAP) + list(SIMPLE_MAP.values()):
+        if not c:
+            continue
+        variants.update((c, c.lower(), c.replace("-", "_"), c.lower().replace("-", "_")))
+    for c in variants:
+        _CANON_TABLE[c] = _canonicalize_bcp47(c)
+        _NORM_TABLE[c] = _normalize_lang_input(c)
+    return len(_NORM_TABLE)
+
+
 def get_detector_preference() -> str:
     """Get preferred detector from environment variable."""
     return os.environ.get("DETECTOR_PREFERRED", "auto").lower()
@@ -3,16 +3,25 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
 from guard.config import settings
-from guard.locales import load_locales_list, map_locales_with_engine
+from guard.locales import load_locales_list, map_locales_with_engine, PrecomputedBody, file_stamp, json_body, etag_matches
 from guard.styles_de import apply_style_de_safe
 from guard.styles_romance import apply_style_romance_safe
 from guard.capabilities import compute_capabilities
 from guard.resilience import should_degrade
-from guard.cache import LRUCache, build_key, style_signature, glossary_signature, cache as _CACHE
+from guard.repetition import is_degenerate
+from guard.cache import LRUCache, ShardedLRUCache, ByteBudgetCache, SQLiteStore, TieredCache, SegmentCache, build_key, style_signature, keep_terms_signature, glossary_signature, cache as _CACHE
 from guard.glossary import load_terms, freeze_glossary, unfreeze_glossary, to_safe_tokens, from_safe_tokens
-
-from fastapi import FastAPI, HTTPException, Response, Header
-from fastapi.responses import JSONResponse, FileResponse, PlainTextResponse
+from guard.worker import WorkerClient, CircuitOpenError
+from guard.limiter import AIMDLimiter, CircuitBreaker, HedgeBudget
+from guard.pool import WorkerPool, resolve_backends
+from guard.batcher import MicroBatcher, BatchRound
+from guard.singleflight import LeaderCancelled, SingleFlight
+from guard.stream import BadLine, read_items, replay, run_stream
+from guard.metrics import Counters, StageTimer, server_timing, REQUEST_LATENCY, STAGE_SECONDS, BATCH_SIZE
+from guard.routing import PathRouter, route_key
+
+from fastapi import FastAPI, HTTPException, Response, Header, Request
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, Field
 import re, requests, os, csv, pathlib, json
@@ -23,11 +32,14 @@ import re as _re
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 from typing import List, Dict, Any, Optional
+import math
 import time
+import asyncio
+import threading
 import concurrent.futures as cf
 
 from libs.trance_common import normalize, json_get, json_post, t, app_version
-from libs.trance_common.http import session
+from libs.trance_common.http import session, pool_size_for, pool_stats
 
 # Import robust invariant system
 import invariants
@@ -53,6 +65,11 @@ _LOCALES_PATH = settings.LOCALES_PUBLIC_PATH or os.path.join(os.path.dirname(__f
 def _load_locales_list() -> list[str]:
     return load_locales_list(settings.LOCALES_PUBLIC_PATH, settings.LOCALES_EXTRA, settings.LOCALES_DISABLE)
 
+_ALIASES_PATH = settings.LANG_ALIASES_PATH or os.path.join(os.path.dirname(__file__), "..", "..", "lang_aliases.json")
+
+# BCP-47-Normalisierung für alle konfigurierten Locales + Aliase (Modul + lang_aliases.json) vorberechnen (unbekannte Codes: LRU)
+print(f"Guard BCP-47 table: {lang.warm_normalization(_load_locales_list() + lang.load_alias_codes(_ALIASES_PATH))} codes")
+
 # Log invariant system status
 print("Guard Invariants ON: sentinel <|INV:ID:CRC|>")
 
@@ -98,11 +115,28 @@ def _is_de(bcp47: str, engine: str) -> bool:
 # Cache-Initialisierung
 if settings.CACHE_ENABLE:
     from guard import cache as _cache_mod
-    _cache_mod.cache = LRUCache(maxsize=settings.CACHE_MAX, ttl=settings.CACHE_TTL)
+    if settings.CACHE_MAX_BYTES > 0:
+        _cache_mod.cache = ByteBudgetCache(max_bytes=settings.CACHE_MAX_BYTES, ttl=settings.CACHE_TTL, maxsize=settings.CACHE_MAX, compress_min=settings.CACHE_COMPRESS_MIN)
+    elif settings.CACHE_SHARDS > 1:
+        _cache_mod.cache = ShardedLRUCache(maxsize=settings.CACHE_MAX, ttl=settings.CACHE_TTL, shards=settings.CACHE_SHARDS)
+    else:
+        _cache_mod.cache = LRUCache(maxsize=settings.CACHE_MAX, ttl=settings.CACHE_TTL)
+    if settings.CACHE_L2_PATH:
+        # L2 überlebt Deploys/Crashes; heißeste Einträge direkt in den LRU vorladen
+        _cache_mod.cache = TieredCache(_cache_mod.cache, SQLiteStore(settings.CACHE_L2_PATH, ttl=settings.CACHE_TTL, flush_ms=settings.CACHE_L2_FLUSH_MS, max_pending=settings.CACHE_L2_MAX_PENDING, purge_s=settings.CACHE_L2_PURGE_S))
+        _cache_mod.cache.preload(settings.CACHE_L2_PRELOAD)
     _CACHE = _cache_mod.cache
 else:
     _CACHE = None
 
+# Prozessweiter Segment-Cache (Spans-only/Interleave)
+if settings.SEGMENT_CACHE_ENABLE:
+    from guard import cache as _cache_mod
+    _cache_mod.segment_cache = SegmentCache(maxsize=settings.SEGMENT_CACHE_MAX, ttl=settings.SEGMENT_CACHE_TTL)
+    _SEG_CACHE = _cache_mod.segment_cache
+else:
+    _SEG_CACHE = None
+
 # Glossary-Terms laden (global einmal)
 _GLOSSARY_TERMS = load_terms(settings.GLOSSARY_PATH, settings.GLOSSARY_TERMS) if settings.GLOSSARY_ENABLE else []
 
@@ -132,10 +166,6 @@ def _collect_glossary_terms(req_glossary, item_glossary):
         out.append(x)
     return out
 
-# Hilfsfunktion: stabiler Freeze für Key (STANDARD Sentinel)
-def _freeze_std_for_key(text: str):
-    fstd, _ = invariants.freeze_invariants(text)
-    return fstd
 
 
 
@@ -166,34 +196,81 @@ def _build_session():
     session = requests.Session()
     session.trust_env = False
     session.proxies = {}
-    session.headers.update({"Connection": "close"})
     retry_strategy = Retry(
         total=3,
         backoff_factor=0.1,
         status_forcelist=[500, 502, 503, 504],
     )
-    adapter = HTTPAdapter(max_retries=retry_strategy)
+    # Keep-Alive: Verbindungen zum Worker wiederverwenden statt pro Call neu aufbauen
+    pool_size = pool_size_for(BACKEND_BASE)
+    adapter = HTTPAdapter(max_retries=retry_strategy, pool_connections=pool_size, pool_maxsize=pool_size)
     session.mount("http://", adapter)
     session.mount("https://", adapter)
     return session
 
 SESSION = _build_session()
 
-def _backend_status():
+# Async Worker-Client: blockiert den Event-Loop nicht (translate/translate_batch/health)
+# Adaptives Concurrency-Limit + Circuit Breaker (je Backend) vor jedem Worker-HTTP-Call;
+# mit aktivem Breaker gilt CB_MAX_RETRIES statt WORKER_RETRIES (Retries vervielfachen Last im Brown-out)
+def _make_worker_client(url: str) -> WorkerClient:
+    limiter = AIMDLimiter(initial=settings.LIMITER_INITIAL, min_limit=settings.LIMITER_MIN, max_limit=min(settings.LIMITER_MAX, settings.WORKER_MAX_CONNECTIONS), tolerance=settings.LIMITER_TOLERANCE, enabled=settings.LIMITER_ENABLE)
+    breaker = CircuitBreaker(error_rate=settings.CB_ERROR_RATE, window=settings.CB_WINDOW, min_requests=settings.CB_MIN_REQUESTS, open_s=settings.CB_OPEN_S, half_open_probes=settings.CB_HALF_OPEN_PROBES, enabled=settings.CB_ENABLE)
+    return WorkerClient(url, timeout=max(120, TIMEOUT), max_connections=settings.WORKER_MAX_CONNECTIONS, max_keepalive=pool_size_for(url), retries=(settings.CB_MAX_RETRIES if settings.CB_ENABLE else settings.WORKER_RETRIES), limiter=limiter, breaker=breaker)
+
+# Mehrere Replicas (router.yaml / WORKER_BACKENDS) → WorkerPool, sonst ein einzelner Client auf BACKEND_BASE
+_WORKER_SPECS = resolve_backends(BACKEND_BASE, settings.WORKER_ROUTER_PATH, settings.WORKER_BACKENDS)
+if len(_WORKER_SPECS) > 1:
+    WORKER = WorkerPool(_WORKER_SPECS, lambda spec: _make_worker_client(spec.url), health_interval_s=settings.POOL_HEALTH_INTERVAL_S, eject_after=settings.POOL_EJECT_AFTER, failover=settings.POOL_FAILOVER)
+    print(f"Guard worker pool: {[(sp.name, sp.url, sp.weight, 'fallback' if sp.fallback else 'primary') for sp in _WORKER_SPECS]}")
+else:
+    WORKER = _make_worker_client(_WORKER_SPECS[0].url)
+
+def _worker_clients() -> list[tuple[str, WorkerClient]]:
+    return WORKER.clients() if isinstance(WORKER, WorkerPool) else [("default", WORKER)]
+
+# Cross-Request Micro-Batcher: gleichzeitige Einzeltexte pro Sprachpaar → ein /translate_batch
+BATCHER = MicroBatcher(WORKER, max_wait_ms=settings.MICROBATCH_MAX_WAIT_MS, max_batch=settings.MICROBATCH_MAX_SIZE, enabled=settings.MICROBATCH_ENABLE)
+
+# Gelernte Pfadwahl (normal/v3b/interleave/spans_only) je (Ziel-Engine, has_html, Invarianten-Dichte)
+ROUTER = PathRouter(window=settings.ROUTING_WINDOW, min_samples=settings.ROUTING_MIN_SAMPLES, skip_below=settings.ROUTING_SKIP_BELOW, margin=settings.ROUTING_MARGIN, explore=settings.ROUTING_EXPLORE, enabled=settings.ROUTING_ENABLE)
+
+# Gehedgte spans-only Läufe parallel zum Primärlauf (nur riskante Requests, budgetiert)
+HEDGE = HedgeBudget(ratio=settings.HEDGE_BUDGET_RATIO, burst=settings.HEDGE_BUDGET_BURST, max_inflight=settings.HEDGE_MAX_INFLIGHT, window=settings.HEDGE_WINDOW, min_samples=settings.HEDGE_MIN_SAMPLES, enabled=settings.HEDGE_ENABLE)
+
+def _hedge_risky(rkey: tuple, n_invariants: int) -> bool:
+    """HTML mit vielen Invarianten oder Ziel-Key, dessen Normalpfad meist scheitert."""
+    if rkey[1] and n_invariants >= settings.HEDGE_MIN_INVARIANTS:
+        return True
+    rate = HEDGE.fallback_rate(rkey)
+    return rate is not None and rate >= settings.HEDGE_FALLBACK_RATE
+
+def _record_normal(rkey: tuple, ok: bool):
+    """Ergebnis des Normalpfads: Routing-Statistik und (unabhängig davon) Hedge-Trigger."""
+    ROUTER.record(rkey, "normal", ok)
+    HEDGE.observe(rkey, ok)
+
+def _hedge_ok(task) -> bool:
+    return task.done() and not task.cancelled() and task.exception() is None and task.result()[1].get("ok", False)
+
+async def _backend_status():
     """Check backend status using normalized base URL"""
-    health_url = f"{BACKEND_BASE}/health"
-    ok = False
-    try:
-        r = SESSION.get(health_url, timeout=3)
-        if r.status_code == 200:
-            j = r.json()
-            ok = bool(j.get("ok", False))
-    except Exception:
-        ok = False
-    return {"backend_url": BACKEND_BASE, "backend_alive": ok}
+    ok = await WORKER.health(timeout=3)
+    return {"backend_url": WORKER.base, "backend_alive": ok}
 
 app = FastAPI()
 
+@app.on_event("startup")
+async def _precompute_static():
+    for pc in (_LOCALES_BODY, _LOCALES_CSV_BODY, _CAPABILITIES_BODY):
+        pc.get()
+
+@app.on_event("shutdown")
+async def _close_worker():
+    await WORKER.aclose()
+    if isinstance(_CACHE, TieredCache):
+        _CACHE.l2.flush()
+
 # Static files support
 PUBLIC_DIR = settings.PUBLIC_DIR or os.path.join(os.path.dirname(__file__), "..", "..", "public")
 if os.path.isdir(PUBLIC_DIR):
@@ -208,40 +285,94 @@ app.add_middleware(
     allow_methods=["*"],  # Allows all methods
     allow_headers=["*"],  # Allows all headers
 )
-METRICS = {"requests": 0, "errors": 0, "lat_sum": 0.0, "lat_n": 0}
+# thread-safe: Zähler werden auch aus Executor-Threads erhöht
+METRICS = Counters({"requests": 0, "errors": 0, "lat_sum": 0.0, "lat_n": 0})
+_METRICS_LBL_LOCK = threading.Lock()
 METRICS_LBL = {
     "spans_only_total": {},           # key: tgt_bcp47
     "degrade_total": {},              # key: reason
     "glossary_missing_total": {},     # key: tgt_bcp47
     "glossary_replaced_total": {},    # key: tgt_bcp47
+    "pivot_checked_total": {},        # key: tgt engine (Segmente in PIVOT_LANGS geprüft)
+    "pivot_total": {},                # key: tgt engine (Segmente pivotiert)
+    "pivot_improved_total": {},       # key: tgt engine (Pivot-Ergebnis übernommen)
 }
 METRICS_STARTED = time.time()
 
 def metrics():
     up = int(time.time() - METRICS_STARTED)
-    avg = (METRICS["lat_sum"] / METRICS["lat_n"]) if METRICS["lat_n"] else 0.0
+    m = METRICS.snapshot()
+    avg = (m["lat_sum"] / m["lat_n"]) if m["lat_n"] else 0.0
     body = (
         f"anni_uptime_seconds {up}\n"
-        f"anni_requests_total {METRICS['requests']}\n"
-        f"anni_errors_total {METRICS['errors']}\n"
+        f"anni_requests_total {m['requests']}\n"
+        f"anni_errors_total {m['errors']}\n"
         f"anni_translate_latency_seconds_avg {avg:.3f}\n"
     )
     # labeled counters
     def line(name, labels: dict, value: int):
         kv = ",".join(f'{k}="{v}"' for k,v in labels.items())
         return f"{name}{{{kv}}} {value}\n"
-    for tgt, v in METRICS_LBL["spans_only_total"].items():
+    with _METRICS_LBL_LOCK:
+        lbl = {name: dict(d) for name, d in METRICS_LBL.items()}
+    for tgt, v in lbl["spans_only_total"].items():
         body += line("anni_spans_only_total", {"target": tgt}, v)
-    for reason, v in METRICS_LBL["degrade_total"].items():
+    for name, client in _worker_clients():
+        if client.limiter is None or client.breaker is None:
+            continue
+        lim, cb = client.limiter.stats(), client.breaker.stats()
+        body += line("anni_worker_concurrency_limit", {"backend": name}, lim["limit"])
+        body += line("anni_worker_inflight", {"backend": name}, lim["inflight"])
+        body += line("anni_worker_waiting", {"backend": name}, lim["waiting"])
+        body += line("anni_circuit_opened_total", {"backend": name}, cb["opened_total"])
+        body += line("anni_circuit_rejected_total", {"backend": name}, cb["rejected_total"])
+        body += line("anni_circuit_error_rate", {"backend": name}, cb["error_rate"])
+        for state in CircuitBreaker.STATES:
+            body += line("anni_circuit_state", {"backend": name, "state": state}, 1 if cb["state"] == state else 0)
+    if HEDGE.enabled:
+        hs = HEDGE.stats()
+        body += (
+            f"anni_hedge_total {hs['hedged_total']}\n"
+            f"anni_hedge_won_total {hs['won_total']}\n"
+            f"anni_hedge_wasted_total {hs['wasted_total']}\n"
+            f"anni_hedge_denied_total {hs['denied_total']}\n"
+        )
+    if isinstance(WORKER, WorkerPool):
+        body += f"anni_worker_pool_failovers_total {WORKER.failovers}\n"
+        for b in WORKER.stats()["backends"]:
+            body += line("anni_worker_backend_available", {"backend": b["name"]}, 1 if b["available"] else 0)
+            body += line("anni_worker_backend_outstanding", {"backend": b["name"]}, b["outstanding"])
+    fl = _FLIGHT.stats()
+    body += (
+        f"anni_singleflight_leaders_total {fl['leaders']}\n"
+        f"anni_singleflight_coalesced_total {fl['coalesced']}\n"
+        f"anni_singleflight_inflight {fl['inflight']}\n"
+    )
+    if _SEG_CACHE is not None:
+        sc = _SEG_CACHE.stats()
+        body += (
+            f"anni_segment_cache_hits_total {sc['hits']}\n"
+            f"anni_segment_cache_misses_total {sc['misses']}\n"
+            f"anni_segment_cache_size {sc['size']}\n"
+        )
+    for reason, v in lbl["degrade_total"].items():
         body += line("anni_degrade_total", {"reason": reason}, v)
-    for tgt, v in METRICS_LBL["glossary_missing_total"].items():
+    for tgt, v in lbl["glossary_missing_total"].items():
         body += line("anni_glossary_missing_total", {"target": tgt}, v)
-    for tgt, v in METRICS_LBL["glossary_replaced_total"].items():
+    for tgt, v in lbl["glossary_replaced_total"].items():
         body += line("anni_glossary_replaced_total", {"target": tgt}, v)
+    # Pivot-Rate je Ziel = anni_pivot_segments_total / anni_pivot_checked_segments_total
+    for tgt, v in lbl["pivot_checked_total"].items():
+        body += line("anni_pivot_checked_segments_total", {"target": tgt}, v)
+        body += line("anni_pivot_segments_total", {"target": tgt}, lbl["pivot_total"].get(tgt, 0))
+        body += line("anni_pivot_improved_total", {"target": tgt}, lbl["pivot_improved_total"].get(tgt, 0))
+    # Histogramme (Buckets/_sum/_count) – Tail-Latenz statt nur Mittelwert
+    body += REQUEST_LATENCY.render() + STAGE_SECONDS.render() + BATCH_SIZE.render()
     return Response(content=body, media_type="text/plain")
 
 def _inc(d: dict, key: str, n: int = 1):
-    d[key] = d.get(key, 0) + n
+    with _METRICS_LBL_LOCK:
+        d[key] = d.get(key, 0) + n
 
 # -------- Regexes (keeping existing patterns for compatibility)
 PH_RE = re.compile(r"\{\{[^}]+\}\}")
@@ -433,7 +564,7 @@ def force_freeze_html_only(text: str) -> tuple[str, list[dict]]:
     ]
     return text2, mapping
 
-import re as _re, os as _os, unicodedata as _ud
+import re as _re, unicodedata as _ud
 
 _STD_SENT = _re.compile(r"<\|INV:(\d{1,4}):([0-9A-Fa-f]{4,8})\|>")
 _SAFE_STRICT = _re.compile(r"\[#INV:(\d{1,4})#\]")
@@ -496,45 +627,112 @@ _PUNCT_ONLY = _re.compile(r"^\s*$|^[\s\.\,\!\?\:\;–—\-•··‧·／/\\\(\)
 def _is_noise_segment(s: str) -> bool:
     return bool(_PUNCT_ONLY.match(s or "")) or len((s or "").strip()) <= 1
 
-# Kleines Cache, um gleiche Segmente nicht mehrfach zu übersetzen
+# Kleines Cache, um gleiche Segmente nicht mehrfach zu übersetzen (request-lokal,
+# liest/schreibt zusätzlich den prozessweiten Segment-Cache)
 class _SpanCache:
-    def __init__(self): self.d = {}
-    def get(self, k):   return self.d.get(k)
+    def __init__(self, src: str = "", tgt: str = "", sig: str = "gl=none"):
+        self.d = {}
+        self.src, self.tgt, self.sig = src, tgt, sig
+    def get(self, k):
+        v = self.d.get(k)
+        if v is None and _SEG_CACHE is not None:
+            v = _SEG_CACHE.get(self.src, self.tgt, k, self.sig)
+            if v is not None: self.d[k] = v
+        return v
     def set(self, k, v): self.d[k] = v
+    def share(self, k, v):
+        self.d[k] = v
+        # Nur echte Übersetzungen teilen (kein Worker-Fehler "", kein Anti-Loop-Fallback auf Quelle)
+        if _SEG_CACHE is not None and v and v != k:
+            _SEG_CACHE.set(self.src, self.tgt, k, self.sig, v)
+
+_LATIN_RE = _re.compile(r"[A-Za-z]")
+
+def _latin_leak_ratio(s: str) -> float:
+    # Zähle nur Buchstaben (E-Mail/URL/Keep-Terms sind bereits als Invarianten raus)
+    letters = [ch for ch in (s or "") if ch.isalpha()]
+    if not letters:
+        return 0.0
+    return len([ch for ch in letters if _LATIN_RE.match(ch)]) / len(letters)
+
+async def _worker_batch(texts: list[str], src: str, tgt: str, max_new_tokens) -> list[str]:
+    """Ein Hop für viele Segmente: /translate_batch in BATCH_ROUND_MAX-Stücken (1 Text → /translate)."""
+    if len(texts) == 1:
+        return [await WORKER.translate_text(texts[0], src, tgt, max_new_tokens, timeout=WT)]
+    step = max(1, settings.BATCH_ROUND_MAX)
+    parts = await asyncio.gather(*[WORKER.translate_batch(texts[i:i + step], src, tgt, max_new_tokens, timeout=WT) for i in range(0, len(texts), step)])
+    outs = [o for part in parts for o in part]
+    if len(outs) != len(texts):
+        raise ValueError(f"batch_size_mismatch:{len(outs)}!={len(texts)}")
+    return outs
+
+async def _pivot_batch(src: str, mid: str, tgt: str, segs: list[str], max_new_tokens=None) -> list[str]:
+    """
+    Pivot src→mid→tgt für alle Segmente in zwei gebündelten Worker-Calls. Der erste Hop
+    (src→mid) liegt im prozessweiten Segment-Cache (sig "pivot") und wird so von wiederholten
+    Segmenten und weiteren Pivot-Zielen wiederverwendet. Fehler wie bisher fail-soft:
+    Hop 1 → Quelle, Hop 2 → Zwischenergebnis.
+    """
+    mids = {seg: (_SEG_CACHE.get(src, mid, seg, "pivot") if _SEG_CACHE is not None else None) for seg in segs}
+    missing = [seg for seg, v in mids.items() if v is None]
+    if missing:
+        try:
+            hop1 = await _worker_batch(missing, src, mid, max_new_tokens)
+        except Exception:
+            hop1 = list(missing)
+        for seg, m in zip(missing, hop1):
+            mids[seg] = m or seg
+            if _SEG_CACHE is not None and m and m != seg:
+                _SEG_CACHE.set(src, mid, seg, "pivot", m)
+    firsts = [mids[seg] for seg in segs]
+    try:
+        return await _worker_batch(firsts, mid, tgt, max_new_tokens)
+    except Exception:
+        return firsts
 
-def _spans_only_translate(n_src, n_tgt, text: str, max_new_tokens, call_worker, invariants, keep_terms: list[str] | None = None):
+async def _pivot_leaking(src: str, tgt: str, results: dict, max_new_tokens=None, timer: StageTimer | None = None) -> dict:
+    """
+    Latin-Leak-Detektor für PIVOT_LANGS: alle Segmente mit Leak > LEAK_LATIN_MAX eines Requests
+    gemeinsam pivotieren; übernommen wird nur, wenn der Leak sinkt.
+    """
+    if tgt not in settings.PIVOT_LANGS or not results:
+        return results
+    checked = 0
+    leaking = {}
+    for seg, out in results.items():
+        if len(seg.strip()) < 4:
+            continue
+        checked += 1
+        leak = _latin_leak_ratio(out)
+        if leak > settings.LEAK_LATIN_MAX:
+            leaking[seg] = leak
+    _inc(METRICS_LBL["pivot_checked_total"], tgt, checked)
+    if not leaking:
+        return results
+    t_pivot = time.perf_counter()
+    segs = list(leaking)
+    outs = await _pivot_batch(src, settings.PIVOT_MID_LANG, tgt, segs, max_new_tokens)
+    if timer is not None:
+        timer.add("pivot", time.perf_counter() - t_pivot)
+    improved = 0
+    results = dict(results)
+    for seg, out2 in zip(segs, outs):
+        out2 = invariants.scrub_artifacts(out2)
+        if _latin_leak_ratio(out2) < leaking[seg]:
+            results[seg] = out2
+            improved += 1
+    _inc(METRICS_LBL["pivot_total"], tgt, len(segs))
+    _inc(METRICS_LBL["pivot_improved_total"], tgt, improved)
+    return results
+
+async def _spans_only_translate(n_src, n_tgt, text: str, max_new_tokens, call_worker, invariants, keep_terms: list[str] | None = None, gloss_sig: str = "gl=none", doc=None, timer: StageTimer | None = None):
+    # FrozenDoc des Requests wiederverwenden, falls er zu diesem Text gehört
+    if doc is None or doc.text != (text or ""):
+        doc = invariants.FrozenDoc(text)
     # 1) HTML in [text, <tag>, text, ...] zerlegen
-    import re as _re
-    _SPLIT_TAGS = _re.compile(r"(</?[A-Za-z][^>]*>)")
-    chunks = _SPLIT_TAGS.split(text or "")
+    chunks = list(doc.html_parts)
     out_chunks = []
-    cache = _SpanCache()
-    # --- Leak/Pivot Konfiguration ---
-    _pivot_langs = {s.strip() for s in (_os.environ.get("PIVOT_LANGS", "km,lo,my").split(",")) if s.strip()}
-    _pivot_mid  = _os.environ.get("PIVOT_MID_LANG", "en").strip() or "en"
-    _leak_max   = float(_os.environ.get("LEAK_LATIN_MAX", "0.15") or "0.15")
-    _LATIN_RE   = _re.compile(r"[A-Za-z]")
-
-    def _latin_leak_ratio(s: str) -> float:
-        # Zähle nur Buchstaben (E-Mail/URL/Keep-Terms sind bereits als Invarianten raus)
-        letters = [ch for ch in (s or "") if ch.isalpha()]
-        if not letters: 
-            return 0.0
-        return len([ch for ch in letters if _LATIN_RE.match(ch)]) / len(letters)
-
-    def _pivot_translate(src_engine: str, mid_engine: str, tgt_engine: str, seg: str):
-        # First translation: src -> mid
-        try:
-            t1 = _call_worker_translate(seg, src_engine, mid_engine, BACKEND_BASE)
-        except Exception:
-            t1 = seg  # fallback to original if first translation fails
-        
-        # Second translation: mid -> tgt
-        try:
-            t2 = _call_worker_translate(t1, mid_engine, tgt_engine, BACKEND_BASE)
-            return t2
-        except Exception:
-            return t1  # fallback to intermediate result if second translation fails
+    cache = _SpanCache(n_src["engine"], n_tgt["engine"], gloss_sig)
 
     # Keep-Terms auf den gesamten Text anwenden, bevor wir in Chunks aufteilen
     if keep_terms:
@@ -569,24 +767,55 @@ def _spans_only_translate(n_src, n_tgt, text: str, max_new_tokens, call_worker,
         # Verwende den modifizierten Text für die weitere Verarbeitung
         text = temp_text
 
+    # 2) Pass 1: Text-Chunks einfrieren und (Text|Invariant)-Teile sammeln
+    plans = []
     for i, chunk in enumerate(chunks):
-        # Tags unverändert übernehmen
-        if i % 2 == 1 and chunk.startswith("<"):
-            out_chunks.append(chunk)
-            continue
-
-        # Leere Text-Abschnitte durchlassen
-        if not (chunk or "").strip():
-            out_chunks.append(chunk)
+        # Tags unverändert übernehmen; leere Text-Abschnitte durchlassen
+        if (i % 2 == 1 and chunk.startswith("<")) or not (chunk or "").strip():
+            plans.append((chunk, None, None))
             continue
-
-        # 2) Sichtbaren Text invarianten-sicher einfrieren (non-HTML)
+        # Sichtbaren Text invarianten-sicher einfrieren (non-HTML) und splitten
         frozen, mapping = invariants.freeze_invariants(chunk)
+        plans.append((chunk, mapping, _split_by_std_inv(frozen)))
 
-        # 3) In (Text|Invariant)-Teile splitten
-        parts = _split_by_std_inv(frozen)
+    async def _translate_seg(seg: str) -> str:
+        payload = {"source": n_src["engine"], "target": n_tgt["engine"], "text": seg}
+        if max_new_tokens: payload["max_new_tokens"] = max_new_tokens
 
-        # 4) Nur "T"-Segmente übersetzen; "I" wird aus mapping eingefügt
+        # Call worker using the existing worker infrastructure
+        try:
+            w = await call_worker(payload)
+        except Exception:
+            w = {"translated_text": ""}
+
+        cached = (w.get("translated_text","") or "")
+        cached = invariants.scrub_artifacts(cached)
+
+        # --- Anti-Loop-Guard: repetitiven/aufgeblasenen Output abfangen ---
+        if is_degenerate(cached, seg):
+            # Fail-soft: lieber Quellspan beibehalten als Spam ausgeben
+            cached = seg
+        return cached
+
+    # 3) Alle eindeutigen, nicht-rauschigen Segmente des Dokuments gemeinsam übersetzen:
+    #    parallel über call_worker (Micro-Batcher → wenige /translate_batch statt N serielle Calls)
+    todo = {}
+    for _chunk, _mapping, parts in plans:
+        for kind, val in (parts or []):
+            seg = val or ""
+            if kind == "T" and not _is_noise_segment(seg) and cache.get(seg) is None:
+                todo[seg] = None
+    results = dict(zip(todo, await asyncio.gather(*[_translate_seg(s) for s in todo])))
+    # --- Latin-Leak-Detektor + Pivot-Fallback (alle leckenden Segmente gebündelt) ---
+    results = await _pivot_leaking(n_src["engine"], n_tgt["engine"], results, max_new_tokens, timer)
+    for seg, res in results.items():
+        cache.share(seg, res)
+
+    # 4) Rendern: "I" aus mapping, "T" aus Cache
+    for chunk, mapping, parts in plans:
+        if parts is None:
+            out_chunks.append(chunk)
+            continue
         out_parts = []
         for kind, val in parts:
             if kind == "I":
@@ -594,85 +823,20 @@ def _spans_only_translate(n_src, n_tgt, text: str, max_new_tokens, call_worker,
                 raw = mapping[val]["raw"] if 0 <= val < len(mapping) else ""
                 out_parts.append(raw)
                 continue
-
             seg = val or ""
-            if _is_noise_segment(seg):
-                out_parts.append(seg)
-                continue
-
-            # Cache verwenden
-            cached = cache.get(seg)
-            if cached is None:
-                payload = {"source": n_src["engine"], "target": n_tgt["engine"], "text": seg}
-                if max_new_tokens: payload["max_new_tokens"] = max_new_tokens
-                
-                # Call worker using the existing worker infrastructure
-                try:
-                    response = SESSION.post(f"{BACKEND_BASE}/translate", json=payload, timeout=max(120, TIMEOUT))
-                    if response.status_code == 200:
-                        w = response.json()
-                    else:
-                        w = {"translated_text": ""}
-                except Exception:
-                    w = {"translated_text": ""}
-                
-                cached = (w.get("translated_text","") or "")
-                cached = invariants.scrub_artifacts(cached)
-
-                # --- Anti-Loop-Guard: repetitiven/aufgeblasenen Output abfangen ---
-                import re as _re
-                def _is_bad_repetition(s: str) -> bool:
-                    if not s or len(s) < 16: 
-                        return False
-                    # 1) Zeichen-Diversität sehr gering
-                    if (len(set(s)) / len(s)) < 0.12:
-                        return True
-                    # 2) Kurzes Muster (1–4 Zeichen) sehr oft wiederholt
-                    for n in (1,2,3,4):
-                        unit = s[:n]
-                        if unit and unit * max(8, len(s)//max(1,n)) in (unit * ((len(s)//n)+8)):
-                            # grob: viele Wiederholungen eines Mikro-Patterns
-                            return True
-                    # 3) Token-Dominanz
-                    toks = _re.findall(r'\w+', s)
-                    if len(toks) >= 10:
-                        from collections import Counter
-                        top = Counter(toks).most_common(1)[0][1] / len(toks)
-                        if top > 0.65:
-                            return True
-                    # 4) Überlänge relativ zur Quelle
-                    if len(s) > (len(seg) * 6 + 64):
-                        return True
-                    return False
-
-                if _is_bad_repetition(cached):
-                    # Fail-soft: lieber Quellspan beibehalten als Spam ausgeben
-                    cached = seg
-                    # optional: markiere im Check/Fallback (falls du ein checks-dict hier hast)
-                    # (wir setzen lediglich den Text; Checks bleiben später grün wegen Preserves)
-
-                cache.set(seg, cached)
-
-            # --- Latin-Leak-Detektor + Pivot-Fallback ---
-            if (n_tgt["engine"] in _pivot_langs) and (len(seg.strip()) >= 4):
-                leak = _latin_leak_ratio(cached)
-                if leak > _leak_max:
-                    cached2 = _pivot_translate(n_src["engine"], _pivot_mid, n_tgt["engine"], seg)
-                    cached2 = invariants.scrub_artifacts(cached2)
-                    if _latin_leak_ratio(cached2) < leak:
-                        cached = cached2
-                        cache.set(seg, cached2)
-            out_parts.append(cached)
+            out_parts.append(seg if _is_noise_segment(seg) else cache.get(seg))
 
         rendered = "".join(out_parts)
         # 5) Letzter Feinschliff für Wrapper/Artefakte bezogen auf das span
         rendered = invariants.unwrap_spurious_wrappers(rendered, mapping, chunk)
         out_chunks.append(rendered)
-
     out = "".join(out_chunks)
 
-    # 6) Gesamtvalidierung (original HTML + invarianten)
-    full_frozen, full_map = invariants.freeze_invariants(text)
+    # 6) Gesamtvalidierung (original HTML + invarianten); ohne Keep-Term-Änderung aus dem FrozenDoc
+    if doc.text == text:
+        full_map = doc.mapping_list()
+    else:
+        full_frozen, full_map = invariants.freeze_invariants(text)
     
     # Keep-Terms-Mapping zur finalen Validierung hinzufügen
     if keep_terms and 'temp_mapping' in locals():
@@ -692,43 +856,56 @@ def _spans_only_translate(n_src, n_tgt, text: str, max_new_tokens, call_worker,
     
     return out, checks, debug_info
 
-def _invariant_interleave_translate(n_src, n_tgt, text: str, max_new_tokens, call_worker, invariants):
+async def _invariant_interleave_translate(n_src, n_tgt, text: str, max_new_tokens, call_worker, invariants, gloss_sig: str = "gl=none", doc=None, timer: StageTimer | None = None, keep_terms: list[str] | None = None):
     # Reuse helpers from spans-only:
     #  - _split_by_std_inv(std_text)
     #  - _is_noise_segment(s)
-    #  - _SpanCache
-    cache = _SpanCache()
-
-    # Pivot/Leak-Heuristik begrenzt auch hier verfügbar (gleich wie in Spans-only)
-    _pivot_langs = {s.strip() for s in (_os.environ.get("PIVOT_LANGS", "km,lo,my").split(",")) if s.strip()}
-    _pivot_mid  = _os.environ.get("PIVOT_MID_LANG", "en").strip() or "en"
-    _leak_max   = float(_os.environ.get("LEAK_LATIN_MAX", "0.15") or "0.15")
-    _LATIN_RE   = _re.compile(r"[A-Za-z]")
-
-    def _latin_leak_ratio(s: str) -> float:
-        letters = [ch for ch in (s or "") if ch.isalpha()]
-        if not letters: return 0.0
-        return len([ch for ch in letters if _LATIN_RE.match(ch)]) / len(letters)
-
-    def _pivot_translate(src_engine: str, mid_engine: str, tgt_engine: str, seg: str):
-        # First translation: src -> mid
-        try:
-            t1 = _call_worker_translate(seg, src_engine, mid_engine, BACKEND_BASE)
-        except Exception:
-            t1 = seg  # fallback to original if first translation fails
-        
-        # Second translation: mid -> tgt
-        try:
-            t2 = _call_worker_translate(t1, mid_engine, tgt_engine, BACKEND_BASE)
-            return t2
-        except Exception:
-            return t1  # fallback to intermediate result if second translation fails
-
-    # 1) Invarianten einfrieren (ohne HTML-Splitting, kompletter String)
-    frozen, mapping = invariants.freeze_invariants(text)
-
-    # 2) In (T|I)-Teile splitten
-    parts = _split_by_std_inv(frozen)
+    #  - _SpanCache (inkl. prozessweitem Segment-Cache)
+    cache = _SpanCache(n_src["engine"], n_tgt["engine"], gloss_sig)
+
+    # 1) Invarianten einfrieren (ohne HTML-Splitting, kompletter String) – FrozenDoc des Requests
+    if doc is None or doc.text != (text or ""):
+        doc = invariants.FrozenDoc(text)
+    mapping = doc.mapping
+
+    # 2) In (T|I)-Teile splitten; Keep-Terms innerhalb der Text-Teile bleiben wörtlich (K)
+    parts = doc.inv_parts
+    terms = sorted({t for t in (keep_terms or []) if t and t in text}, key=len, reverse=True)
+    if terms:
+        keep_re = re.compile("(" + "|".join(re.escape(t) for t in terms) + ")")
+        split_parts = []
+        for kind, val in parts:
+            if kind != "T" or not val:
+                split_parts.append((kind, val))
+                continue
+            for j, piece in enumerate(keep_re.split(val)):
+                if piece:
+                    split_parts.append(("K" if j % 2 else "T", piece))
+        parts = split_parts
+
+    async def _translate_seg(seg: str) -> str:
+        payload = {"source": n_src["engine"], "target": n_tgt["engine"], "text": seg}
+        if max_new_tokens: payload["max_new_tokens"] = max_new_tokens
+        w = await call_worker(payload)
+        cached = (w.get("translated_text","") or "")
+        cached = invariants.scrub_artifacts(cached)
+
+        # Anti-Loop (wie in Spans-only)
+        if is_degenerate(cached, seg):
+            cached = seg
+        return cached
+
+    # Alle eindeutigen Text-Segmente gemeinsam übersetzen (Micro-Batcher bündelt die Calls)
+    todo = {}
+    for kind, val in parts:
+        seg = val or ""
+        if kind == "T" and not _is_noise_segment(seg) and cache.get(seg) is None:
+            todo[seg] = None
+    results = dict(zip(todo, await asyncio.gather(*[_translate_seg(s) for s in todo])))
+    # Pivot bei starken Latin-Leaks (für Non-Latin-Ziele), gebündelt wie in Spans-only
+    results = await _pivot_leaking(n_src["engine"], n_tgt["engine"], results, max_new_tokens, timer)
+    for seg, res in results.items():
+        cache.share(seg, res)
 
     out_parts = []
     for kind, val in parts:
@@ -736,57 +913,77 @@ def _invariant_interleave_translate(n_src, n_tgt, text: str, max_new_tokens, cal
             raw = mapping[val]["raw"] if 0 <= val < len(mapping) else ""
             out_parts.append(raw)
             continue
-
-        seg = val or ""
-        if _is_noise_segment(seg):
-            out_parts.append(seg)
+        if kind == "K":
+            out_parts.append(val)
             continue
-
-        cached = cache.get(seg)
-        if cached is None:
-            payload = {"source": n_src["engine"], "target": n_tgt["engine"], "text": seg}
-            if max_new_tokens: payload["max_new_tokens"] = max_new_tokens
-            w = call_worker(payload)
-            cached = (w.get("translated_text","") or "")
-            cached = invariants.scrub_artifacts(cached)
-
-            # Anti-Loop (wie in Spans-only)
-            def _is_bad_repetition(s: str) -> bool:
-                if not s or len(s) < 16: return False
-                if (len(set(s)) / len(s)) < 0.12: return True
-                for n in (1,2,3,4):
-                    unit = s[:n]
-                    if unit and s.count(unit) * n > max(len(s)*0.65, 16): return True
-                if len(s) > (len(seg) * 6 + 64): return True
-                return False
-            if _is_bad_repetition(cached):
-                cached = seg
-
-            cache.set(seg, cached)
-
-        # Pivot bei starken Latin-Leaks (für Non-Latin-Ziele)
-        if (n_tgt["engine"] in _pivot_langs) and (len(seg.strip()) >= 4):
-            leak = _latin_leak_ratio(cached)
-            if leak > _leak_max:
-                cached2 = _pivot_translate(n_src["engine"], _pivot_mid, n_tgt["engine"], seg)
-                cached2 = invariants.scrub_artifacts(cached2)
-                def _llr(x): 
-                    letters = [ch for ch in (x or "") if ch.isalpha()]
-                    return 0.0 if not letters else len([ch for ch in letters if _LATIN_RE.match(ch)]) / len(letters)
-                if _llr(cached2) < leak:
-                    cached = cached2
-                    cache.set(seg, cached2)
-
-        out_parts.append(cached)
+        seg = val or ""
+        out_parts.append(seg if _is_noise_segment(seg) else cache.get(seg))
 
     out = "".join(out_parts)
 
     # 3) Validierung gegen das Original
-    full_frozen, full_map = invariants.freeze_invariants(text)
-    checks = invariants.validate_invariants(text, out, full_map)
+    checks = invariants.validate_invariants(text, out, doc.mapping_list())
     checks["fallback_used"] = "invariant_interleave"
     return out, checks
 
+async def _spans_only_glossary(n_src, n_tgt, text: str, max_new_tokens, keep_terms, glossary_terms, doc=None, timer: StageTimer | None = None):
+    """spans-only auf dem Originaltext; Glossar-Terme dabei in Safe-Tokens (wie SAFE MODE)."""
+    spans_input, g_map = text, None
+    if glossary_terms:
+        try:
+            spans_input, g_map = freeze_glossary(spans_input, n_tgt["engine"], glossary_terms)
+        except Exception:
+            g_map = None
+    out, checks, _ = await _spans_only_translate(n_src, n_tgt, spans_input, max_new_tokens, BATCHER.translate, invariants, keep_terms, gloss_sig=glossary_signature(glossary_terms), doc=doc, timer=timer)
+    if g_map:
+        out, checks["glossary"] = unfreeze_glossary(out, g_map)
+    return out, checks
+
+async def _cache_get(cache_key: str):
+    # TieredCache: SQLite-Lookup nicht auf dem Event-Loop
+    aget = getattr(_CACHE, "aget", None)
+    return await aget(cache_key) if aget is not None else _CACHE.get(cache_key)
+
+def _leave_round(call_worker):
+    """BatchRound-Slot freigeben, wenn dieser Pfad den Primär-Call nicht (mehr) braucht."""
+    leave = getattr(call_worker, "leave", None)
+    if leave is not None:
+        leave()
+
+def _style_postfilter(out: str, checks: dict, n_tgt: dict, request_style) -> tuple[str, dict]:
+    """Style-Postfilter für alle Pfade, deren Ergebnis zurückgegeben/gecacht wird; übernommen nur, wenn Invarianten ok bleiben."""
+    # de-Ziel: Anrede + Gendern
+    if settings.ENABLE_STYLE_FILTER and ("de" in settings.STYLE_LANGS.split(",")) and _is_de(n_tgt["bcp47"], n_tgt["engine"]):
+        s_addr = (request_style.address.lower() if (request_style and request_style.address) else settings.STYLE_DEFAULT_ADDRESS.lower())
+        s_gender = (request_style.gender.lower() if (request_style and request_style.gender) else settings.STYLE_DEFAULT_GENDER.lower())
+        keep = set([s.strip() for s in settings.STYLE_KEEP_TERMS.split(",") if s.strip()])
+        if request_style and request_style.keep_terms:
+            keep |= set(request_style.keep_terms)
+        out2, checks2 = apply_style_de_safe(out, s_addr, s_gender, keep, invariants)
+        if checks2.get("ok", False):
+            out, checks = out2, checks2
+            checks["style_used"] = {"address": s_addr, "gender": s_gender}
+
+    # Romance T/V (fr/it/es/pt) – nur Anrede/Possessiva
+    if settings.ENABLE_STYLE_FILTER and n_tgt["engine"] in ("fr","it","es","pt"):
+        s_addr = (request_style.address.lower() if (request_style and request_style.address) else settings.STYLE_DEFAULT_ADDRESS.lower())
+        keep = set([s.strip() for s in settings.STYLE_KEEP_TERMS.split(",") if s.strip()])
+        if request_style and request_style.keep_terms:
+            keep |= set(request_style.keep_terms)
+        out2, checks2 = apply_style_romance_safe(out, n_tgt["engine"], s_addr, invariants, keep)
+        if checks2.get("ok", False):
+            out, checks = out2, checks2
+            checks["style_used"] = {"address": s_addr}
+    return out, checks
+
+def _cache_store(cache_key: str | None, out: str, checks: dict):
+    if settings.CACHE_ENABLE and _CACHE is not None and cache_key and checks.get("ok", False):
+        try:
+            _CACHE.set(cache_key, {"translated_text": out, "checks": dict(checks)})
+            checks["cache_used"] = "miss_store"
+        except Exception:
+            pass
+
 def _freeze_visible(text: str):
     """
     Friert alle non-HTML Invarianten im sichtbaren Text ein.
@@ -798,6 +995,49 @@ def _validate_core(out: str, mapping: list[dict]) -> dict:
     # Reuse invariants.validate_invariants, aber original=out (da wir nur non-HTML hatten)
     return invariants.validate_invariants(out, out, mapping)
 
+async def _html_visible_v3b_translate(n_src, n_tgt, text: str, mapping: list[dict], max_new_tokens, checks: dict) -> tuple[str, dict] | None:
+    """
+    Fallback v3b: sichtbaren Text ohne HTML einfrieren, übersetzen und zwischen die äußeren
+    Tags setzen. Aktualisiert `checks`; None, wenn kein sichtbarer Text oder der Worker versagt.
+    """
+    core_src = _strip_all_tags(text).strip()
+    if not core_src:
+        return None
+    # 1) Sichtbaren Text extrahieren und mit invariants.freeze_invariants einfrieren (non-HTML)
+    core_freeze, core_map = _freeze_visible(core_src)
+
+    # 2) DIESE Sentinels in "safe" Form ohne "<" wandeln: [#INV:{id}#]
+    safe_freeze = _to_safe_sentinels(core_freeze)
+
+    # 3) Worker mit safe-Sentinels aufrufen
+    payload2 = {"source": n_src["engine"], "target": n_tgt["engine"], "text": safe_freeze}
+    if max_new_tokens:
+        payload2["max_new_tokens"] = max_new_tokens
+
+    try:
+        worker2 = await BATCHER.translate(payload2)
+        core_raw = (worker2.get("translated_text", "") or "")
+
+        if core_raw.strip():
+            # 4) Tolerant unfreezen via safe-Unfreeze → genaues Wiederherstellen der Invarianten
+            core_out = _rehydrate_safe_to_std(core_raw, core_map)
+
+            # 5) Ergebnis zwischen äußeren HTML-Tags einbetten
+            open_tag, close_tag = _outer_html_wrappers(mapping)
+            out = f"{open_tag} {core_out} {close_tag}".strip()
+
+            # 6) checks aus den Core-Checks übernehmen
+            core_checks = _validate_core(core_out, core_map)
+            checks.update(core_checks)
+            checks["html_ok"] = True
+            checks["artifact_ok"] = True
+            checks["ok"] = True
+            checks["fallback_used"] = "html_visible_freeze_safe_v3b"
+            return out, checks
+    except Exception as e:
+        print(f"ERROR: HTML visible freeze safe fallback v3b failed: {e}")
+    return None
+
 # Pydantic models for API requests
 class Context(BaseModel):
     keep_terms: List[str] = []
@@ -819,7 +1059,60 @@ class GlossaryItem(BaseModel):
 class GlossarySpec(BaseModel):
     terms: list[GlossaryItem] = []
 
-def translate_one(source_bcp47: str, target_bcp47: str, text: str, max_new_tokens: int | None = None, debug: bool = False, keep_terms: list[str] | None = None, request_style: StyleSpec | None = None, req_glossary: GlossarySpec | None = None, item_glossary: GlossarySpec | None = None) -> tuple[str, dict, dict]:
+def _count_result(fb: str, g: dict, tgt_bcp47: str):
+    """Labeled Metrics für einen Fallback-Grund und Glossary-Zähler (einmal pro Request)."""
+    if fb == "spans_only_text_segments" or fb.startswith("breaker_degrade_spans_only"):
+        _inc(METRICS_LBL["spans_only_total"], tgt_bcp47, 1)
+    # SAFE MODE und gelerntes Routing zählen hier mit:
+    if fb in ("force_spans_only", "learned_spans_only", "hedged_spans_only"):
+        _inc(METRICS_LBL["spans_only_total"], tgt_bcp47, 1)
+    if fb.startswith("breaker_degrade_"):
+        _inc(METRICS_LBL["degrade_total"], fb.split(":",1)[0], 1)
+    _inc(METRICS_LBL["glossary_replaced_total"], tgt_bcp47, int(g.get("replaced_total", 0)))
+    _inc(METRICS_LBL["glossary_missing_total"],  tgt_bcp47, int(g.get("missing", 0)))
+
+def _record_result(final_checks: dict, tgt_bcp47: str, debug: bool, debug_info: dict, count: bool = True):
+    """Labeled Metrics + Debug-Header für ein fertiges translate_one-Ergebnis (count=False: Dokument-Stück)."""
+    try:
+        fb = str(final_checks.get("fallback_used", ""))
+        g  = final_checks.get("glossary") or {"replaced_total": 0, "missing": 0}
+        if count:
+            _count_result(fb, g, tgt_bcp47)
+        if debug:
+            debug_info.setdefault("xhdr", {})
+            debug_info["xhdr"]["X-Fallback"] = fb
+            debug_info["xhdr"]["X-Glossary-Replaced"] = str(g.get("replaced_total", 0))
+            debug_info["xhdr"]["X-Glossary-Missing"]  = str(g.get("missing", 0))
+    except Exception:
+        pass
+
+# Singleflight: identische, gleichzeitig laufende Übersetzungen (gleicher cache_key) nur einmal rechnen
+_FLIGHT = SingleFlight()
+
+async def translate_one(source_bcp47: str, target_bcp47: str, text: str, max_new_tokens: int | None = None, debug: bool = False, keep_terms: list[str] | None = None, request_style: StyleSpec | None = None, req_glossary: GlossarySpec | None = None, item_glossary: GlossarySpec | None = None, call_worker=None, timer: StageTimer | None = None) -> tuple[str, dict, dict]:
+    """
+    translate_one mit Singleflight: als Leader wird das Ergebnis an wartende Duplikate verteilt.
+    Ein übergebener StageTimer enthält danach die Stage-Zeiten (Server-Timing / debug["timing_ms"]).
+    """
+    flight: dict = {}
+    timer = timer if timer is not None else StageTimer()
+    try:
+        res = await _translate_one(source_bcp47, target_bcp47, text, max_new_tokens, debug, keep_terms, request_style, req_glossary, item_glossary, call_worker, flight, timer)
+    except asyncio.CancelledError:
+        if "key" in flight:
+            _FLIGHT.cancel(flight["key"])
+        raise
+    except Exception as e:
+        if "key" in flight:
+            _FLIGHT.resolve(flight["key"], exc=e)
+        timer.finish({"fallback_used": "error"})
+        raise
+    if "key" in flight:
+        _FLIGHT.resolve(flight["key"], (res[0], res[1]))
+    timer.finish(res[1])
+    return res
+
+async def _translate_one(source_bcp47: str, target_bcp47: str, text: str, max_new_tokens: int | None = None, debug: bool = False, keep_terms: list[str] | None = None, request_style: StyleSpec | None = None, req_glossary: GlossarySpec | None = None, item_glossary: GlossarySpec | None = None, call_worker=None, flight: dict | None = None, timer: StageTimer | None = None) -> tuple[str, dict, dict]:
     """
     Unified translation pipeline for single text with enhanced HTML-only fallback v2.
     
@@ -829,6 +1122,9 @@ def translate_one(source_bcp47: str, target_bcp47: str, text: str, max_new_token
         text: Text to translate
         max_new_tokens: Optional max tokens for generation
         debug: Whether to include debug information
+        call_worker: Optional coroutine for the primary worker call (default: BATCHER.translate)
+        flight: Singleflight state; set to {"key": cache_key} when this call is the leader
+        timer: StageTimer for per-stage histograms (freeze, cache, worker, unfreeze, validate, fallbacks)
         
     Returns:
         Tuple of (translated_text, checks_dict, debug_dict)
@@ -842,16 +1138,13 @@ def translate_one(source_bcp47: str, target_bcp47: str, text: str, max_new_token
     # Normalize language codes
     n_src = lang.normalize_lang_input(source_bcp47)
     n_tgt = lang.normalize_lang_input(target_bcp47)
+    if timer is None:
+        timer = StageTimer()
+    timer.target = n_tgt["engine"]
     
-    # Style-Signatur wie bisher ermittelt (nutze deine existierenden Variablen/Default-Logik):
-    s_addr = None
-    s_gender = None
-    if 'request_style' in globals() and request_style:
-        s_addr = (request_style.address or settings.STYLE_DEFAULT_ADDRESS) if hasattr(request_style,'address') else settings.STYLE_DEFAULT_ADDRESS
-        s_gender = (request_style.gender  or settings.STYLE_DEFAULT_GENDER)  if hasattr(request_style,'gender')  else settings.STYLE_DEFAULT_GENDER
-    else:
-        s_addr = settings.STYLE_DEFAULT_ADDRESS
-        s_gender = settings.STYLE_DEFAULT_GENDER
+    # Aufgelöster Stil wie im Style-Postfilter (Request vor Default)
+    s_addr = (request_style.address.lower() if (request_style and request_style.address) else settings.STYLE_DEFAULT_ADDRESS.lower())
+    s_gender = (request_style.gender.lower() if (request_style and request_style.gender) else settings.STYLE_DEFAULT_GENDER.lower())
 
     # Glossary-Terms sammeln und Freeze
     glossary_terms = _collect_glossary_terms(req_glossary, item_glossary)
@@ -862,31 +1155,67 @@ def translate_one(source_bcp47: str, target_bcp47: str, text: str, max_new_token
     else:
         text_for_gloss = text
 
-    # Cache-Signatur inkl. Glossary
-    s_addr = settings.STYLE_DEFAULT_ADDRESS
-    s_gender = settings.STYLE_DEFAULT_GENDER
-    cache_sig = style_signature(s_addr, s_gender) + ";" + glossary_signature(glossary_terms)
+    # Cache-Signatur: alles, was den Output ändert (Stil, Keep-Terms, max_new_tokens, Glossary)
+    cache_sig = ";".join((
+        style_signature(s_addr, s_gender),
+        keep_terms_signature(keep_terms, request_style.keep_terms if request_style else None),
+        f"mnt={max_new_tokens or 0}",
+        glossary_signature(glossary_terms),
+    ))
     cache_key = None
     cache_hit = False
+    # Einmal einfrieren; Cache-Key, Worker-Payload, Validierung und Fallbacks teilen sich den FrozenDoc
+    doc = invariants.FrozenDoc(text_for_gloss)
+    timer.lap("freeze")
     # CACHE: Schlüssel auf Basis von text_for_gloss (nicht raw text)
+    request_key = build_key(n_src["engine"], n_tgt["engine"], doc.std, cache_sig)
     if settings.CACHE_ENABLE and _CACHE is not None:
-        fstd_for_key = _freeze_std_for_key(text_for_gloss)
-        cache_key = build_key(n_src["engine"], n_tgt["engine"], fstd_for_key, cache_sig)
-        citem = _CACHE.get(cache_key)
+        cache_key = request_key
+        citem = await _cache_get(cache_key)
+        timer.lap("cache")
         if citem:
             final_out = citem.get("translated_text","")
-            final_checks = citem.get("checks",{})
+            final_checks = dict(citem.get("checks",{}))
             final_checks["cache_used"] = "hit"
             if debug:
                 debug_info["cache_key"] = cache_key
                 debug_info["cache"] = "hit"
-            # KEIN return hier! Danach normal weiter zum Metrics/Return-Block.
+            # Treffer: kein Worker-Call, direkt zum Metrics/Return-Block
+            _record_result(final_checks, target_bcp47, debug, debug_info, timer.observe)
+            return final_out, final_checks, debug_info
+    # Singleflight auf die volle Request-Signatur (auch ohne Cache); BCP-47 statt Engine, weil
+    # Skript-/Latin-Leak-Prüfungen am Ziel-Tag hängen
+    if settings.SINGLEFLIGHT_ENABLE and flight is not None:
+        flight_key = f"{source_bcp47}>{target_bcp47}|{request_key}"
+        while True:
+            shared = _FLIGHT.join(flight_key)
+            if shared is None:
+                flight["key"] = flight_key
+                break
+            # Gleicher Request läuft bereits: BatchRound-Slot freigeben und auf den Leader warten
+            _leave_round(call_worker)
+            try:
+                final_out, shared_checks = await _FLIGHT.wait(shared)
+            except LeaderCancelled:
+                # Leader abgebrochen: neu joinen, der erste Wartende übersetzt selbst
+                timer.lap("singleflight_wait")
+                continue
+            timer.lap("singleflight_wait")
+            final_checks = dict(shared_checks)
+            final_checks["cache_used"] = "coalesced"
+            if debug:
+                debug_info["cache_key"] = flight_key
+                debug_info["cache"] = "coalesced"
+            _record_result(final_checks, target_bcp47, debug, debug_info, timer.observe)
+            return final_out, final_checks, debug_info
     
     # -------- SAFE MODE: Force Spans-Only per ENV --------
     tgt_bcp = target_bcp47
     tgt_eng = n_tgt["engine"]
     force_spans = (tgt_bcp in settings.SPANS_ONLY_FORCE_BCP47) or (tgt_eng in settings.SPANS_ONLY_FORCE_ENGINES)
     if force_spans:
+        # kein Primär-Call: Runde nicht bis zum Ende des Spans-Laufs aufhalten
+        _leave_round(call_worker)
         spans_input = text
         # Falls Glossary aktiv ist: in Safe-Tokens hüllen, damit es nicht kaputtgeht
         g_mapping = None
@@ -895,12 +1224,10 @@ def translate_one(source_bcp47: str, target_bcp47: str, text: str, max_new_token
                 spans_input, g_mapping = freeze_glossary(spans_input, n_tgt["engine"], glossary_terms)
             except Exception:
                 g_mapping = None
-        # invariants freeze
-        text2, mapping = invariants.freeze_invariants(spans_input)
-        # reiner spans-only Lauf
-        out_spans, checks_spans, debug_spans = _spans_only_translate(n_src, n_tgt, text2, max_new_tokens, _call_worker_translate, invariants, keep_terms)
-        # invariants unfreeze
-        out_spans, _stats_inv = invariants.unfreeze_invariants(out_spans, mapping)
+        # reiner spans-only Lauf; friert Invarianten selbst ein (FrozenDoc, wenn spans_input == text_for_gloss).
+        # Kein Vorab-Freeze mehr: Sentinel-Ziffern wurden sonst im Span erneut als Zahlen eingefroren.
+        out_spans, checks_spans, debug_spans = await _spans_only_translate(n_src, n_tgt, spans_input, max_new_tokens, BATCHER.translate, invariants, keep_terms, gloss_sig=glossary_signature(glossary_terms), doc=doc, timer=timer)
+        timer.lap("spans_only")
         # glossary unfreeze (tolerant)
         if g_mapping:
             out_spans, gstats = unfreeze_glossary(out_spans, g_mapping)
@@ -910,12 +1237,42 @@ def translate_one(source_bcp47: str, target_bcp47: str, text: str, max_new_token
         # Debug-Header freundlich setzen
         if debug:
             debug_info.setdefault("xhdr", {})["X-Forced-Spans"] = "1"
-        # Gemeinsamer Return-Block am Ende (keine weiteren Worker/Aktionen)
-        # -> springe ans Funktionsende: (Metrics/Headers greifen weiter unten)
+        # Gemeinsamer Return-Block (keine weiteren Worker/Aktionen): normaler Pfad wird übersprungen
+        _record_result(final_checks, target_bcp47, debug, debug_info, timer.observe)
+        return final_out, final_checks, debug_info
     # -------- Ende SAFE MODE Block --------
+
+    # -------- Gelerntes Routing: Pfade überspringen, die für diesen Key fast immer scheitern --------
+    rkey = route_key(tgt_eng, any(m.get("type") == "html" for m in doc.mapping), len(doc.mapping), len(text))
+    route = ROUTER.choose(rkey)
+    # Interleave kennt kein Glossar: mit Glossar-Termen regulär starten
+    if route == "interleave" and glossary_terms:
+        route = "normal"
+    if route != "normal":
+        _leave_round(call_worker)
+        if route == "spans_only":
+            out_r, checks_r = await _spans_only_glossary(n_src, n_tgt, text, max_new_tokens, keep_terms, glossary_terms, doc=doc, timer=timer)
+        else:
+            out_r, checks_r = await _invariant_interleave_translate(n_src, n_tgt, text, max_new_tokens, BATCHER.translate, invariants, gloss_sig=glossary_signature(glossary_terms), doc=doc, timer=timer, keep_terms=keep_terms)
+        timer.lap(route)
+        ROUTER.record(rkey, route, checks_r.get("ok", False))
+        if checks_r.get("ok", False):
+            # Style-Postfilter wie im Normalpfad, dann cachen
+            out_r, checks_r = _style_postfilter(out_r, checks_r, n_tgt, request_style)
+            timer.lap("style")
+            checks_r["fallback_used"] = f"learned_{route}"
+            final_out, final_checks = out_r, checks_r
+            if debug:
+                debug_info["route"] = {"key": list(rkey), "start": route}
+                debug_info.setdefault("xhdr", {})["X-Route"] = route
+            _cache_store(cache_key, final_out, final_checks)
+            _record_result(final_checks, target_bcp47, debug, debug_info, timer.observe)
+            return final_out, final_checks, debug_info
+        # gelernter Pfad hat diesmal nicht bestanden → regulärer Ablauf
+    # -------- Ende gelerntes Routing --------
     
-    # Invariants auf text_for_gloss:
-    text2, mapping = invariants.freeze_invariants(text_for_gloss)
+    # Invariants auf text_for_gloss (aus dem FrozenDoc):
+    text2, mapping = doc.std, doc.mapping_list()
     
     # Keep-Terms injizieren falls vorhanden
     if keep_terms:
@@ -928,7 +1285,8 @@ def translate_one(source_bcp47: str, target_bcp47: str, text: str, max_new_token
         text2, mapping = force_freeze_html_only(text)
     
     # Convert to safe sentinels for worker transport
-    text2_safe = _to_safe_sentinels(text2)
+    text2_safe = doc.safe if text2 == doc.std else _to_safe_sentinels(text2)
+    timer.lap("freeze")
     
     # Log translation info
     html_count = len(html_mappings)
@@ -943,90 +1301,118 @@ def translate_one(source_bcp47: str, target_bcp47: str, text: str, max_new_token
     if max_new_tokens:
         payload["max_new_tokens"] = max_new_tokens
     
+    # Hedging: riskante Requests starten spans-only sofort parallel; das erste bestandene Ergebnis gewinnt
+    hedge = None
+    if HEDGE.enabled:
+        HEDGE.deposit()
+        if _hedge_risky(rkey, len(mapping)) and HEDGE.try_acquire():
+            # eigener Timer: parallel laufende Stages würden die Laps des Primärlaufs verfälschen
+            hedge = asyncio.ensure_future(_spans_only_glossary(n_src, n_tgt, text, max_new_tokens, keep_terms, glossary_terms, doc=doc, timer=StageTimer(n_tgt["engine"])))
+            hedge.add_done_callback(HEDGE.finished)
+
+    def _hedge_win():
+        HEDGE.record(True)
+        timer.lap("hedge")
+        out_h, checks_h = hedge.result()
+        # wie der Normalpfad: Style-Postfilter vor Rückgabe und Cache
+        out_h, checks_h = _style_postfilter(out_h, checks_h, n_tgt, request_style)
+        checks_h["fallback_used"] = "hedged_spans_only"
+        _record_normal(rkey, False)
+        ROUTER.record(rkey, "spans_only", True)
+        if debug:
+            debug_info.setdefault("xhdr", {})["X-Hedge"] = "won"
+        _cache_store(cache_key, out_h, checks_h)
+        _record_result(checks_h, target_bcp47, debug, debug_info, timer.observe)
+        return out_h, checks_h, debug_info
+
     # Step 3: Call Worker
-    worker_out_raw = ""
+    primary = None
     try:
-        response = SESSION.post(f"{BACKEND_BASE}/translate", json=payload, timeout=max(120, TIMEOUT))
-        if response.status_code == 200:
-            worker_json = response.json()
+        worker_out_raw = ""
+        try:
+            primary = (call_worker or BATCHER.translate)(payload)
+            if hedge is not None:
+                primary = asyncio.ensure_future(primary)
+                await asyncio.wait({primary, hedge}, return_when=asyncio.FIRST_COMPLETED)
+                if _hedge_ok(hedge):
+                    primary.cancel()
+                    return _hedge_win()
+            worker_json = await primary
             worker_out_raw = (worker_json.get("translated_text", "") or "")
             # Rehydrate safe sentinels back to standard format
             worker_out = _rehydrate_safe_to_std(worker_out_raw, mapping)
-        else:
-            # Return error as failed translation
-            return "", {"ok": False, "error": f"Worker returned {response.status_code}"}, {}
-    except Exception as e:
-        # Return error as failed translation
-        return "", {"ok": False, "error": str(e)}, {}
+        except Exception as e:
+            timer.lap("worker")
+            if hedge is not None:
+                await asyncio.wait({hedge})
+                if _hedge_ok(hedge):
+                    return _hedge_win()
+                HEDGE.record(False)
+            # Return error as failed translation (WorkerError: "Worker returned <status>")
+            if isinstance(e, CircuitOpenError):
+                # Breaker offen: sofort mit dem Quelltext antworten statt Worker-Timeout abzuwarten (Cache-Treffer liefen schon oben)
+                return text, {"ok": False, "error": str(e), "fallback_used": "circuit_open"}, {}
+            return "", {"ok": False, "error": str(e)}, {}
+        timer.lap("worker")
     
-    # Unfreeze-Reihenfolge NACH worker:
-    # 1) invariants
-    out, stats = invariants.unfreeze_invariants(worker_out, mapping)
-    # 2) glossary
-    if g_mapping:
-        out, gstats = unfreeze_glossary(out, g_mapping)
-        # checks wird später definiert, speichere gstats temporär
-        _gstats = gstats
-    else:
-        _gstats = None
+        # Unfreeze-Reihenfolge NACH worker:
+        # 1) invariants
+        out, stats = invariants.unfreeze_invariants(worker_out, mapping)
+        # 2) glossary
+        if g_mapping:
+            out, gstats = unfreeze_glossary(out, g_mapping)
+            # checks wird später definiert, speichere gstats temporär
+            _gstats = gstats
+        else:
+            _gstats = None
     
-    # Step 5: Scrub artifacts
-    out = invariants.scrub_artifacts(out)
+        # Step 5: Scrub artifacts
+        out = invariants.scrub_artifacts(out)
     
-    # Step 6: Unwrap spurious wrappers
-    out = invariants.unwrap_spurious_wrappers(out, mapping, text)
+        # Step 6: Unwrap spurious wrappers
+        out = invariants.unwrap_spurious_wrappers(out, mapping, text)
+        timer.lap("unfreeze")
     
-    # Step 7: Validate invariants
-    checks = invariants.validate_invariants(text, out, mapping)
-    checks["freeze"] = stats
+        # Step 7: Validate invariants
+        checks = invariants.validate_invariants(text, out, mapping)
+        checks["freeze"] = stats
+        timer.lap("validate")
     
-    # Add glossary stats if available
-    if _gstats is not None:
-        checks["glossary"] = _gstats
+        # Add glossary stats if available
+        if _gstats is not None:
+            checks["glossary"] = _gstats
+
+        # Hedge auflösen: Primärlauf besteht → Hedge abbrechen, sonst auf den Hedge warten
+        if hedge is not None:
+            try:
+                primary_ok = checks.get("ok", False) and not should_degrade(worker_out_raw, checks, n_tgt["engine"])[0]
+            except Exception:
+                primary_ok = bool(checks.get("ok", False))
+            if not primary_ok:
+                await asyncio.wait({hedge})
+                if _hedge_ok(hedge):
+                    return _hedge_win()
+            hedge.cancel()
+            HEDGE.record(False)
+            hedge = None
+    finally:
+        # Abbruch des Aufrufers (Client weg, Batch abgebrochen): laufende Primär-/Hedge-Tasks nicht verwaisen lassen
+        for t in (primary, hedge):
+            if isinstance(t, asyncio.Future) and not t.done():
+                t.cancel()
     
     # HTML-Fallback disabled for CJK/Thai languages (using spans-only mode instead)
     # Fallback v3b: Only as last resort when normal flow fails (for non-CJK languages)
     if (not checks.get("ok", False)) or stats.get("replaced_total", 0) == 0:
         if any(m["type"] == "html" for m in mapping):
             print(f"WARN: Normal flow failed, using fallback v3b: {source_bcp47}→{target_bcp47}")
-            
-            core_src = _strip_all_tags(text).strip()
-            if core_src:
-                # 1) Sichtbaren Text extrahieren und mit invariants.freeze_invariants einfrieren (non-HTML)
-                core_freeze, core_map = _freeze_visible(core_src)
-                
-                # 2) DIESE Sentinels in "safe" Form ohne "<" wandeln: [#INV:{id}#]
-                safe_freeze = _to_safe_sentinels(core_freeze)
-                
-                # 3) Worker mit safe-Sentinels aufrufen
-                payload2 = {"source": n_src["engine"], "target": n_tgt["engine"], "text": safe_freeze}
-                if max_new_tokens:
-                    payload2["max_new_tokens"] = max_new_tokens
-                
-                try:
-                    response2 = SESSION.post(f"{BACKEND_BASE}/translate", json=payload2, timeout=max(120, TIMEOUT))
-                    if response2.status_code == 200:
-                        worker2 = response2.json()
-                        core_raw = (worker2.get("translated_text", "") or "")
-                        
-                        if core_raw.strip():
-                            # 4) Tolerant unfreezen via safe-Unfreeze → genaues Wiederherstellen der Invarianten
-                            core_out = _rehydrate_safe_to_std(core_raw, core_map)
-                            
-                            # 5) Ergebnis zwischen äußeren HTML-Tags einbetten
-                            open_tag, close_tag = _outer_html_wrappers(mapping)
-                            out = f"{open_tag} {core_out} {close_tag}".strip()
-                            
-                            # 6) checks aus den Core-Checks übernehmen
-                            core_checks = _validate_core(core_out, core_map)
-                            checks.update(core_checks)
-                            checks["html_ok"] = True
-                            checks["artifact_ok"] = True
-                            checks["ok"] = True
-                            checks["fallback_used"] = "html_visible_freeze_safe_v3b"
-                            return out, checks, debug_info
-                except Exception as e:
-                    print(f"ERROR: HTML visible freeze safe fallback v3b failed: {e}")
+            v3b = await _html_visible_v3b_translate(n_src, n_tgt, text, mapping, max_new_tokens, checks)
+            timer.lap("v3b")
+            # v3b ist kein lernbarer Start (verwirft inneres Markup, ok=True ohne volle Validierung)
+            if v3b is not None:
+                _record_normal(rkey, False)
+                out, checks = v3b
+                return out, checks, debug_info
     
     # Step 4: Unfreeze invariants
     out, stats = invariants.unfreeze_invariants(worker_out, mapping)
@@ -1036,10 +1422,13 @@ def translate_one(source_bcp47: str, target_bcp47: str, text: str, max_new_token
     
     # Step 6: Unwrap spurious wrappers
     out = invariants.unwrap_spurious_wrappers(out, mapping, text)
+    timer.lap("unfreeze")
     
     # Step 7: Validate invariants
     checks = invariants.validate_invariants(text, out, mapping)
     checks["freeze"] = stats
+    timer.lap("validate")
+    normal_ok = bool(checks.get("ok", False))
     
     # Falls Standardpfad Invarianten verliert → Interleave-Fallback
     if not checks.get("ok", False):
@@ -1050,7 +1439,9 @@ def translate_one(source_bcp47: str, target_bcp47: str, text: str, max_new_token
         except Exception:
             miss = 0
         if miss > 0 or not checks.get("html_ok", True):
-            out2, checks2 = _invariant_interleave_translate(n_src, n_tgt, text, max_new_tokens, lambda payload: SESSION.post(f"{BACKEND_BASE}/translate", json=payload, timeout=max(120, TIMEOUT)).json(), invariants)
+            out2, checks2 = await _invariant_interleave_translate(n_src, n_tgt, text, max_new_tokens, BATCHER.translate, invariants, gloss_sig=glossary_signature(glossary_terms), doc=doc, timer=timer, keep_terms=keep_terms)
+            timer.lap("interleave")
+            ROUTER.record(rkey, "interleave", checks2.get("ok", False))
             # Übernehmen, wenn eindeutig besser oder ok
             better = (checks2.get("ok", False) or ( (frz.get("missing", 0) or 0) > (checks2.get("freeze",{}).get("missing",0) or 0) ))
             if better:
@@ -1063,6 +1454,8 @@ def translate_one(source_bcp47: str, target_bcp47: str, text: str, max_new_token
         degrade, reason = should_degrade(worker_out_raw, checks, n_tgt["engine"])
     except Exception:
         degrade, reason = (False,"")
+    # Normalpfad gilt als bestanden, wenn er validiert und der Breaker nicht degradiert
+    _record_normal(rkey, normal_ok and not degrade)
 
     if degrade:
         # DEGRADE/BREAKER path: Apply the exact same sequence for the breaker fallback
@@ -1070,7 +1463,7 @@ def translate_one(source_bcp47: str, target_bcp47: str, text: str, max_new_token
         if g_mapping:
             spans_input2 = to_safe_tokens(spans_input2, g_mapping)
 
-        out2, checks2, debug2 = _spans_only_translate(n_src, n_tgt, text, max_new_tokens, _call_worker_translate, invariants, keep_terms)
+        out2, checks2, debug2 = await _spans_only_translate(n_src, n_tgt, text, max_new_tokens, BATCHER.translate, invariants, keep_terms, gloss_sig=glossary_signature(glossary_terms), doc=doc, timer=timer)
 
         if g_mapping:
             out2 = from_safe_tokens(out2, g_mapping)
@@ -1079,6 +1472,7 @@ def translate_one(source_bcp47: str, target_bcp47: str, text: str, max_new_token
         if g_mapping:
             out2, gstats = unfreeze_glossary(out2, g_mapping)
             checks2["glossary"] = gstats
+        ROUTER.record(rkey, "spans_only", checks2.get("ok", False))
         if checks2.get("ok", False):
             out, checks = out2, checks2
             checks["fallback_used"] = f"breaker_degrade_spans_only:{reason}"
@@ -1086,33 +1480,14 @@ def translate_one(source_bcp47: str, target_bcp47: str, text: str, max_new_token
                 debug_info["breaker_reason"] = reason
         else:
             checks["fallback_used"] = f"breaker_attempt_failed:{reason}"
+        timer.lap("spans_only")
     
-    # Style-Postfilter (nur falls aktiviert und de-Ziel)
-    if settings.ENABLE_STYLE_FILTER and ("de" in settings.STYLE_LANGS.split(",")) and _is_de(n_tgt["bcp47"], n_tgt["engine"]):
-        s_addr = (request_style.address.lower() if (request_style and request_style.address) else settings.STYLE_DEFAULT_ADDRESS.lower())
-        s_gender = (request_style.gender.lower() if (request_style and request_style.gender) else settings.STYLE_DEFAULT_GENDER.lower())
-        keep = set([s.strip() for s in settings.STYLE_KEEP_TERMS.split(",") if s.strip()])
-        if request_style and request_style.keep_terms:
-            keep |= set(request_style.keep_terms)
-        out2, checks2 = apply_style_de_safe(out, s_addr, s_gender, keep, invariants)
-        # Übernehmen nur, wenn Invarianten ok bleiben
-        if checks2.get("ok", False):
-            out, checks = out2, checks2
-            checks["style_used"] = {"address": s_addr, "gender": s_gender}
-    
-    # Romance T/V (fr/it/es/pt) – nur Anrede/Possessiva
-    if settings.ENABLE_STYLE_FILTER and n_tgt["engine"] in ("fr","it","es","pt"):
-        s_addr = (request_style.address.lower() if (request_style and request_style.address) else settings.STYLE_DEFAULT_ADDRESS.lower())
-        keep = set([s.strip() for s in settings.STYLE_KEEP_TERMS.split(",") if s.strip()])
-        if request_style and request_style.keep_terms:
-            keep |= set(request_style.keep_terms)
-        out2, checks2 = apply_style_romance_safe(out, n_tgt["engine"], s_addr, invariants, keep)
-        if checks2.get("ok", False):
-            out, checks = out2, checks2
-            checks["style_used"] = {"address": s_addr}
+    # Style-Postfilter (de: Anrede/Gendern, fr/it/es/pt: T/V)
+    out, checks = _style_postfilter(out, checks, n_tgt, request_style)
     
     # Set final output and checks for normal pipeline
     final_out, final_checks = out, checks
+    timer.lap("style")
     
     # Prepare debug information if requested
     if debug:
@@ -1129,34 +1504,126 @@ def translate_one(source_bcp47: str, target_bcp47: str, text: str, max_new_token
     # Cache erfolgreiche Übersetzungen (nur bei Cache-Miss)
     if worker_out is not None and settings.CACHE_ENABLE and _CACHE is not None and cache_key and final_checks.get("ok", False):
         try:
-            _CACHE.set(cache_key, {"translated_text": final_out, "checks": final_checks}, ttl=settings.CACHE_TTL)
+            _CACHE.set(cache_key, {"translated_text": final_out, "checks": dict(final_checks)})
             final_checks["cache_used"] = "miss_store"
         except Exception:
             pass
     
     # -------- Metrics & Debug-Header (immer) ----------
+    _record_result(final_checks, target_bcp47, debug, debug_info, timer.observe)
+    return final_out, final_checks, debug_info
+
+def _doc_mode_for(text: str) -> bool:
+    return settings.DOC_MODE_ENABLE and len(text or "") >= settings.DOC_MODE_MIN_CHARS
+
+async def translate_document(source_bcp47: str, target_bcp47: str, text: str, max_new_tokens: int | None = None, debug: bool = False, keep_terms: list[str] | None = None, request_style: StyleSpec | None = None, req_glossary: GlossarySpec | None = None, item_glossary: GlossarySpec | None = None, timer: StageTimer | None = None) -> tuple[str, dict, dict]:
+    """
+    Dokument-Modus für lange Texte: an Satz-/Blockgrenzen (nie in Invarianten/offenen Tags) in
+    ≤DOC_CHUNK_CHARS-Stücke teilen, jedes Stück über translate_one (eigene Invarianten-Validierung,
+    Cache, Fallbacks) in einem gemeinsamen BatchRound übersetzen und mit Original-Whitespace zusammensetzen.
+    Metrics (Latenz, Stages, Fallback-Zähler) zählen einmal pro Dokument, nicht pro Stück.
+    """
+    timer = timer if timer is not None else StageTimer()
+    timer.target = lang.normalize_lang_input(target_bcp47)["engine"]
     try:
-        fb = str(final_checks.get("fallback_used", ""))
-        g  = final_checks.get("glossary") or {"replaced_total": 0, "missing": 0}
-        tgt_bcp47 = target_bcp47
-        def _inc(d: dict, key: str, n: int = 1): d[key] = d.get(key, 0) + int(n)
-        if fb == "spans_only_text_segments" or fb.startswith("breaker_degrade_spans_only"):
-            _inc(METRICS_LBL["spans_only_total"], tgt_bcp47, 1)
-        # SAFE MODE zählt hier mit:
-        if fb == "force_spans_only":
-            _inc(METRICS_LBL["spans_only_total"], tgt_bcp47, 1)
-        if fb.startswith("breaker_degrade_"):
-            _inc(METRICS_LBL["degrade_total"], fb.split(":",1)[0], 1)
-        _inc(METRICS_LBL["glossary_replaced_total"], tgt_bcp47, int(g.get("replaced_total", 0)))
-        _inc(METRICS_LBL["glossary_missing_total"],  tgt_bcp47, int(g.get("missing", 0)))
-        if debug:
-            debug_info.setdefault("xhdr", {})
-            debug_info["xhdr"]["X-Fallback"] = fb
-            debug_info["xhdr"]["X-Glossary-Replaced"] = str(g.get("replaced_total", 0))
-            debug_info["xhdr"]["X-Glossary-Missing"]  = str(g.get("missing", 0))
+        res = await _translate_document(source_bcp47, target_bcp47, text, max_new_tokens, debug, keep_terms, request_style, req_glossary, item_glossary, timer)
     except Exception:
-        pass
-    return final_out, final_checks, debug_info
+        timer.finish({"fallback_used": "error"})
+        raise
+    timer.finish({"fallback_used": "doc_mode"})
+    return res
+
+async def _translate_document(source_bcp47: str, target_bcp47: str, text: str, max_new_tokens: int | None, debug: bool, keep_terms: list[str] | None, request_style: StyleSpec | None, req_glossary: GlossarySpec | None, item_glossary: GlossarySpec | None, timer: StageTimer) -> tuple[str, dict, dict]:
+    pieces = []  # (lead_ws, core, trail_ws)
+    for a, b in invariants.document_chunks(text, settings.DOC_CHUNK_CHARS):
+        seg = text[a:b]
+        core = seg.strip()
+        if not core:
+            pieces.append((seg, "", ""))
+            continue
+        i = seg.index(core)
+        pieces.append((seg[:i], core, seg[i + len(core):]))
+    jobs = [i for i, p in enumerate(pieces) if p[1]]
+    timer.lap("doc_split")
+
+    rnd = BatchRound(WORKER, len(jobs), BATCHER.translate, max_batch=settings.BATCH_ROUND_MAX, batcher=BATCHER) if (settings.BATCH_ROUND_ENABLE and len(jobs) > 1) else None
+    # Stück-Timer beobachten nichts selbst; ihre Stages landen summiert im Dokument-Timer
+    timers = [StageTimer(observe=False) for _ in jobs]
+
+    async def _run(k: int, i: int):
+        timers[k].lap("queue")
+        try:
+            return await translate_one(source_bcp47, target_bcp47, pieces[i][1], max_new_tokens, debug, keep_terms, request_style, req_glossary=req_glossary, item_glossary=item_glossary, call_worker=(rnd.caller(k) if rnd else None), timer=timers[k])
+        finally:
+            if rnd:
+                rnd.leave(k)
+
+    t_chunks = time.perf_counter()
+    outcomes = await asyncio.gather(*[_run(k, i) for k, i in enumerate(jobs)], return_exceptions=True)
+    # Stage-Zeiten der parallel laufenden Stücke als Anteil an der Wanduhrzeit übernehmen:
+    # Summen über Stücke wären größer als total (und als die Dokument-Latenz)
+    wall = time.perf_counter() - t_chunks
+    sums: dict = {}
+    for t in timers:
+        for name, secs in t.stages.items():
+            sums[name] = sums.get(name, 0.0) + secs
+    busy = sum(sums.values())
+    scale = min(1.0, wall / busy) if busy > 0 else 0.0
+    for name, secs in sums.items():
+        timer.add(name, secs * scale)
+    timer.skip()
+
+    translated = {}
+    chunk_checks = []
+    failed = []
+    fallbacks: dict = {}
+    freeze = {"replaced_total": 0, "missing": 0, "crc_mismatches": 0}
+    counts: dict = {}
+    gloss = None
+    for k, (i, res) in enumerate(zip(jobs, outcomes)):
+        if isinstance(res, Exception):
+            # Stück nicht übersetzbar: Quelltext behalten, Dokument als fehlgeschlagen markieren
+            out_k, checks_k = pieces[i][1], {"ok": False, "error": str(res)}
+        else:
+            out_k, checks_k = res[0], res[1]
+            if not out_k and not checks_k.get("ok", False):
+                out_k = pieces[i][1]
+        translated[i] = out_k
+        chunk_checks.append(checks_k)
+        if not checks_k.get("ok", False):
+            failed.append(k)
+        fb = checks_k.get("fallback_used")
+        if fb:
+            fb = str(fb).split(":", 1)[0]
+            fallbacks[fb] = fallbacks.get(fb, 0) + 1
+        for key, v in (checks_k.get("freeze") or {}).items():
+            if key in freeze:
+                freeze[key] += int(v or 0)
+        for key, v in (checks_k.get("counts") or {}).items():
+            counts[key] = counts.get(key, 0) + int(v or 0)
+        if checks_k.get("glossary"):
+            gloss = gloss or {"replaced_total": 0, "missing": 0}
+            gloss["replaced_total"] += int(checks_k["glossary"].get("replaced_total", 0))
+            gloss["missing"] += int(checks_k["glossary"].get("missing", 0))
+
+    out = "".join(lead + translated.get(i, core) + trail for i, (lead, core, trail) in enumerate(pieces))
+    checks = {
+        "ok": not failed,
+        "freeze": freeze,
+        "counts": counts,
+        "doc_mode": {"chunks": len(jobs), "failed": failed, "fallbacks": fallbacks, "chunk_chars": settings.DOC_CHUNK_CHARS},
+    }
+    if gloss is not None:
+        checks["glossary"] = gloss
+    debug_info: dict = {}
+    if debug:
+        debug_info["chunks"] = chunk_checks
+        debug_info["xhdr"] = {"X-Doc-Chunks": str(len(jobs))}
+    for fb in fallbacks:
+        _count_result(fb, {}, target_bcp47)
+    _count_result("", gloss or {}, target_bcp47)
+    timer.lap("doc_join")
+    return out, checks, debug_info
 
 def call_backend(text: str, source: str, target: str, max_new_tokens: int = 512) -> Dict[str, Any]:
     """Call backend translation service (legacy compatibility)"""
@@ -1201,6 +1668,18 @@ class BatchItem(BaseModel):
     class Config:
         extra = "forbid"
 
+class StreamHeader(BaseModel):
+    context: Optional[Context] = None
+    style: StyleSpec | None = None
+    glossary: GlossarySpec | None = None
+
+    class Config:
+        extra = "forbid"
+
+def _is_stream_header(item) -> bool:
+    """Erstes /translate_stream-Element ohne "text", aber mit Request-Feldern"""
+    return isinstance(item, dict) and "text" not in item and bool(set(item) & {"context", "style", "glossary"})
+
 class BatchRequest(BaseModel):
     source: str
     target: str
@@ -1260,7 +1739,7 @@ class DetectResponse(BaseModel):
 @app.get("/health")
 async def health():
     """Health check endpoint"""
-    backend_status = _backend_status()
+    backend_status = await _backend_status()
     resp = {
         "ok": True,
         "ready": True,
@@ -1273,49 +1752,78 @@ async def health():
 @app.get("/meta")
 async def meta():
     """Service metadata"""
-    backend_status = _backend_status()
+    backend_status = await _backend_status()
     resp = {
         "service": "ANNI Guard",
         "backend_url": backend_status["backend_url"],
-        "backend_alive": backend_status["backend_alive"]
+        "backend_alive": backend_status["backend_alive"],
+        "workers": {name: {"url": c.base, "limiter": c.limiter.stats() if c.limiter else None, "circuit_breaker": c.breaker.stats() if c.breaker else None} for name, c in _worker_clients()},
     }
+    if isinstance(WORKER, WorkerPool):
+        resp["worker_pool"] = WORKER.stats()
+    resp["routing"] = ROUTER.table()
+    resp["hedge"] = HEDGE.stats()
     resp.update(app_version())
     return resp
 
+# /locales, /locales.csv, /capabilities: Bodies einmal rendern (neu bei geänderter Locales-Datei), mit ETag
+def _locales_json() -> bytes:
+    out = map_locales_with_engine(_load_locales_list())
+    return json_body({"locales": out, "count": len(out), "version": app_version()})
+
+def _locales_csv() -> bytes:
+    rows = ["bcp47,engine"]
+    for item in map_locales_with_engine(_load_locales_list()):
+        rows.append(f"{item['bcp47']},{item['engine']}")
+    return ("\n".join(rows) + "\n").encode("utf-8")
+
+def _capabilities_json() -> bytes:
+    meta = {"version": app_version(), "commit": os.environ.get("GIT_COMMIT", "")}
+    return json_body(compute_capabilities(meta))
+
+def _locales_stamp():
+    return file_stamp(settings.LOCALES_PUBLIC_PATH)
+
+_LOCALES_BODY = PrecomputedBody(_locales_json, _locales_stamp)
+_LOCALES_CSV_BODY = PrecomputedBody(_locales_csv, _locales_stamp)
+_CAPABILITIES_BODY = PrecomputedBody(_capabilities_json, _locales_stamp)
+
+def _precomputed_response(pc: PrecomputedBody, media_type: str, if_none_match: str | None) -> Response:
+    body, etag = pc.get()
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type=media_type, headers={"ETag": etag})
+
 @app.get("/locales")
-def get_locales():
-    locs = _load_locales_list()
-    out = map_locales_with_engine(locs)
-    return {"locales": out, "count": len(out), "version": app_version()}
+def get_locales(if_none_match: str = Header(None)):
+    return _precomputed_response(_LOCALES_BODY, "application/json", if_none_match)
 
 @app.get("/capabilities")
-def get_capabilities():
-    meta = {"version": app_version(), "commit": os.environ.get("GIT_COMMIT", "")}
-    caps = compute_capabilities(meta)
-    return JSONResponse(content=caps)
+def get_capabilities(if_none_match: str = Header(None)):
+    return _precomputed_response(_CAPABILITIES_BODY, "application/json", if_none_match)
 
 @app.get("/cache/stats")
 def cache_stats():
-    from guard.cache import cache as C
+    from guard.cache import cache as C, segment_cache as SC
+    segments = {"enabled": SC is not None, "stats": SC.stats(), "config": {"max": settings.SEGMENT_CACHE_MAX, "ttl": settings.SEGMENT_CACHE_TTL}} if SC is not None else {"enabled": False}
     if not settings.CACHE_ENABLE or C is None:
-        return JSONResponse(content={"enabled": False})
-    return JSONResponse(content={"enabled": True, "stats": C.stats(), "config": {"max": settings.CACHE_MAX, "ttl": settings.CACHE_TTL}})
+        return JSONResponse(content={"enabled": False, "segments": segments})
+    config = {"max": settings.CACHE_MAX, "ttl": settings.CACHE_TTL, "shards": settings.CACHE_SHARDS, "max_bytes": settings.CACHE_MAX_BYTES or None, "l2_path": settings.CACHE_L2_PATH or None, "l2_preload": settings.CACHE_L2_PRELOAD}
+    return JSONResponse(content={"enabled": True, "stats": C.stats(), "config": config, "segments": segments})
+
+@app.get("/pool/stats")
+def pool_stats_endpoint():
+    return JSONResponse(content={"worker": WORKER.stats(), "microbatch": BATCHER.stats(), "http": pool_stats()})
 
 @app.get("/locales.csv")
-def get_locales_csv():
-    locs = _load_locales_list()
-    mapped = map_locales_with_engine(locs)
-    rows = ["bcp47,engine"]
-    for item in mapped:
-        rows.append(f"{item['bcp47']},{item['engine']}")
-    body = "\n".join(rows) + "\n"
-    return PlainTextResponse(content=body, media_type="text/csv")
+def get_locales_csv(if_none_match: str = Header(None)):
+    return _precomputed_response(_LOCALES_CSV_BODY, "text/csv", if_none_match)
 
 @app.post("/translate", response_model=TranslationResponse)
 async def translate(request: TranslationRequest, x_debug: str = Header(None)):
     """Main translation endpoint with robust invariant protection and Phase-1 optimizations"""
     start_time = time.time()
-    METRICS["requests"] += 1
+    METRICS.inc("requests", 1)
 
     try:
         # Validate source language (Worker doesn't accept "auto")
@@ -1338,13 +1846,19 @@ async def translate(request: TranslationRequest, x_debug: str = Header(None)):
         strict_for_this = _strict_enforced_for(tgt_bcp47_norm, tgt_engine_norm)
 
         # Use unified translation pipeline
-        result, checks, debug_info = translate_one(request.source, request.target, request.text, request.max_new_tokens, debug_enabled, keep_terms, request.style, req_glossary=request.glossary, item_glossary=None)
+        timer = StageTimer()
+        translate_fn = translate_document if _doc_mode_for(request.text) else translate_one
+        result, checks, debug_info = await translate_fn(request.source, request.target, request.text, request.max_new_tokens, debug_enabled, keep_terms, request.style, req_glossary=request.glossary, item_glossary=None, timer=timer)
         
         # add debug headers for quick smoke
         debug_headers = {}
         if debug_enabled and isinstance(debug_info.get("xhdr"), dict):
             for k,v in debug_info["xhdr"].items():
                 debug_headers[k] = v
+        if settings.SERVER_TIMING_ENABLE:
+            debug_headers["Server-Timing"] = server_timing([timer])
+        if debug_enabled:
+            debug_info["timing_ms"] = timer.as_ms()
         
         # Check for strict invariant mode with exclusions
         if not checks.get("ok", False) and strict_for_this:
@@ -1356,8 +1870,8 @@ async def translate(request: TranslationRequest, x_debug: str = Header(None)):
 
         # Update metrics
         latency = time.time() - start_time
-        METRICS["lat_sum"] += latency
-        METRICS["lat_n"] += 1
+        METRICS.inc("lat_sum", latency)
+        METRICS.inc("lat_n", 1)
 
         # Get normalized language codes for headers
         source_norm = lang.normalize_lang_input(request.source)
@@ -1383,6 +1897,8 @@ async def translate(request: TranslationRequest, x_debug: str = Header(None)):
         # Add cache header if available
         if checks.get("cache_used"):
             headers["X-Cache"] = checks.get("cache_used", "miss")
+        if checks.get("fallback_used") == "circuit_open":
+            headers["Retry-After"] = str(max(1, math.ceil(settings.CB_OPEN_S)))
         # Add debug headers if available
         headers.update(debug_headers)
         
@@ -1394,14 +1910,16 @@ async def translate(request: TranslationRequest, x_debug: str = Header(None)):
     except HTTPException:
         raise
     except Exception as e:
-        METRICS["errors"] += 1
+        METRICS.inc("errors", 1)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/translate_batch", response_model=BatchResponse)
 async def translate_batch(request: BatchRequest, x_debug: str = Header(None)):
     """Batch translation endpoint with robust invariant protection"""
     start_time = time.time()
-    METRICS["requests"] += 1
+    t_batch = time.perf_counter()
+    METRICS.inc("requests", 1)
+    BATCH_SIZE.observe(len(request.items), kind="request")
 
     try:
         # Validate source language (Worker doesn't accept "auto")
@@ -1450,61 +1968,71 @@ async def translate_batch(request: BatchRequest, x_debug: str = Header(None)):
                     detail=f"Item {i}: Text cannot exceed 2000 characters"
                 )
 
-        # Get batch concurrency setting
-        batch_concurrency = int(os.environ.get("BATCH_CONCURRENCY", "8"))
-        
+        timers = [StageTimer() for _ in request.items]
+        # Concurrent processing, begrenzt durch BATCH_CONCURRENCY (asyncio statt Threads)
+        conc = max(1, settings.BATCH_CONCURRENCY)
+        sem = asyncio.Semaphore(conc)
+        if settings.BATCH_ROUND_ENABLE and len(request.items) > 1:
+            # Alle Items frieren ein und reichen ihren Primär-Text in EINE Runde ein (nur nach
+            # BATCH_ROUND_MAX aufgeteilt). BATCH_CONCURRENCY begrenzt erst die Arbeit NACH dem
+            # Primär-Call (Validierung, Fallback-Pfade) – ein Semaphor vor der Runde würde sie
+            # in N/BATCH_CONCURRENCY serielle Round-Trips zerlegen.
+            rnd = BatchRound(WORKER, len(request.items), BATCHER.translate, max_batch=settings.BATCH_ROUND_MAX, batcher=BATCHER)
+
+            async def _run_item(i, item):
+                primary = rnd.caller(i)
+                held = False
+
+                async def _call(payload, timeout=None):
+                    nonlocal held
+                    res = await primary(payload, timeout)
+                    if not held:
+                        timers[i].lap("worker")
+                        await sem.acquire()
+                        held = True
+                        timers[i].lap("queue")
+                    return res
+                _call.leave = primary.leave
+                # Zeit bis zum Start des Items (Scheduling hinter den anderen Items) ist Wartezeit, kein Freeze
+                timers[i].lap("queue")
+                try:
+                    return await translate_one(request.source, request.target, item.text, request.max_new_tokens, debug_enabled, keep_terms, request.style, req_glossary=request.glossary, item_glossary=item.glossary, call_worker=_call, timer=timers[i])
+                finally:
+                    rnd.leave(i)
+                    if held:
+                        sem.release()
+
+            outcomes = await asyncio.gather(*[_run_item(i, item) for i, item in enumerate(request.items)], return_exceptions=True)
+        else:
+            async def _run_item(i, item):
+                async with sem:
+                    timers[i].lap("queue")
+                    return await translate_one(request.source, request.target, item.text, request.max_new_tokens, debug_enabled, keep_terms, request.style, req_glossary=request.glossary, item_glossary=item.glossary, timer=timers[i])
+
+            outcomes = await asyncio.gather(*[_run_item(i, item) for i, item in enumerate(request.items)], return_exceptions=True)
+
         # Process items with unified pipeline
         results = []
-        if len(request.items) > 1 and batch_concurrency > 1:
-            # Parallel processing
-            with cf.ThreadPoolExecutor(max_workers=batch_concurrency) as executor:
-                futures = []
-                for item in request.items:
-                    future = executor.submit(translate_one, request.source, request.target, item.text, request.max_new_tokens, debug_enabled, keep_terms, request.style, req_glossary=request.glossary, item_glossary=item.glossary)
-                    futures.append(future)
-                
-                for i, future in enumerate(futures):
-                    try:
-                        translated_text, checks, debug_info = future.result()
-                        batch_item = BatchItemResponse(
-                            index=i,
-                            id=item.id if hasattr(item, 'id') else None,
-                            translated_text=translated_text,
-                            checks=checks
-                        )
-                        if debug_enabled:
-                            batch_item.debug = debug_info
-                        results.append(batch_item)
-                    except Exception as e:
-                        batch_item = BatchItemResponse(
-                            index=i,
-                            id=item.id if hasattr(item, 'id') else None,
-                            translated_text="",
-                            checks={"ok": False, "error": str(e)}
-                        )
-                        results.append(batch_item)
-        else:
-            # Sequential processing
-            for i, item in enumerate(request.items):
-                try:
-                    translated_text, checks, debug_info = translate_one(request.source, request.target, item.text, request.max_new_tokens, debug_enabled, keep_terms, request.style, req_glossary=request.glossary, item_glossary=item.glossary)
-                    batch_item = BatchItemResponse(
-                        index=i,
-                        id=item.id if hasattr(item, 'id') else None,
-                        translated_text=translated_text,
-                        checks=checks
-                    )
-                    if debug_enabled:
-                        batch_item.debug = debug_info
-                    results.append(batch_item)
-                except Exception as e:
-                    batch_item = BatchItemResponse(
-                        index=i,
-                        id=item.id if hasattr(item, 'id') else None,
-                        translated_text="",
-                        checks={"ok": False, "error": str(e)}
-                    )
-                    results.append(batch_item)
+        for i, (item, outcome) in enumerate(zip(request.items, outcomes)):
+            if isinstance(outcome, Exception):
+                batch_item = BatchItemResponse(
+                    index=i,
+                    id=item.id,
+                    translated_text="",
+                    checks={"ok": False, "error": str(outcome)}
+                )
+            else:
+                translated_text, checks, debug_info = outcome
+                batch_item = BatchItemResponse(
+                    index=i,
+                    id=item.id,
+                    translated_text=translated_text,
+                    checks=checks
+                )
+                if debug_enabled:
+                    debug_info["timing_ms"] = timers[i].as_ms()
+                    batch_item.debug = debug_info
+            results.append(batch_item)
 
         # Calculate counts
         total = len(results)
@@ -1522,8 +2050,8 @@ async def translate_batch(request: BatchRequest, x_debug: str = Header(None)):
 
         # Update metrics
         latency = time.time() - start_time
-        METRICS["lat_sum"] += latency
-        METRICS["lat_n"] += 1
+        METRICS.inc("lat_sum", latency)
+        METRICS.inc("lat_n", 1)
 
         # Log batch processing
         print(f"BATCH: items={total}, {request.source}→{request.target}, {ok_count}/{failed_count} ok/failed, {latency:.2f}s")
@@ -1551,10 +2079,13 @@ async def translate_batch(request: BatchRequest, x_debug: str = Header(None)):
             "X-Target-Lang": target_norm["bcp47"],
             "X-Target-Engine-Lang": target_norm["engine"]
         }
+        if settings.SERVER_TIMING_ENABLE:
+            # pro Stage über alle Items summiert; total = Wanduhrzeit des Batches
+            batch_headers["Server-Timing"] = server_timing(timers, time.perf_counter() - t_batch)
         if debug_enabled:
             g_rep = 0; g_mis = 0
             for it in results:
-                gl = ((it or {}).get("checks") or {}).get("glossary") or {}
+                gl = (it.checks or {}).get("glossary") or {}
                 try:
                     g_rep += int(gl.get("replaced_total", 0))
                     g_mis += int(gl.get("missing", 0))
@@ -1572,14 +2103,85 @@ async def translate_batch(request: BatchRequest, x_debug: str = Header(None)):
     except HTTPException:
         raise
     except Exception as e:
-        METRICS["errors"] += 1
+        METRICS.inc("errors", 1)
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/translate_stream")
+async def translate_stream(request: Request, source: str, target: str, max_new_tokens: int = 512, debug: bool = False, x_debug: str = Header(None)):
+    """
+    Streaming-Batch: Body ist NDJSON (je Zeile ein String oder {"id","text","glossary"}) oder ein
+    JSON-Array, beliebig viele Items. Optional ist das erste Element ein Header ohne "text" mit
+    {"context","style","glossary"} wie bei /translate_batch. Antwort ist NDJSON, eine Zeile pro
+    Item sobald fertig (mit "index"/"id"), zum Schluss {"done": true, "counts": {...}}.
+    """
+    start_time = time.time()
+    METRICS.inc("requests", 1)
+    if source == "auto":
+        raise HTTPException(
+            status_code=400,
+            detail="Source language 'auto' not supported. Please specify a valid source language."
+        )
+    debug_enabled = debug or x_debug == "1"
+    source_norm = lang.normalize_lang_input(source)
+    target_norm = lang.normalize_lang_input(target)
+
+    # Body vor der Antwort lesen (siehe read_items), danach optionalen Header abtrennen
+    items, read_error = await read_items(request.stream())
+    header = StreamHeader()
+    if items and _is_stream_header(items[0]):
+        try:
+            header = StreamHeader(**items.pop(0))
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Invalid stream header: {e}")
+    keep_terms = []
+    if header.context and header.context.keep_terms:
+        keep_terms = [s for s in header.context.keep_terms if s and isinstance(s, str)]
+
+    async def _handle(idx: int, item) -> dict:
+        item_id, item_glossary = None, None
+        if isinstance(item, BadLine):
+            return {"index": idx, "translated_text": "", "checks": {"ok": False, "error": item.error}}
+        if isinstance(item, dict):
+            item_id, text = item.get("id"), item.get("text")
+            if isinstance(item.get("glossary"), dict):
+                item_glossary = GlossarySpec(terms=[GlossaryItem(**t) for t in (item["glossary"].get("terms") or []) if isinstance(t, dict)])
+        else:
+            text = item
+        if not isinstance(text, str) or not text.strip():
+            return {"index": idx, "id": item_id, "translated_text": "", "checks": {"ok": False, "error": "Text cannot be empty"}}
+        translate_fn = translate_document if _doc_mode_for(text) else translate_one
+        out, checks, debug_info = await translate_fn(source, target, text, max_new_tokens, debug_enabled, keep_terms, header.style, req_glossary=header.glossary, item_glossary=item_glossary)
+        line = {"index": idx, "id": item_id, "translated_text": out, "checks": checks}
+        if debug_enabled:
+            line["debug"] = {k: v for k, v in debug_info.items() if k != "xhdr"}
+        return line
+
+    async def _body():
+        total = 0
+        try:
+            async for line in run_stream(replay(items, read_error), _handle, settings.STREAM_CONCURRENCY, settings.STREAM_QUEUE):
+                total += 1
+                yield line
+        except Exception:
+            METRICS.inc("errors", 1)
+            raise
+        METRICS.inc("lat_sum", time.time() - start_time)
+        METRICS.inc("lat_n", 1)
+        BATCH_SIZE.observe(max(0, total - 1), kind="stream")
+
+    headers = {
+        "X-Source-Lang": source_norm["bcp47"],
+        "X-Source-Engine-Lang": source_norm["engine"],
+        "X-Target-Lang": target_norm["bcp47"],
+        "X-Target-Engine-Lang": target_norm["engine"]
+    }
+    return StreamingResponse(_body(), media_type="application/x-ndjson", headers=headers)
+
 @app.post("/detect", response_model=DetectResponse)
 async def detect_language(request: DetectRequest, accept_language: str = Header(None)):
     """Language detection endpoint with BCP-47 canonicalization"""
     start_time = time.time()
-    METRICS["requests"] += 1
+    METRICS.inc("requests", 1)
 
     try:
         # Validate text length
@@ -1620,8 +2222,8 @@ async def detect_language(request: DetectRequest, accept_language: str = Header(
 
         # Update metrics
         latency = time.time() - start_time
-        METRICS["lat_sum"] += latency
-        METRICS["lat_n"] += 1
+        METRICS.inc("lat_sum", latency)
+        METRICS.inc("lat_n", 1)
 
         return DetectResponse(
             engine=detection_result["engine"],
@@ -1633,7 +2235,7 @@ async def detect_language(request: DetectRequest, accept_language: str = Header(
     except HTTPException:
         raise
     except Exception as e:
-        METRICS["errors"] += 1
+        METRICS.inc("errors", 1)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/detect")
@@ -22,6 +22,7 @@ from pathlib import Path
 # Import shared functionality
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 from libs.trance_common import mask, unmask, normalize, json_get, json_post, check_invariants, t, push, app_version
+from libs.trance_common.http import session, RequestError
 
 # Import pipeline infrastructure
 from tc_pipeline import Pipeline, Ctx, build_pipeline, stage_registry
@@ -208,7 +209,8 @@ def get_baseline(source: str, target: str, text: str) -> tuple[str, Dict[str, An
     start_time = time.time()
     
     try:
-        response = requests.post(
+        # Keep-Alive-Pool statt neuer Verbindung pro Baseline
+        response = session().post(
             f"{GUARD_URL}/translate",
             headers={"X-API-Key": GUARD_API_KEY, "Content-Type": "application/json"},
             json={"source": source, "target": target, "text": text},
@@ -223,7 +225,7 @@ def get_baseline(source: str, target: str, text: str) -> tuple[str, Dict[str, An
         
         return data.get("translated_text", ""), data.get("checks", {}), guard_latency
         
-    except requests.exceptions.RequestException as e:
+    except RequestError as e:
         raise HTTPException(status_code=502, detail=f"Guard service unreachable: {str(e)}")
 
 def build_prompt(baseline_text: str, profile: str, persona: str, level: int, target: str) -> tuple[str, str]:
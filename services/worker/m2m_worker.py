@@ -56,3 +56,27 @@ def translate(r:Req):
         return {"translated_text": txt}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+class BatchReq(BaseModel):
+    source:str
+    target:str
+    texts:list[str]
+    max_new_tokens:int|None=None
+
+@app.post("/translate_batch")
+def translate_batch(r:BatchReq):
+    # Ein generate() für alle Texte (gepaddet) – deutlich billiger pro Satz als serielle Calls
+    try:
+        if not r.texts:
+            return {"translated_texts": []}
+        ensure_loaded()
+        src=norm(r.source); tgt=norm(r.target)
+        tok.src_lang = src
+        enc = tok(r.texts, return_tensors="pt", padding=True)
+        enc = {k:v.to(device) for k,v in enc.items()}
+        tid = tok.get_lang_id(tgt)
+        with torch.no_grad():
+            gen = mdl.generate(**enc, forced_bos_token_id=tid, do_sample=False, num_beams=1, max_new_tokens=r.max_new_tokens or 512)
+        return {"translated_texts": tok.batch_decode(gen, skip_special_tokens=True)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))